@@ -7,14 +7,19 @@ from logging import getLogger
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.device_registry import DeviceEntry
+from homeassistant.helpers.typing import ConfigType
 
 from .wavespa.api import WavespaApi
+from .wavespa.model import WavespaCapability
 from .const import (
     CONF_API_ROOT,
     CONF_API_ROOT_EU,
+    CONF_HEDGE_REQUESTS,
     CONF_PASSWORD,
     CONF_USER_TOKEN,
     CONF_USER_TOKEN_EXPIRY,
@@ -22,16 +27,31 @@ from .const import (
     DOMAIN,
 )
 from .coordinator import WavespaUpdateCoordinator
+from .services import async_setup_services
+from .websocket import async_setup_websocket
 
 _LOGGER = getLogger(__name__)
-_PLATFORMS: list[Platform] = [
-    Platform.BINARY_SENSOR,
-    Platform.CLIMATE,
-    Platform.NUMBER,
-    Platform.SELECT,
-    Platform.SENSOR,
-    Platform.SWITCH,
-]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+# Platforms are only loaded if at least one device has a capability they provide
+_PLATFORM_CAPABILITIES: dict[Platform, WavespaCapability] = {
+    Platform.BINARY_SENSOR: WavespaCapability.CONNECTIVITY | WavespaCapability.ERRORS,
+    Platform.CLIMATE: WavespaCapability.THERMOSTAT,
+    Platform.SENSOR: WavespaCapability.DEVICE_INFO,
+    Platform.SWITCH: (
+        WavespaCapability.HEATER
+        | WavespaCapability.FILTER
+        | WavespaCapability.BUBBLES
+    ),
+}
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the wavespa services and websocket commands."""
+    async_setup_services(hass)
+    async_setup_websocket(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -74,21 +94,57 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             entry, data={**entry.data, **new_config_data}
         )
 
-    api = WavespaApi(session, user_token, api_root)
+    api = WavespaApi(
+        session,
+        user_token,
+        api_root,
+        hedge_requests=entry.options.get(CONF_HEDGE_REQUESTS, False),
+    )
     coordinator = WavespaUpdateCoordinator(hass, api)
     await coordinator.async_config_entry_first_refresh()
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
-    await hass.config_entries.async_forward_entry_setups(entry, _PLATFORMS)
+    await _async_forward_platforms(hass, entry, coordinator)
 
+    @callback
+    def async_add_devices(device_ids: list[str]) -> None:
+        # Devices added later may need platforms that are not loaded yet
+        entry.async_create_task(
+            hass, _async_forward_platforms(hass, entry, coordinator)
+        )
+
+    entry.async_on_unload(coordinator.async_add_device_listener(async_add_devices))
+    # The device list is only polled while the coordinator has listeners, which
+    # would otherwise depend on the entities that happen to be set up and enabled
+    entry.async_on_unload(coordinator.async_add_listener(lambda: None))
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
     return True
 
 
+async def _async_forward_platforms(
+    hass: HomeAssistant, entry: ConfigEntry, coordinator: WavespaUpdateCoordinator
+) -> None:
+    """Set up the platforms required by the devices in the account."""
+    capabilities = WavespaCapability.NONE
+    for device_coordinator in coordinator.device_coordinators.values():
+        capabilities |= device_coordinator.capabilities
+
+    platforms = [
+        platform
+        for platform, platform_capabilities in _PLATFORM_CAPABILITIES.items()
+        if platform not in coordinator.platforms
+        and capabilities & platform_capabilities
+    ]
+    if platforms:
+        coordinator.platforms.update(platforms)
+        await hass.config_entries.async_forward_entry_setups(entry, platforms)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
+    coordinator: WavespaUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
     unload_ok: bool = await hass.config_entries.async_unload_platforms(
-        entry, _PLATFORMS
+        entry, coordinator.platforms
     )
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
@@ -96,6 +152,17 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
+async def async_remove_config_entry_device(
+    hass: HomeAssistant, entry: ConfigEntry, device_entry: DeviceEntry
+) -> bool:
+    """Allow a device to be removed once it is no longer in the account."""
+    coordinator: WavespaUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    return not any(
+        identifier[0] == DOMAIN and identifier[1] in coordinator.api.devices
+        for identifier in device_entry.identifiers
+    )
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
     await async_unload_entry(hass, entry)
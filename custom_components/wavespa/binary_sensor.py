@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-from collections.abc import Mapping
 import re
 
 from typing import Any
@@ -13,12 +12,12 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntityDescription,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import WavespaUpdateCoordinator
-from .wavespa.model import WavespaDeviceType
+from .coordinator import WavespaDeviceCoordinator, WavespaUpdateCoordinator
+from .wavespa.model import WavespaCapability
 from .const import DOMAIN
 from .entity import WavespaEntity
 
@@ -35,6 +34,50 @@ _SPA_ERRORS_SENSOR_DESCRIPTION = BinarySensorEntityDescription(
     device_class=BinarySensorDeviceClass.PROBLEM,
 )
 
+# Error properties are detected by the start of their key
+_AIRJET_ERROR_PATTERN = re.compile(r"system_err(\d+)")
+_HYDROJET_ERROR_PATTERN = re.compile(r"E(\d{2})")
+
+# Bit positions of error codes in the error mask. Each family of numbered codes has
+# its own range, with room for codes of up to two digits.
+_EARTH_ERROR_BIT = 0
+_POOL_FILTER_ERROR_BIT = 1
+_NUMBERED_ERROR_CODES = 100
+_AIRJET_ERROR_FIRST_BIT = 2
+_HYDROJET_ERROR_FIRST_BIT = _AIRJET_ERROR_FIRST_BIT + _NUMBERED_ERROR_CODES
+
+
+def _error_bit(code: str) -> int | None:
+    """Get the bit representing an error code in the error mask, if it has one."""
+    if code == "earth":
+        return _EARTH_ERROR_BIT
+    if code == "error":
+        return _POOL_FILTER_ERROR_BIT
+    if match := _AIRJET_ERROR_PATTERN.match(code):
+        first_bit = _AIRJET_ERROR_FIRST_BIT
+    elif match := _HYDROJET_ERROR_PATTERN.match(code):
+        first_bit = _HYDROJET_ERROR_FIRST_BIT
+    else:
+        raise ValueError(f"Unknown error code {code}")
+
+    # Longer codes would run into the range of the next family
+    if (number := int(match.group(1))) >= _NUMBERED_ERROR_CODES:
+        return None
+    return first_bit + number
+
+
+def _error_mask(codes: list[str]) -> str:
+    """Encode a set of error codes as a bitmask that does not depend on order.
+
+    The mask is too wide for a 64-bit integer, so it is given in hexadecimal.
+    """
+    mask = 0
+    for code in codes:
+        if (bit := _error_bit(code)) is not None:
+            mask |= 1 << bit
+    return f"{mask:x}"
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -42,30 +85,38 @@ async def async_setup_entry(
 ) -> None:
     """Set up binary sensor entities."""
     coordinator: WavespaUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
-    entities: list[WavespaEntity] = []
-
-    for device_id, device in coordinator.api.devices.items():
-        if device.device_type in [
-            WavespaDeviceType.WAVESPA_EU, WavespaDeviceType.WAVESPA_US,
-        ]:
-            entities.extend(
-                [
+    @callback
+    def async_add_devices(device_ids: list[str]) -> None:
+        entities: list[WavespaEntity] = []
+
+        for device_id in device_ids:
+            device_coordinator = coordinator.device_coordinators[device_id]
+            capabilities = device_coordinator.capabilities
+            if WavespaCapability.CONNECTIVITY in capabilities:
+                entities.append(
                     DeviceConnectivitySensor(
-                        coordinator,
+                        device_coordinator,
                         config_entry,
                         device_id,
                         _SPA_CONNECTIVITY_SENSOR_DESCRIPTION,
-                    ),
+                    )
+                )
+            if WavespaCapability.ERRORS in capabilities:
+                entities.append(
                     DeviceErrorsSensor(
-                        coordinator,
+                        device_coordinator,
                         config_entry,
                         device_id,
                         _SPA_ERRORS_SENSOR_DESCRIPTION,
-                    ),
-                ]
-            )
+                    )
+                )
 
-    async_add_entities(entities)
+        async_add_entities(entities)
+
+    async_add_devices(list(coordinator.device_coordinators))
+    config_entry.async_on_unload(
+        coordinator.async_add_device_listener(async_add_devices)
+    )
 
 
 class DeviceConnectivitySensor(WavespaEntity, BinarySensorEntity):
@@ -73,7 +124,7 @@ class DeviceConnectivitySensor(WavespaEntity, BinarySensorEntity):
 
     def __init__(
         self,
-        coordinator: WavespaUpdateCoordinator,
+        coordinator: WavespaDeviceCoordinator,
         config_entry: ConfigEntry,
         device_id: str,
         entity_description: BinarySensorEntityDescription,
@@ -102,9 +153,12 @@ class DeviceConnectivitySensor(WavespaEntity, BinarySensorEntity):
 class DeviceErrorsSensor(WavespaEntity, BinarySensorEntity):
     """Sensor to indicate an error state for all device types."""
 
+    # The active errors and error mask are enough to keep in the history
+    _unrecorded_attributes = frozenset({"errors"})
+
     def __init__(
         self,
-        coordinator: WavespaUpdateCoordinator,
+        coordinator: WavespaDeviceCoordinator,
         config_entry: ConfigEntry,
         device_id: str,
         entity_description: BinarySensorEntityDescription,
@@ -128,7 +182,7 @@ class DeviceErrorsSensor(WavespaEntity, BinarySensorEntity):
 
         # Airjet error properties
         for attr in self.status.attrs:
-            if re.match("system_err\\d+", attr):
+            if _AIRJET_ERROR_PATTERN.match(attr):
                 errors[attr] = bool(self.status.attrs[attr])
 
         # Airjet ground fault
@@ -142,7 +196,7 @@ class DeviceErrorsSensor(WavespaEntity, BinarySensorEntity):
             if attr == "E32":
                 continue
 
-            if re.match("E\\d{2}", attr):
+            if _HYDROJET_ERROR_PATTERN.match(attr):
                 errors[attr] = bool(self.status.attrs[attr])
 
         # Pool filter
@@ -151,14 +205,16 @@ class DeviceErrorsSensor(WavespaEntity, BinarySensorEntity):
 
         return errors
 
-    @property
-    def is_on(self) -> bool | None:
-        """Return true if the spa is reporting an error."""
+    def _derive_state(self) -> tuple[Any, ...]:
+        """Derive the active errors from the latest status."""
         errors = self._all_error_properties()
-        active_errors = {k: v for k, v in errors.items() if v}
-        return len(active_errors) > 0
-
-    @property
-    def extra_state_attributes(self) -> Mapping[str, Any] | None:
-        """Return more detailed error information."""
-        return self._all_error_properties()
+        active_errors = sorted(code for code, active in errors.items() if active)
+
+        self._attr_is_on = len(active_errors) > 0
+        self._attr_extra_state_attributes = {
+            "active_errors": active_errors,
+            "error_mask": _error_mask(active_errors),
+            "errors": errors,
+        }
+        # Changes to inactive error properties alone do not need a state write
+        return (self._attr_is_on, tuple(active_errors))
@@ -8,18 +8,24 @@ from homeassistant.components.climate import ClimateEntity, ClimateEntityFeature
 from homeassistant.components.climate.const import ATTR_HVAC_MODE, HVACAction, HVACMode
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_TEMPERATURE, PRECISION_WHOLE, UnitOfTemperature
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import WavespaUpdateCoordinator
-from .wavespa.model import WavespaDeviceType, HydrojetHeat
+from .coordinator import WavespaDeviceCoordinator, WavespaUpdateCoordinator
+from .wavespa.model import (
+    CURRENT_TEMPERATURE,
+    HEATER,
+    HYDROJET_HEAT,
+    TEMPERATURE_RANGE_C,
+    TEMPERATURE_RANGE_F,
+    TEMPERATURE_SETUP,
+    HydrojetHeat,
+    WavespaCapability,
+    WavespaDeviceType,
+)
 from .const import DOMAIN
 from .entity import WavespaEntity
 
-_SPA_MIN_TEMP_C = 20
-_SPA_MIN_TEMP_F = 68
-_SPA_MAX_TEMP_C = 40
-_SPA_MAX_TEMP_F = 104
 _CLIMATE_FEATURES = (
     ClimateEntityFeature.TARGET_TEMPERATURE
     | ClimateEntityFeature.TURN_OFF
@@ -35,15 +41,34 @@ async def async_setup_entry(
     """Set up climate entities."""
     coordinator: WavespaUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
 
-    entities: list[WavespaEntity] = []
+    @callback
+    def async_add_devices(device_ids: list[str]) -> None:
+        entities: list[WavespaEntity] = []
+
+        for device_id in device_ids:
+            device_coordinator = coordinator.device_coordinators[device_id]
+            if WavespaCapability.THERMOSTAT in device_coordinator.capabilities:
+                entities.append(
+                    AirjetSpaThermostat(device_coordinator, config_entry, device_id)
+                )
+
+        async_add_entities(entities)
+
+    async_add_devices(list(coordinator.device_coordinators))
+    config_entry.async_on_unload(
+        coordinator.async_add_device_listener(async_add_devices)
+    )
 
-    for device_id, device in coordinator.api.devices.items():
-        if device.device_type in [
-            WavespaDeviceType.WAVESPA_EU, WavespaDeviceType.WAVESPA_US,
-        ]:
-            entities.append(AirjetSpaThermostat(coordinator, config_entry, device_id))
 
-    async_add_entities(entities)
+def _temp_range(temperature_unit: str) -> tuple[int, int]:
+    """
+    Get the minimum and maximum temperatures that a user can set.
+
+    As the Spa can be switched between temperature units, this needs to be dynamic.
+    """
+    if temperature_unit == UnitOfTemperature.CELSIUS:
+        return TEMPERATURE_RANGE_C
+    return TEMPERATURE_RANGE_F
 
 
 class AirjetSpaThermostat(WavespaEntity, ClimateEntity):
@@ -58,7 +83,7 @@ class AirjetSpaThermostat(WavespaEntity, ClimateEntity):
 
     def __init__(
         self,
-        coordinator: WavespaUpdateCoordinator,
+        coordinator: WavespaDeviceCoordinator,
         config_entry: ConfigEntry,
         device_id: str,
     ) -> None:
@@ -66,80 +91,55 @@ class AirjetSpaThermostat(WavespaEntity, ClimateEntity):
         super().__init__(coordinator, config_entry, device_id)
         self._attr_unique_id = f"{device_id}_thermostat"
 
-    @property
-    def hvac_mode(self) -> HVACMode | None:
-        """Return the current mode (HEAT or OFF)."""
-        if not self.status:
-            return None
-        return HVACMode.HEAT if self.status.attrs["Heater"] else HVACMode.OFF
-
-    @property
-    def hvac_action(self) -> HVACAction | None:
-        """Return the current running action (HEATING or IDLE)."""
-        if not self.status:
-            return None
-        heat_on = self.status.attrs["Heater"]
-        target_reached = (int(self.status.attrs["Temperature_setup"]) == int(self.status.attrs["Current_temperature"]))
-        return (
-            HVACAction.HEATING if (heat_on and not target_reached) else HVACAction.IDLE
-        )
+    def _derive_state(self) -> tuple[Any, ...]:
+        """Derive the thermostat state from the latest status."""
+        if not (status := self.status):
+            self._attr_hvac_mode = None
+            self._attr_hvac_action = None
+            self._attr_current_temperature = None
+            self._attr_target_temperature = None
+            self._attr_temperature_unit = UnitOfTemperature.CELSIUS
+        else:
+            heat_on = bool(status.get(HEATER))
+            current_temperature = status.get(CURRENT_TEMPERATURE)
+            target_temperature = status.get(TEMPERATURE_SETUP)
+            target_reached = current_temperature == target_temperature
+            # The device is missing from the account while it is being removed
+            device = self.wavespa_device
+            device_type = device.device_type if device else None
+
+            self._attr_hvac_mode = HVACMode.HEAT if heat_on else HVACMode.OFF
+            self._attr_hvac_action = (
+                HVACAction.HEATING
+                if (heat_on and not target_reached)
+                else HVACAction.IDLE
+            )
+            self._attr_current_temperature = current_temperature
+            self._attr_target_temperature = target_temperature
+            # Default to Celsius for other device types
+            self._attr_temperature_unit = (
+                UnitOfTemperature.FAHRENHEIT
+                if device_type == WavespaDeviceType.WAVESPA_US
+                else UnitOfTemperature.CELSIUS
+            )
 
-    @property
-    def current_temperature(self) -> float | None:
-        """Return the current temperature."""
-        if not self.status:
-            return None
-        return int(self.status.attrs["Current_temperature"])
-
-    @property
-    def target_temperature(self) -> float | None:
-        """Return the temperature we try to reach."""
-        if not self.status:
-            return None
-        return int(self.status.attrs["Temperature_setup"])
-
-    @property
-    def temperature_unit(self) -> str:
-        """Return the unit of measurement used by the platform."""
-        if not self.status:
-            return str(UnitOfTemperature.CELSIUS)
-        device_type = self.coordinator.api.devices[self.device_id].device_type
-        if device_type == WavespaDeviceType.WAVESPA_US:
-            return str(UnitOfTemperature.FAHRENHEIT)
-        # Default to Celsius for other device types
-        return str(UnitOfTemperature.CELSIUS)
-
-    @property
-    def min_temp(self) -> float:
-        """
-        Get the minimum temperature that a user can set.
-
-        As the Spa can be switched between temperature units, this needs to be dynamic.
-        """
-        return (
-            _SPA_MIN_TEMP_C
-            if self.temperature_unit == UnitOfTemperature.CELSIUS
-            else _SPA_MIN_TEMP_F
+        self._attr_min_temp, self._attr_max_temp = _temp_range(
+            self._attr_temperature_unit
         )
-
-    @property
-    def max_temp(self) -> float:
-        """
-        Get the maximum temperature that a user can set.
-
-        As the Spa can be switched between temperature units, this needs to be dynamic.
-        """
         return (
-            _SPA_MAX_TEMP_C
-            if self.temperature_unit == UnitOfTemperature.CELSIUS
-            else _SPA_MAX_TEMP_F
+            self._attr_hvac_mode,
+            self._attr_hvac_action,
+            self._attr_current_temperature,
+            self._attr_target_temperature,
+            self._attr_temperature_unit,
         )
 
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
         """Set new target hvac mode."""
         should_heat = hvac_mode == HVACMode.HEAT
-        await self.coordinator.api.airjet_spa_set_heat(self.device_id, should_heat)
-        await self.coordinator.async_refresh()
+        with self.coordinator.api.tracer.trace("climate_set_hvac_mode", self.entity_id):
+            await self.coordinator.api.airjet_spa_set_heat(self.device_id, should_heat)
+            await self.coordinator.async_refresh_after_command()
 
     async def async_set_temperature(self, **kwargs: Any) -> None:
         """Set a new target temperature."""
@@ -147,14 +147,19 @@ class AirjetSpaThermostat(WavespaEntity, ClimateEntity):
         if target_temperature is None:
             return
 
-        if hvac_mode := kwargs.get(ATTR_HVAC_MODE):
-            should_heat = hvac_mode == HVACMode.HEAT
-            await self.coordinator.api.airjet_spa_set_heat(self.device_id, should_heat)
-
-        await self.coordinator.api.airjet_spa_set_target_temp(
-            self.device_id, target_temperature
-        )
-        await self.coordinator.async_refresh()
+        with self.coordinator.api.tracer.trace(
+            "climate_set_temperature", self.entity_id
+        ):
+            if hvac_mode := kwargs.get(ATTR_HVAC_MODE):
+                should_heat = hvac_mode == HVACMode.HEAT
+                await self.coordinator.api.airjet_spa_set_heat(
+                    self.device_id, should_heat
+                )
+
+            await self.coordinator.api.airjet_spa_set_target_temp(
+                self.device_id, target_temperature
+            )
+            await self.coordinator.async_refresh_after_command()
 
 
 class AirjetV01HydrojetSpaThermostat(WavespaEntity, ClimateEntity):
@@ -169,7 +174,7 @@ class AirjetV01HydrojetSpaThermostat(WavespaEntity, ClimateEntity):
 
     def __init__(
         self,
-        coordinator: WavespaUpdateCoordinator,
+        coordinator: WavespaDeviceCoordinator,
         config_entry: ConfigEntry,
         device_id: str,
     ) -> None:
@@ -177,70 +182,41 @@ class AirjetV01HydrojetSpaThermostat(WavespaEntity, ClimateEntity):
         super().__init__(coordinator, config_entry, device_id)
         self._attr_unique_id = f"{device_id}_thermostat"
 
-    @property
-    def hvac_mode(self) -> HVACMode | None:
-        """Return the current mode (HEAT or OFF)."""
-        if not self.status:
-            return None
-        return HVACMode.HEAT if self.status.attrs["heat"] == 3 else HVACMode.OFF
-
-    @property
-    def hvac_action(self) -> HVACAction | None:
-        """Return the current running action (HEATING or IDLE)."""
-        if not self.status:
-            return None
-        heat_on = self.status.attrs["heat"] == HydrojetHeat.ON
-        target_reached = self.status.attrs["word3"] == 1
-        return (
-            HVACAction.HEATING if (heat_on and not target_reached) else HVACAction.IDLE
-        )
-
-    @property
-    def current_temperature(self) -> float | None:
-        """Return the current temperature."""
-        if not self.status:
-            return None
-        return int(self.status.attrs["Tnow"])
-
-    @property
-    def target_temperature(self) -> float | None:
-        """Return the temperature we try to reach."""
-        if not self.status:
-            return None
-        return int(self.status.attrs["Tset"])
-
-    @property
-    def temperature_unit(self) -> str:
-        """Return the unit of measurement used by the platform."""
-        if not self.status or self.status.attrs["Tunit"]:
-            return str(UnitOfTemperature.CELSIUS)
+    def _derive_state(self) -> tuple[Any, ...]:
+        """Derive the thermostat state from the latest status."""
+        if not (status := self.status):
+            self._attr_hvac_mode = None
+            self._attr_hvac_action = None
+            self._attr_current_temperature = None
+            self._attr_target_temperature = None
+            self._attr_temperature_unit = UnitOfTemperature.CELSIUS
         else:
-            return str(UnitOfTemperature.FAHRENHEIT)
-
-    @property
-    def min_temp(self) -> float:
-        """
-        Get the minimum temperature that a user can set.
+            heat_on = status.get(HYDROJET_HEAT) == HydrojetHeat.ON
+            target_reached = status.attrs["word3"] == 1
+
+            self._attr_hvac_mode = HVACMode.HEAT if heat_on else HVACMode.OFF
+            self._attr_hvac_action = (
+                HVACAction.HEATING
+                if (heat_on and not target_reached)
+                else HVACAction.IDLE
+            )
+            self._attr_current_temperature = int(status.attrs["Tnow"])
+            self._attr_target_temperature = int(status.attrs["Tset"])
+            self._attr_temperature_unit = (
+                UnitOfTemperature.CELSIUS
+                if status.attrs["Tunit"]
+                else UnitOfTemperature.FAHRENHEIT
+            )
 
-        As the Spa can be switched between temperature units, this needs to be dynamic.
-        """
-        return (
-            _SPA_MIN_TEMP_C
-            if self.temperature_unit == UnitOfTemperature.CELSIUS
-            else _SPA_MIN_TEMP_F
+        self._attr_min_temp, self._attr_max_temp = _temp_range(
+            self._attr_temperature_unit
         )
-
-    @property
-    def max_temp(self) -> float:
-        """
-        Get the maximum temperature that a user can set.
-
-        As the Spa can be switched between temperature units, this needs to be dynamic.
-        """
         return (
-            _SPA_MAX_TEMP_C
-            if self.temperature_unit == UnitOfTemperature.CELSIUS
-            else _SPA_MAX_TEMP_F
+            self._attr_hvac_mode,
+            self._attr_hvac_action,
+            self._attr_current_temperature,
+            self._attr_target_temperature,
+            self._attr_temperature_unit,
         )
 
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
@@ -253,7 +229,7 @@ class AirjetV01HydrojetSpaThermostat(WavespaEntity, ClimateEntity):
             await self.coordinator.api.hydrojet_spa_set_heat(
                 self.device_id, HydrojetHeat.OFF
             )
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_refresh_after_command()
 
     async def async_set_temperature(self, **kwargs: Any) -> None:
         """Set a new target temperature."""
@@ -270,4 +246,4 @@ class AirjetV01HydrojetSpaThermostat(WavespaEntity, ClimateEntity):
         await self.coordinator.api.hydrojet_spa_set_target_temp(
             self.device_id, target_temperature
         )
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_refresh_after_command()
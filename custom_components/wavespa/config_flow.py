@@ -3,15 +3,22 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Mapping
+from dataclasses import dataclass
 from logging import getLogger
+from time import monotonic
 
 from typing import Any
 
-from aiohttp import ClientConnectionError
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
-from homeassistant.core import HomeAssistant
+from aiohttp import ClientConnectionError, ClientSession
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers import selector
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 import voluptuous as vol
 
@@ -20,10 +27,12 @@ from .wavespa.api import (
     WavespaIncorrectPasswordException,
     WavespaUserDoesNotExistException,
 )
+from .wavespa.model import WavespaUserToken
 from .const import (
+    CONF_API_LATENCY,
     CONF_API_ROOT,
-    CONF_API_ROOT_EU,
-    CONF_API_ROOT_US,
+    CONF_API_ROOTS,
+    CONF_HEDGE_REQUESTS,
     CONF_PASSWORD,
     CONF_USER_TOKEN,
     CONF_USER_TOKEN_EXPIRY,
@@ -36,37 +45,80 @@ _STEP_USER_DATA_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_USERNAME): str,
         vol.Required(CONF_PASSWORD): str,
-        vol.Required(CONF_API_ROOT): selector.SelectSelector(
-            selector.SelectSelectorConfig(
-                options=[
-                    selector.SelectOptionDict(value=CONF_API_ROOT_EU, label="EU"),
-                    selector.SelectOptionDict(value=CONF_API_ROOT_US, label="US"),
-                ]
-            )
-        ),
     }
 )
 
 
+@dataclass
+class ApiRootProbe:
+    """The outcome of logging in via one of the API roots."""
+
+    api_root: str
+    latency: float
+    token: WavespaUserToken | None = None
+    error: Exception | None = None
+
+
+async def _probe_api_root(
+    session: ClientSession, username: str, password: str, api_root: str
+) -> ApiRootProbe:
+    """Attempt to log in via the given API root, measuring the round trip time."""
+    start = monotonic()
+    try:
+        async with asyncio.timeout(10):
+            token = await WavespaApi.get_user_token(
+                session, username, password, api_root
+            )
+    except Exception as ex:  # pylint: disable=broad-except
+        return ApiRootProbe(api_root, monotonic() - start, error=ex)
+    return ApiRootProbe(api_root, monotonic() - start, token)
+
+
 async def validate_input(
-    hass: HomeAssistant, user_input: dict[str, Any]
+    hass: HomeAssistant, user_input: Mapping[str, Any]
 ) -> dict[str, Any]:
     """Validate the user input allows us to connect.
 
+    All API roots are probed concurrently, as an account is normally only known to
+    one region. Should more than one accept the login, the fastest is used.
+
     Returns data to be stored in the config entry.
     """
     username = user_input[CONF_USERNAME]
-    api_root = user_input[CONF_API_ROOT]
+    password = user_input[CONF_PASSWORD]
     session = async_get_clientsession(hass)
-    async with asyncio.timeout(10):
-        token = await WavespaApi.get_user_token(
-            session, username, user_input[CONF_PASSWORD], api_root
+    probes = await asyncio.gather(
+        *(
+            _probe_api_root(session, username, password, api_root)
+            for api_root in CONF_API_ROOTS
         )
-
-    config_entry_data = dict(user_input)
-    config_entry_data[CONF_USER_TOKEN] = token.user_token
-    config_entry_data[CONF_USER_TOKEN_EXPIRY] = token.expiry
-    return config_entry_data
+    )
+
+    valid_probes = [probe for probe in probes if probe.token is not None]
+    if not valid_probes:
+        errors = [probe.error for probe in probes if probe.error is not None]
+        # A wrong password is more useful to report than the account not existing
+        # in the other region, which is expected
+        for error in errors:
+            if isinstance(error, WavespaIncorrectPasswordException):
+                raise error
+        for error in errors:
+            if not isinstance(error, WavespaUserDoesNotExistException):
+                raise error
+        raise errors[0]
+
+    best = min(valid_probes, key=lambda probe: probe.latency)
+    assert best.token is not None
+    _LOGGER.debug("Using API root %s (%.3fs)", best.api_root, best.latency)
+
+    return {
+        CONF_USERNAME: username,
+        CONF_PASSWORD: password,
+        CONF_API_ROOT: best.api_root,
+        CONF_API_LATENCY: round(best.latency * 1000),
+        CONF_USER_TOKEN: best.token.user_token,
+        CONF_USER_TOKEN_EXPIRY: best.token.expiry,
+    }
 
 
 class WavespaConfigFlow(ConfigFlow, domain=DOMAIN):
@@ -74,6 +126,12 @@ class WavespaConfigFlow(ConfigFlow, domain=DOMAIN):
 
     VERSION = 2
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Get the options flow for this handler."""
+        return WavespaOptionsFlow(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -83,7 +141,44 @@ class WavespaConfigFlow(ConfigFlow, domain=DOMAIN):
                 step_id="user", data_schema=_STEP_USER_DATA_SCHEMA
             )
 
-        errors = {}
+        config_entry_data, errors = await self._async_validate(user_input)
+        if config_entry_data is not None:
+            return self.async_create_entry(
+                title=user_input[CONF_USERNAME], data=config_entry_data
+            )
+
+        return self.async_show_form(
+            step_id="user", data_schema=_STEP_USER_DATA_SCHEMA, errors=errors
+        )
+
+    async def async_step_reconfigure(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Probe the API roots again for an existing entry."""
+        entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
+        assert entry is not None
+
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            config_entry_data, errors = await self._async_validate(entry.data)
+            if config_entry_data is not None:
+                # The entry's update listener reloads it with the new data
+                self.hass.config_entries.async_update_entry(
+                    entry, data={**entry.data, **config_entry_data}
+                )
+                return self.async_abort(reason="reconfigure_successful")
+
+        return self.async_show_form(
+            step_id="reconfigure",
+            description_placeholders={"api_root": entry.data[CONF_API_ROOT]},
+            errors=errors,
+        )
+
+    async def _async_validate(
+        self, user_input: Mapping[str, Any]
+    ) -> tuple[dict[str, Any] | None, dict[str, str]]:
+        """Validate the credentials, returning either the entry data or form errors."""
+        errors: dict[str, str] = {}
 
         try:
             config_entry_data = await validate_input(self.hass, user_input)
@@ -97,12 +192,35 @@ class WavespaConfigFlow(ConfigFlow, domain=DOMAIN):
             _LOGGER.exception("Unexpected exception")
             errors["base"] = "unknown_connection_error"
         else:
-            return self.async_create_entry(
-                title=user_input[CONF_USERNAME], data=config_entry_data
-            )
+            return config_entry_data, errors
+
+        return None, errors
+
+
+class WavespaOptionsFlow(OptionsFlow):
+    """Handle the options of a wavespa entry."""
+
+    def __init__(self, config_entry: ConfigEntry) -> None:
+        """Create the options flow for an entry."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
 
         return self.async_show_form(
-            step_id="user", data_schema=_STEP_USER_DATA_SCHEMA, errors=errors
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_HEDGE_REQUESTS,
+                        default=self._entry.options.get(CONF_HEDGE_REQUESTS, False),
+                    ): bool,
+                }
+            ),
         )
 
 
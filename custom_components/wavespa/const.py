@@ -2,14 +2,30 @@
 
 from enum import Enum
 
+from .wavespa.model import BUBBLE, FILTER, HEATER, LOCKED, TEMPERATURE_SETUP
+
 DOMAIN = "wavespa"
 CONF_USERNAME = "username"
 CONF_PASSWORD = "password"
 CONF_API_ROOT = "apiroot"
 CONF_API_ROOT_EU = "https://euapi.gizwits.com"
 CONF_API_ROOT_US = "https://usapi.gizwits.com"
+CONF_API_ROOTS = [CONF_API_ROOT_EU, CONF_API_ROOT_US]
+CONF_API_LATENCY = "api_latency"
 CONF_USER_TOKEN = "user_token"
 CONF_USER_TOKEN_EXPIRY = "user_token_expiry"
+CONF_HEDGE_REQUESTS = "hedge_requests"
+
+SERVICE_APPLY_STATE = "apply_state"
+# Fields of the apply_state service, and the data points they set
+APPLY_STATE_DATA_POINTS = {
+    "heater": HEATER,
+    "filter": FILTER,
+    "bubble": BUBBLE,
+    "temperature_setup": TEMPERATURE_SETUP,
+    "locked": LOCKED,
+}
+WS_TYPE_HISTORY = "wavespa/history"
 
 
 class Icon(str, Enum):
@@ -18,8 +34,10 @@ class Icon(str, Enum):
     BUBBLES = "mdi:chart-bubble"
     FILTER = "mdi:image-filter-tilt-shift"
     HARDWARE = "mdi:chip"
+    HEATING = "mdi:thermometer-chevron-up"
     JETS = "mdi:turbine"
     LOCK = "mdi:lock"
+    LOAD = "mdi:speedometer"
     POWER = "mdi:power"
     PROTOCOL = "mdi:protocol"
     SOFTWARE = "mdi:application-braces"
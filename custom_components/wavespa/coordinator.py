@@ -1,19 +1,49 @@
-"""Data update coordinator for the Wavespa API."""
+"""Data update coordinators for the Wavespa API."""
 
 import asyncio
+from collections.abc import Callable
 from datetime import timedelta
 from logging import getLogger
 
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.const import Platform
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .wavespa.api import WavespaApi, WavespaApiResults
+from .const import DOMAIN
+from .watchdog import LoopWatchdog
+from .wavespa.api import WavespaApi, WavespaProbePendingException
+from .wavespa.heating import HeatingRateTracker
+from .wavespa.history import DeviceHistory
+from .wavespa.model import (
+    CURRENT_TEMPERATURE,
+    HEATER,
+    TEMPERATURE_SETUP,
+    WavespaCapability,
+    WavespaDevice,
+    WavespaDeviceStatus,
+    get_capabilities,
+)
 
 _LOGGER = getLogger(__name__)
+_BINDINGS_UPDATE_INTERVAL = timedelta(seconds=30)
+_DEVICE_UPDATE_INTERVAL = timedelta(seconds=30)
+# Time budget in seconds for each update, propagated to the API as a deadline
+_UPDATE_BUDGET = 10
+# Number of consecutive device list refreshes a device must be missing from before
+# it is removed, as the API has been seen to leave devices out of a single response
+_REMOVAL_REFRESHES = 5
 
 
-class WavespaUpdateCoordinator(DataUpdateCoordinator[WavespaApiResults]):
-    """Update coordinator that polls the device status for all devices in an account."""
+class WavespaUpdateCoordinator(DataUpdateCoordinator[dict[str, WavespaDevice]]):
+    """Update coordinator that polls the list of devices bound to an account.
+
+    Device status is polled separately by one WavespaDeviceCoordinator per device,
+    all of which share the same API instance. Devices added to or removed from the
+    account are picked up at runtime, without reloading the config entry. A device
+    missing from the device list is unavailable, and is only removed once it has
+    been missing from several consecutive refreshes.
+    """
 
     def __init__(self, hass: HomeAssistant, api: WavespaApi) -> None:
         """Initialize my coordinator."""
@@ -21,24 +51,222 @@ class WavespaUpdateCoordinator(DataUpdateCoordinator[WavespaApiResults]):
             hass,
             _LOGGER,
             name="Wavespa API",
-            update_interval=timedelta(seconds=30),
+            update_interval=_BINDINGS_UPDATE_INTERVAL,
+        )
+        self.api = api
+        self.device_coordinators: dict[str, WavespaDeviceCoordinator] = {}
+
+        # Number of consecutive refreshes each device has been missing from
+        self._missing_refreshes: dict[str, int] = {}
+
+        # Load on the event loop, shared with the device coordinators
+        self.watchdog = LoopWatchdog(hass.loop)
+
+        # Platforms set up for the config entry, based on device capabilities
+        self.platforms: set[Platform] = set()
+        self._device_listeners: list[Callable[[list[str]], None]] = []
+
+    @callback
+    def async_add_device_listener(
+        self, add_devices: Callable[[list[str]], None]
+    ) -> CALLBACK_TYPE:
+        """Register a callback to create entities for devices added to the account."""
+        self._device_listeners.append(add_devices)
+
+        @callback
+        def remove_listener() -> None:
+            self._device_listeners.remove(add_devices)
+
+        return remove_listener
+
+    async def _async_update_data(self) -> dict[str, WavespaDevice]:
+        """Refresh the device list, and set up or tear down any changed devices."""
+        self.watchdog.end_cycle()
+        deadline = self.hass.loop.time() + _UPDATE_BUDGET
+        refreshed = False
+        try:
+            await self.api.refresh_bindings(deadline)
+            refreshed = True
+        except Exception as ex:  # pylint: disable=broad-except
+            # Without an initial device list there is nothing to set up
+            if self.data is None:
+                raise UpdateFailed(f"Failed to fetch device list: {ex}") from ex
+
+            # Otherwise carry on with the devices we already know about
+            _LOGGER.debug("Failed to refresh bindings: %s", ex)
+
+        with self.watchdog.measure("post_processing"):
+            devices = self.api.devices
+            missing = []
+            if refreshed:
+                for device_id in self.device_coordinators:
+                    if device_id in devices:
+                        self._missing_refreshes.pop(device_id, None)
+                    elif device_id not in self._missing_refreshes:
+                        self._missing_refreshes[device_id] = 1
+                        missing.append(device_id)
+                    else:
+                        self._missing_refreshes[device_id] += 1
+            removed = [
+                did
+                for did, refreshes in self._missing_refreshes.items()
+                if refreshes >= _REMOVAL_REFRESHES
+            ]
+            added = [did for did in devices if did not in self.device_coordinators]
+
+        # Entities of missing devices become unavailable straight away
+        for device_id in missing:
+            self.device_coordinators[device_id].async_update_listeners()
+
+        for device_id in removed:
+            await self._async_remove_device(device_id)
+
+        for device_id in added:
+            self.device_coordinators[device_id] = WavespaDeviceCoordinator(
+                self.hass, self.api, self.watchdog, device_id
+            )
+
+        if added:
+            # New devices are refreshed concurrently, and a device that fails to
+            # respond only leaves its own entities unavailable until it next succeeds
+            await asyncio.gather(
+                *(self.device_coordinators[did].async_refresh() for did in added)
+            )
+            for device_id in added:
+                self.device_coordinators[device_id].async_update_capabilities()
+            for add_devices in self._device_listeners:
+                add_devices(added)
+
+        return devices
+
+    async def _async_remove_device(self, device_id: str) -> None:
+        """Stop polling a device that is no longer in the account, and forget it."""
+        _LOGGER.info("Device %s has been removed from the account", device_id)
+        self._missing_refreshes.pop(device_id, None)
+        await self.device_coordinators.pop(device_id).async_shutdown()
+
+        # Removing the device from the registry also removes its entities
+        device_registry = dr.async_get(self.hass)
+        device = device_registry.async_get_device(identifiers={(DOMAIN, device_id)})
+        if device and self.config_entry:
+            device_registry.async_update_device(
+                device.id, remove_config_entry_id=self.config_entry.entry_id
+            )
+
+
+class WavespaDeviceCoordinator(DataUpdateCoordinator[WavespaDeviceStatus | None]):
+    """Update coordinator that polls the status of a single device.
+
+    Each device has its own interval and failure state, so a slow or failing spa
+    does not hold back updates for the rest of the account.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: WavespaApi,
+        watchdog: LoopWatchdog,
+        device_id: str,
+    ) -> None:
+        """Initialize the coordinator for the given device."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"Wavespa device {device_id}",
+            update_interval=_DEVICE_UPDATE_INTERVAL,
         )
         self.api = api
+        self.watchdog = watchdog
+        self.device_id = device_id
+        self.capabilities = WavespaCapability.NONE
+
+        # Recent temperature readings, from which the heating rate is estimated, and
+        # a longer history served to dashboards
+        self.heating = HeatingRateTracker()
+        self.history = DeviceHistory()
+
+    @callback
+    def async_update_capabilities(self) -> None:
+        """Work out the capabilities of the device, based on its latest status.
+
+        This is done once when the device is set up, so that entity creation does
+        not depend on which attributes happen to appear in later updates.
+        """
+        device = self.api.devices[self.device_id]
+        attrs = self.data.attrs if self.data else None
+        self.capabilities = get_capabilities(device.device_type, attrs)
 
-    ## fix from https://github.com/cdpuk/ha-bestway/issues/86
-    async def _async_update_data(self) -> WavespaApiResults:
-        """Fetch data from API endpoint.
+    async def async_refresh_after_command(self) -> None:
+        """Publish the state written by a command, then verify it with the API.
 
-        This is the place to pre-process the data to lookup tables
-        so entities can quickly look up their data.
+        Only the entities of this device are updated, and verification costs a
+        single request. Verification is debounced, so a burst of commands results
+        in as few requests as possible.
         """
-        async with asyncio.timeout(10):
-            try:
-                await self.api.refresh_bindings()
-            except Exception as e:
-                # Log the error if necessary or just pass to silently ignore
-                # You can log it with your logging system like:
-                # _LOGGER.error(f"Failed to refresh bindings: {e}")
-                pass  # Ignore failures on refresh_bindings
-
-            return await self.api.fetch_data()
+        with self.api.tracer.span("optimistic_update"):
+            self.async_set_updated_data(self.api.get_cached_status(self.device_id))
+        with self.api.tracer.span("refresh"):
+            await self.async_request_refresh()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all entities of the device, timing the fan-out."""
+        with self.watchdog.measure("fan_out"):
+            super().async_update_listeners()
+
+    async def _async_update_data(self) -> WavespaDeviceStatus | None:
+        """Fetch the latest status of the device.
+
+        After a failure, polling of this device backs off according to the kind of
+        error reported by the API. The normal interval resumes after a success.
+        Either interval is stretched while the watchdog is shedding load.
+        """
+        self.watchdog.probe_lag()
+        interval = _DEVICE_UPDATE_INTERVAL * self.watchdog.shed_factor
+        deadline = self.hass.loop.time() + _UPDATE_BUDGET
+        try:
+            status = await self.api.fetch_device(self.device_id, deadline)
+        except Exception as ex:  # pylint: disable=broad-except
+            # No request is made while an offline device waits for its next probe,
+            # so the outcome of the last probe stands rather than failing each time
+            if (
+                isinstance(ex, WavespaProbePendingException)
+                and self.last_update_success
+            ):
+                self.update_interval = interval
+                return self.data
+
+            if health := self.api.health.get(self.device_id):
+                interval = max(interval, timedelta(seconds=health.backoff))
+            self.update_interval = interval
+            raise UpdateFailed(f"Failed to fetch device status: {ex}") from ex
+
+        self.update_interval = interval
+        if status and (temperature := status.get(CURRENT_TEMPERATURE)) is not None:
+            heater = bool(status.get(HEATER))
+            self.heating.add(status.timestamp, temperature, heater)
+            self.history.add(
+                status.timestamp, temperature, status.get(TEMPERATURE_SETUP), heater
+            )
+        return status
+
+
+@callback
+def async_get_device_coordinator(
+    hass: HomeAssistant, device_id: str
+) -> WavespaDeviceCoordinator | None:
+    """Find the coordinator for a device in the device registry."""
+    if (device := dr.async_get(hass).async_get(device_id)) is None:
+        return None
+
+    for domain, wavespa_device_id in device.identifiers:
+        if domain != DOMAIN:
+            continue
+        for entry_id in device.config_entries:
+            coordinator: WavespaUpdateCoordinator | None = hass.data.get(
+                DOMAIN, {}
+            ).get(entry_id)
+            if coordinator and wavespa_device_id in coordinator.device_coordinators:
+                return coordinator.device_coordinators[wavespa_device_id]
+
+    return None
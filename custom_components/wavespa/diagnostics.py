@@ -0,0 +1,53 @@
+"""Diagnostics support for wavespa."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .coordinator import WavespaUpdateCoordinator
+from .const import CONF_PASSWORD, CONF_USER_TOKEN, CONF_USERNAME, DOMAIN
+
+# The entry title is the username of the account
+_TO_REDACT = {CONF_PASSWORD, CONF_USER_TOKEN, CONF_USERNAME, "title"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: WavespaUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    api = coordinator.api
+
+    # Device IDs are deliberately left out, as they can be used to control the device
+    devices = []
+    for device_id, device in api.devices.items():
+        health = api.health.get(device_id)
+        devices.append(
+            {
+                "product_name": device.product_name,
+                "protocol_version": device.protocol_version,
+                "is_online": device.is_online,
+                "health": asdict(health) if health else None,
+            }
+        )
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), _TO_REDACT),
+        "circuit_breaker": api.circuit_breaker.as_dict(),
+        "command_latency_ms": api.tracer.summary(),
+        "hedging": api.hedger.as_dict() if api.hedger else None,
+        "watchdog": {
+            "lag_ms": round(coordinator.watchdog.lag * 1000, 1),
+            "last_cycle_ms": {
+                stage: round(duration * 1000, 1)
+                for stage, duration in coordinator.watchdog.last_cycle.items()
+            },
+            "shed_factor": coordinator.watchdog.shed_factor,
+        },
+        "devices": devices,
+    }
@@ -2,21 +2,33 @@
 
 from __future__ import annotations
 
+from datetime import datetime
+from typing import Any
+
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, callback
 from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from . import WavespaUpdateCoordinator
-from .wavespa.model import WavespaDevice, WavespaDeviceStatus
 from .const import DOMAIN
+from .coordinator import WavespaDeviceCoordinator
+from .wavespa.model import WavespaDevice, WavespaDeviceStatus
+from .wavespa.tracing import current_correlation_id
+
+# While shedding load, state writes from polls are collapsed over this many seconds
+_COLLAPSE_DELAY = 5
 
 
-class WavespaEntity(CoordinatorEntity[WavespaUpdateCoordinator]):
+class WavespaEntity(CoordinatorEntity[WavespaDeviceCoordinator]):
     """Wavespa base entity type."""
 
+    _snapshot: tuple[Any, ...] | None = None
+    _collapsed_write: CALLBACK_TYPE | None = None
+
     def __init__(
         self,
-        coordinator: WavespaUpdateCoordinator,
+        coordinator: WavespaDeviceCoordinator,
         config_entry: ConfigEntry,
         device_id: str,
     ) -> None:
@@ -47,11 +59,65 @@ class WavespaEntity(CoordinatorEntity[WavespaUpdateCoordinator]):
     @property
     def status(self) -> WavespaDeviceStatus | None:
         """Get status data for the spa providing this entity."""
-        status: WavespaDeviceStatus | None = self.coordinator.data.devices.get(
-            self.device_id
-        )
+        status: WavespaDeviceStatus | None = self.coordinator.data
         return status
 
+    def _derive_state(self) -> tuple[Any, ...] | None:
+        """Derive the _attr_ values of the entity from the latest status.
+
+        Entities that precompute their state return the derived values, so that
+        updates which do not change them can skip the state write. The default
+        returns None, meaning the state is computed on access and always written.
+        """
+        return None
+
+    def _take_snapshot(self) -> tuple[Any, ...] | None:
+        """Derive the entity state and return the values it depends on."""
+        derived = self._derive_state()
+        return None if derived is None else (self.available, derived)
+
+    async def async_added_to_hass(self) -> None:
+        """Derive the initial state when added to hass."""
+        await super().async_added_to_hass()
+        self._snapshot = self._take_snapshot()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel any collapsed state write when removed from hass."""
+        await super().async_will_remove_from_hass()
+        if self._collapsed_write:
+            self._collapsed_write()
+            self._collapsed_write = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the derived values have changed.
+
+        While the watchdog is shedding load, updates from polls are collapsed into
+        a single delayed write. Updates caused by commands are written straight away.
+        """
+        snapshot = self._take_snapshot()
+        if snapshot is not None and snapshot == self._snapshot:
+            return
+        self._snapshot = snapshot
+
+        if self.coordinator.watchdog.shedding and current_correlation_id() is None:
+            if self._collapsed_write is None:
+                self._collapsed_write = async_call_later(
+                    self.hass, _COLLAPSE_DELAY, self._async_write_collapsed
+                )
+            return
+
+        with self.coordinator.watchdog.measure("state_writes"):
+            super()._handle_coordinator_update()
+        self.coordinator.api.tracer.mark_visible(self.entity_id)
+
+    @callback
+    def _async_write_collapsed(self, _now: datetime) -> None:
+        """Write the latest state after collapsing updates."""
+        self._collapsed_write = None
+        with self.coordinator.watchdog.measure("state_writes"):
+            self.async_write_ha_state()
+
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
@@ -8,7 +8,7 @@ from homeassistant.const import UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import WavespaUpdateCoordinator
+from .coordinator import WavespaDeviceCoordinator
 from .const import DOMAIN
 from .entity import WavespaEntity
 
@@ -37,7 +37,7 @@ class PoolFilterTimeNumber(WavespaEntity, NumberEntity):
 
     def __init__(
         self,
-        coordinator: WavespaUpdateCoordinator,
+        coordinator: WavespaDeviceCoordinator,
         config_entry: ConfigEntry,
         device_id: str,
         description: NumberEntityDescription,
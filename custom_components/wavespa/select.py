@@ -12,10 +12,11 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from custom_components.wavespa.wavespa.api import WavespaApi
 
-from . import WavespaUpdateCoordinator
+from .coordinator import WavespaDeviceCoordinator
 from .wavespa.model import (
-    AIRJET_V01_BUBBLES_MAP,
-    HYDROJET_BUBBLES_MAP,
+    AIRJET_V01_BUBBLES,
+    HYDROJET_BUBBLES,
+    WavespaDeviceStatus,
     WavespaDeviceType,
     BubblesLevel,
 )
@@ -34,7 +35,7 @@ class BubblesRequiredKeys:
     """Mixin for required keys."""
 
     set_fn: Callable[[WavespaApi, str, BubblesLevel], Awaitable[None]]
-    get_fn: Callable[[int], BubblesLevel]
+    get_fn: Callable[[WavespaDeviceStatus], BubblesLevel]
 
 
 @dataclass(frozen=True)
@@ -59,7 +60,7 @@ class ThreeWaySpaBubblesSelect(WavespaEntity, SelectEntity):
 
     def __init__(
         self,
-        coordinator: WavespaUpdateCoordinator,
+        coordinator: WavespaDeviceCoordinator,
         config_entry: ConfigEntry,
         device_id: str,
         description: BubblesSelectEntityDescription,
@@ -72,8 +73,8 @@ class ThreeWaySpaBubblesSelect(WavespaEntity, SelectEntity):
     @property
     def current_option(self) -> str | None:
         """Return the selected entity option."""
-        if device := self.coordinator.data.devices.get(self.device_id):
-            bubbles_level = self.entity_description.get_fn(device.attrs["Bubble"])
+        if device := self.coordinator.data:
+            bubbles_level = self.entity_description.get_fn(device)
             return _BUBBLES_OPTIONS.get(bubbles_level)
         return None
 
@@ -2,20 +2,36 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable
+from collections.abc import Callable, Mapping
 from dataclasses import dataclass
+from typing import Any
 
-from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import UnitOfTime
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from . import WavespaUpdateCoordinator
+from .coordinator import WavespaDeviceCoordinator, WavespaUpdateCoordinator
 from .const import DOMAIN, Icon
 from .entity import WavespaEntity
-from .wavespa.model import WavespaDevice, WavespaDeviceType
+from .watchdog import STAGES, LoopWatchdog
+from .wavespa.model import (
+    CURRENT_TEMPERATURE,
+    HEATER,
+    TEMPERATURE_SETUP,
+    WavespaCapability,
+    WavespaDevice,
+    WavespaDeviceType,
+)
 
 
 @dataclass
@@ -26,6 +42,62 @@ class DeviceSensorDescription:
     value_fn: Callable[[WavespaDevice], StateType]
 
 
+@dataclass
+class WatchdogSensorDescription:
+    """An entity description with functions that derive values from the watchdog."""
+
+    entity_description: SensorEntityDescription
+    value_fn: Callable[[LoopWatchdog], StateType]
+    attributes_fn: Callable[[LoopWatchdog], Mapping[str, Any]] | None = None
+
+
+_WATCHDOG_SENSORS = [
+    WatchdogSensorDescription(
+        SensorEntityDescription(
+            key="event_loop_lag",
+            name="Wavespa Event Loop Lag",
+            icon=Icon.LOAD,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            device_class=SensorDeviceClass.DURATION,
+            state_class=SensorStateClass.MEASUREMENT,
+            native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        ),
+        lambda watchdog: round(watchdog.lag * 1000, 1),
+    ),
+    WatchdogSensorDescription(
+        SensorEntityDescription(
+            key="update_cycle_time",
+            name="Wavespa Update Cycle Time",
+            icon=Icon.LOAD,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            device_class=SensorDeviceClass.DURATION,
+            state_class=SensorStateClass.MEASUREMENT,
+            native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        ),
+        # State writes are part of the fan-out, unless collapsed
+        lambda watchdog: round(
+            (watchdog.last_cycle["post_processing"] + watchdog.last_cycle["fan_out"])
+            * 1000,
+            1,
+        ),
+        lambda watchdog: {
+            f"{stage}_ms": round(watchdog.last_cycle[stage] * 1000, 1)
+            for stage in STAGES
+        },
+    ),
+    WatchdogSensorDescription(
+        SensorEntityDescription(
+            key="load_shedding_factor",
+            name="Wavespa Load Shedding Factor",
+            icon=Icon.LOAD,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            state_class=SensorStateClass.MEASUREMENT,
+        ),
+        lambda watchdog: watchdog.shed_factor,
+    ),
+]
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -33,107 +105,130 @@ async def async_setup_entry(
 ) -> None:
     """Add sensors for passed config_entry in HA."""
     coordinator: WavespaUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
-    entities: list[WavespaEntity] = []
-
-    for device_id, device_info in coordinator.api.devices.items():
-        name_prefix = "Default"
-        if device_info.device_type in [
-            WavespaDeviceType.WAVESPA_EU, WavespaDeviceType.WAVESPA_US,
-        ]:
-
-            name_prefix = "WaveSpa"
-
-        entities.extend(
-            [
-                DeviceSensor(
-                    coordinator,
-                    config_entry,
-                    device_id,
-                    sensor_description=DeviceSensorDescription(
-                        SensorEntityDescription(
-                            key="protocol_version",
-                            name=f"{name_prefix} Protocol Version",
-                            icon=Icon.PROTOCOL,
-                            entity_category=EntityCategory.DIAGNOSTIC,
+
+    @callback
+    def async_add_devices(device_ids: list[str]) -> None:
+        entities: list[WavespaEntity] = []
+
+        for device_id in device_ids:
+            device_coordinator = coordinator.device_coordinators[device_id]
+            if WavespaCapability.DEVICE_INFO not in device_coordinator.capabilities:
+                continue
+
+            device_info = coordinator.api.devices[device_id]
+            name_prefix = "Default"
+            if device_info.device_type in [
+                WavespaDeviceType.WAVESPA_EU, WavespaDeviceType.WAVESPA_US,
+            ]:
+
+                name_prefix = "WaveSpa"
+
+            entities.extend(
+                [
+                    DeviceSensor(
+                        device_coordinator,
+                        config_entry,
+                        device_id,
+                        sensor_description=DeviceSensorDescription(
+                            SensorEntityDescription(
+                                key="protocol_version",
+                                name=f"{name_prefix} Protocol Version",
+                                icon=Icon.PROTOCOL,
+                                entity_category=EntityCategory.DIAGNOSTIC,
+                            ),
+                            lambda device: device.protocol_version,
                         ),
-                        lambda device: device.protocol_version,
                     ),
-                ),
-                DeviceSensor(
-                    coordinator,
-                    config_entry,
-                    device_id,
-                    sensor_description=DeviceSensorDescription(
-                        SensorEntityDescription(
-                            key="mcu_soft_version",
-                            name=f"{name_prefix} MCU Software Version",
-                            icon=Icon.SOFTWARE,
-                            entity_category=EntityCategory.DIAGNOSTIC,
+                    DeviceSensor(
+                        device_coordinator,
+                        config_entry,
+                        device_id,
+                        sensor_description=DeviceSensorDescription(
+                            SensorEntityDescription(
+                                key="mcu_soft_version",
+                                name=f"{name_prefix} MCU Software Version",
+                                icon=Icon.SOFTWARE,
+                                entity_category=EntityCategory.DIAGNOSTIC,
+                            ),
+                            lambda device: device.mcu_soft_version,
                         ),
-                        lambda device: device.mcu_soft_version,
                     ),
-                ),
-                DeviceSensor(
-                    coordinator,
-                    config_entry,
-                    device_id,
-                    sensor_description=DeviceSensorDescription(
-                        SensorEntityDescription(
-                            key="mcu_hard_version",
-                            name=f"{name_prefix} MCU Hardware Version",
-                            icon=Icon.HARDWARE,
-                            entity_category=EntityCategory.DIAGNOSTIC,
+                    DeviceSensor(
+                        device_coordinator,
+                        config_entry,
+                        device_id,
+                        sensor_description=DeviceSensorDescription(
+                            SensorEntityDescription(
+                                key="mcu_hard_version",
+                                name=f"{name_prefix} MCU Hardware Version",
+                                icon=Icon.HARDWARE,
+                                entity_category=EntityCategory.DIAGNOSTIC,
+                            ),
+                            lambda device: device.mcu_hard_version,
                         ),
-                        lambda device: device.mcu_hard_version,
                     ),
-                ),
-                DeviceSensor(
-                    coordinator,
-                    config_entry,
-                    device_id,
-                    sensor_description=DeviceSensorDescription(
-                        SensorEntityDescription(
-                            key="wifi_soft_version",
-                            name=f"{name_prefix} Wi-Fi Software Version",
-                            icon=Icon.SOFTWARE,
-                            entity_category=EntityCategory.DIAGNOSTIC,
+                    DeviceSensor(
+                        device_coordinator,
+                        config_entry,
+                        device_id,
+                        sensor_description=DeviceSensorDescription(
+                            SensorEntityDescription(
+                                key="wifi_soft_version",
+                                name=f"{name_prefix} Wi-Fi Software Version",
+                                icon=Icon.SOFTWARE,
+                                entity_category=EntityCategory.DIAGNOSTIC,
+                            ),
+                            lambda device: device.wifi_soft_version,
                         ),
-                        lambda device: device.wifi_soft_version,
                     ),
-                ),
-                DeviceSensor(
-                    coordinator,
-                    config_entry,
-                    device_id,
-                    sensor_description=DeviceSensorDescription(
-                        SensorEntityDescription(
-                            key="wifi_hard_version",
-                            name=f"{name_prefix} Wi-Fi Hardware Version",
-                            icon=Icon.HARDWARE,
-                            entity_category=EntityCategory.DIAGNOSTIC,
+                    DeviceSensor(
+                        device_coordinator,
+                        config_entry,
+                        device_id,
+                        sensor_description=DeviceSensorDescription(
+                            SensorEntityDescription(
+                                key="wifi_hard_version",
+                                name=f"{name_prefix} Wi-Fi Hardware Version",
+                                icon=Icon.HARDWARE,
+                                entity_category=EntityCategory.DIAGNOSTIC,
+                            ),
+                            lambda device: device.wifi_hard_version,
                         ),
-                        lambda device: device.wifi_hard_version,
                     ),
-                ),
-                DeviceSensor(
-                    coordinator,
-                    config_entry,
-                    device_id,
-                    sensor_description=DeviceSensorDescription(
-                        SensorEntityDescription(
-                            key="percent_filter",
-                            name=f"{name_prefix} Filter",
-                            icon=Icon.HARDWARE,
-                            entity_category=EntityCategory.DIAGNOSTIC,
-                            native_unit_of_measurement="%",
+                    DeviceSensor(
+                        device_coordinator,
+                        config_entry,
+                        device_id,
+                        sensor_description=DeviceSensorDescription(
+                            SensorEntityDescription(
+                                key="percent_filter",
+                                name=f"{name_prefix} Filter",
+                                icon=Icon.HARDWARE,
+                                entity_category=EntityCategory.DIAGNOSTIC,
+                                native_unit_of_measurement="%",
+                            ),
+                            lambda device: device.time_percent,
                         ),
-                        lambda device: device.time_percent,
                     ),
-                ),
-            ]
-        )
+                ]
+            )
+            if WavespaCapability.THERMOSTAT in device_coordinator.capabilities:
+                entities.append(
+                    HeatingEtaSensor(
+                        device_coordinator, config_entry, device_id, name_prefix
+                    )
+                )
+
+        async_add_entities(entities)
 
-    async_add_entities(entities)
+    async_add_entities(
+        WatchdogSensor(coordinator, config_entry, description)
+        for description in _WATCHDOG_SENSORS
+    )
+    async_add_devices(list(coordinator.device_coordinators))
+    config_entry.async_on_unload(
+        coordinator.async_add_device_listener(async_add_devices)
+    )
 
 
 class DeviceSensor(WavespaEntity, SensorEntity):
@@ -143,7 +238,7 @@ class DeviceSensor(WavespaEntity, SensorEntity):
 
     def __init__(
         self,
-        coordinator: WavespaUpdateCoordinator,
+        coordinator: WavespaDeviceCoordinator,
         config_entry: ConfigEntry,
         device_id: str,
         sensor_description: DeviceSensorDescription,
@@ -160,3 +255,78 @@ class DeviceSensor(WavespaEntity, SensorEntity):
         if (device := self.wavespa_device) is not None:
             return self.sensor_description.value_fn(device)
         return None
+
+
+class HeatingEtaSensor(WavespaEntity, SensorEntity):
+    """A sensor estimating how long the spa will take to reach its target temperature.
+
+    The estimate is based on the heating rate tracked by the device coordinator, so
+    no history needs to be queried.
+    """
+
+    def __init__(
+        self,
+        coordinator: WavespaDeviceCoordinator,
+        config_entry: ConfigEntry,
+        device_id: str,
+        name_prefix: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, config_entry, device_id)
+        self.entity_description = SensorEntityDescription(
+            key="time_to_target",
+            name=f"{name_prefix} Time To Target Temperature",
+            icon=Icon.HEATING,
+            device_class=SensorDeviceClass.DURATION,
+            native_unit_of_measurement=UnitOfTime.MINUTES,
+        )
+        self._attr_unique_id = f"{device_id}_{self.entity_description.key}"
+
+    def _derive_state(self) -> tuple[Any, ...]:
+        """Derive the estimated minutes to target, and the heating rate."""
+        heating = self.coordinator.heating
+        minutes = None
+        if (status := self.status) is not None and status.get(HEATER):
+            temperature = status.get(CURRENT_TEMPERATURE)
+            target = status.get(TEMPERATURE_SETUP)
+            if temperature is not None and target is not None:
+                seconds = heating.time_to_target(temperature, target)
+                minutes = None if seconds is None else round(seconds / 60)
+
+        rate = None if heating.rate is None else round(heating.rate, 2)
+        self._attr_native_value = minutes
+        # In the spa's own temperature unit, per hour
+        self._attr_extra_state_attributes = {"heating_rate": rate}
+        return (minutes, rate)
+
+
+class WatchdogSensor(CoordinatorEntity[WavespaUpdateCoordinator], SensorEntity):
+    """A sensor reporting the load the integration puts on the event loop."""
+
+    sensor_description: WatchdogSensorDescription
+
+    def __init__(
+        self,
+        coordinator: WavespaUpdateCoordinator,
+        config_entry: ConfigEntry,
+        sensor_description: WatchdogSensorDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.sensor_description = sensor_description
+        self.entity_description = sensor_description.entity_description
+        self._attr_unique_id = f"{config_entry.entry_id}_{self.entity_description.key}"
+        # There is one of each sensor per account
+        self._attr_name = f"{config_entry.title} {self.entity_description.name}"
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the relevant measurement."""
+        return self.sensor_description.value_fn(self.coordinator.watchdog)
+
+    @property
+    def extra_state_attributes(self) -> Mapping[str, Any] | None:
+        """Return a breakdown of the measurement, if there is one."""
+        if self.sensor_description.attributes_fn is None:
+            return None
+        return self.sensor_description.attributes_fn(self.coordinator.watchdog)
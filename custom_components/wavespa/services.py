@@ -0,0 +1,112 @@
+"""Services for the wavespa integration."""
+
+from __future__ import annotations
+
+import asyncio
+from logging import getLogger
+from typing import Any
+
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+import voluptuous as vol
+
+from .const import APPLY_STATE_DATA_POINTS, DOMAIN, SERVICE_APPLY_STATE
+from .coordinator import async_get_device_coordinator
+from .wavespa.model import (
+    TEMPERATURE_SETUP,
+    WavespaDeviceType,
+    get_temperature_range,
+)
+
+_LOGGER = getLogger(__name__)
+
+# Limits the number of devices being controlled at the same time
+_MAX_PARALLEL_DEVICES = 4
+
+_APPLY_STATE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("heater"): cv.boolean,
+        vol.Optional("filter"): cv.boolean,
+        vol.Optional("bubble"): cv.boolean,
+        vol.Optional("temperature_setup"): vol.All(
+            vol.Coerce(int),
+            vol.Range(
+                min=TEMPERATURE_SETUP.min_value, max=TEMPERATURE_SETUP.max_value
+            ),
+        ),
+        vol.Optional("locked"): cv.boolean,
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def async_apply_state(call: ServiceCall) -> ServiceResponse:
+        """Apply a set of attributes to many spas, one command per spa."""
+        values = {
+            point: call.data[field]
+            for field, point in APPLY_STATE_DATA_POINTS.items()
+            if field in call.data
+        }
+        if not values:
+            raise ServiceValidationError("No attributes to apply were given")
+
+        semaphore = asyncio.Semaphore(_MAX_PARALLEL_DEVICES)
+
+        async def apply(device_id: str) -> dict[str, Any]:
+            if (coordinator := async_get_device_coordinator(hass, device_id)) is None:
+                return {"success": False, "error": "Not a Wavespa device"}
+
+            # The schema allows any temperature in either unit, but each spa only
+            # accepts the range of the unit it reports
+            if (target := values.get(TEMPERATURE_SETUP)) is not None:
+                device = coordinator.api.devices.get(coordinator.device_id)
+                min_temp, max_temp = get_temperature_range(
+                    device.device_type if device else WavespaDeviceType.UNKNOWN
+                )
+                if not min_temp <= target <= max_temp:
+                    return {
+                        "success": False,
+                        "error": (
+                            f"temperature_setup must be between {min_temp} and "
+                            f"{max_temp} for this spa"
+                        ),
+                    }
+
+            with coordinator.api.tracer.trace("apply_state"):
+                async with semaphore:
+                    try:
+                        await coordinator.api.apply_state(
+                            coordinator.device_id, values
+                        )
+                    except Exception as ex:  # pylint: disable=broad-except
+                        _LOGGER.warning(
+                            "Failed to apply state to %s: %s", device_id, ex
+                        )
+                        return {"success": False, "error": str(ex)}
+
+                await coordinator.async_refresh_after_command()
+            return {"success": True}
+
+        device_ids: list[str] = call.data[ATTR_DEVICE_ID]
+        results = await asyncio.gather(*(apply(device_id) for device_id in device_ids))
+        return {"devices": dict(zip(device_ids, results))}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_APPLY_STATE,
+        async_apply_state,
+        schema=_APPLY_STATE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
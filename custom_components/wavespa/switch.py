@@ -9,12 +9,19 @@ from typing import Any
 
 from homeassistant.components.switch import SwitchEntity, SwitchEntityDescription
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import WavespaUpdateCoordinator
+from .coordinator import WavespaDeviceCoordinator, WavespaUpdateCoordinator
 from .wavespa.api import WavespaApi
-from .wavespa.model import WavespaDeviceStatus, WavespaDeviceType
+from .wavespa.model import (
+    BUBBLE,
+    FILTER,
+    HEATER,
+    LOCKED,
+    WavespaCapability,
+    WavespaDeviceStatus,
+)
 from .const import DOMAIN, Icon
 from .entity import WavespaEntity
 
@@ -23,7 +30,8 @@ from .entity import WavespaEntity
 class SwitchFunctionsMixin:
     """Functions for spa devices."""
 
-    value_fn: Callable[[WavespaDeviceStatus], bool]
+    capability: WavespaCapability
+    value_fn: Callable[[WavespaDeviceStatus], bool | None]
     turn_on_fn: Callable[[WavespaApi, str], Awaitable[None]]
     turn_off_fn: Callable[[WavespaApi, str], Awaitable[None]]
 
@@ -34,41 +42,52 @@ class WavespaSwitchEntityDescription(SwitchEntityDescription, SwitchFunctionsMix
 
 
 _AIRJET_SPA_POWER_SWITCH = WavespaSwitchEntityDescription(
-    key="Heater",
+    key=HEATER.key,
+    capability=WavespaCapability.HEATER,
     name="Heater",
     icon=Icon.POWER,
-    value_fn=lambda s: bool(s.attrs["Heater"]),
+    value_fn=lambda s: s.get(HEATER),
     turn_on_fn=lambda api, device_id: api.airjet_spa_set_power(device_id, True),
     turn_off_fn=lambda api, device_id: api.airjet_spa_set_power(device_id, False),
 )
 
 _AIRJET_SPA_FILTER_SWITCH = WavespaSwitchEntityDescription(
-    key="Filter",
+    key=FILTER.key,
+    capability=WavespaCapability.FILTER,
     name="Filter",
     icon=Icon.FILTER,
-    value_fn=lambda s: bool(s.attrs["Filter"]),
+    value_fn=lambda s: s.get(FILTER),
     turn_on_fn=lambda api, device_id: api.airjet_spa_set_filter(device_id, True),
     turn_off_fn=lambda api, device_id: api.airjet_spa_set_filter(device_id, False),
 )
 
 _AIRJET_SPA_BUBBLES_SWITCH = WavespaSwitchEntityDescription(
-    key="Bubble",
+    key=BUBBLE.key,
+    capability=WavespaCapability.BUBBLES,
     name="Bubbles",
     icon=Icon.BUBBLES,
-    value_fn=lambda s: bool(s.attrs["Bubble"]),
+    value_fn=lambda s: s.get(BUBBLE),
     turn_on_fn=lambda api, device_id: api.airjet_spa_set_bubbles(device_id, True),
     turn_off_fn=lambda api, device_id: api.airjet_spa_set_bubbles(device_id, False),
 )
 
 _AIRJET_SPA_LOCK_SWITCH = WavespaSwitchEntityDescription(
     key="spa_locked",
+    capability=WavespaCapability.LOCK,
     name="Spa Locked",
     icon=Icon.LOCK,
-    value_fn=lambda s: bool(s.attrs["locked"]),
+    value_fn=lambda s: s.get(LOCKED),
     turn_on_fn=lambda api, device_id: api.airjet_spa_set_locked(device_id, True),
     turn_off_fn=lambda api, device_id: api.airjet_spa_set_locked(device_id, False),
 )
 
+_SWITCH_DESCRIPTIONS = [
+    _AIRJET_SPA_POWER_SWITCH,
+    _AIRJET_SPA_FILTER_SWITCH,
+    _AIRJET_SPA_BUBBLES_SWITCH,
+]
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -77,38 +96,24 @@ async def async_setup_entry(
     """Set up switch entities."""
     coordinator: WavespaUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
 
-    entities: list[WavespaEntity] = []
-
-    for device_id, device in coordinator.api.devices.items():
-        # if device.device_type == WavespaDeviceType.WAVESPA_EU:
+    @callback
+    def async_add_devices(device_ids: list[str]) -> None:
+        entities: list[WavespaEntity] = []
 
-        if device.device_type in [
-            WavespaDeviceType.WAVESPA_EU, WavespaDeviceType.WAVESPA_US,
-        ]:
+        for device_id in device_ids:
+            device_coordinator = coordinator.device_coordinators[device_id]
             entities.extend(
-                [
-                    WavespaSwitch(
-                        coordinator,
-                        config_entry,
-                        device_id,
-                        _AIRJET_SPA_POWER_SWITCH
-                    ),
-                    WavespaSwitch(
-                        coordinator,
-                        config_entry,
-                        device_id,
-                        _AIRJET_SPA_FILTER_SWITCH,
-                    ),
-                    WavespaSwitch(
-                        coordinator,
-                        config_entry,
-                        device_id,
-                        _AIRJET_SPA_BUBBLES_SWITCH,
-                    ),
-                ]
+                WavespaSwitch(device_coordinator, config_entry, device_id, description)
+                for description in _SWITCH_DESCRIPTIONS
+                if description.capability in device_coordinator.capabilities
             )
 
-    async_add_entities(entities)
+        async_add_entities(entities)
+
+    async_add_devices(list(coordinator.device_coordinators))
+    config_entry.async_on_unload(
+        coordinator.async_add_device_listener(async_add_devices)
+    )
 
 
 class WavespaSwitch(WavespaEntity, SwitchEntity):
@@ -118,7 +123,7 @@ class WavespaSwitch(WavespaEntity, SwitchEntity):
 
     def __init__(
         self,
-        coordinator: WavespaUpdateCoordinator,
+        coordinator: WavespaDeviceCoordinator,
         config_entry: ConfigEntry,
         device_id: str,
         description: WavespaSwitchEntityDescription,
@@ -128,20 +133,24 @@ class WavespaSwitch(WavespaEntity, SwitchEntity):
         self.entity_description = description
         self._attr_unique_id = f"{device_id}_{description.key}"
 
-    @property
-    def is_on(self) -> bool | None:
-        """Return true if the switch is on."""
-        if status := self.status:
-            return self.entity_description.value_fn(status)
-
-        return None
+    def _derive_state(self) -> tuple[Any, ...]:
+        """Derive whether the switch is on."""
+        status = self.status
+        self._attr_is_on = self.entity_description.value_fn(status) if status else None
+        return (self._attr_is_on,)
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the switch on."""
-        await self.entity_description.turn_on_fn(self.coordinator.api, self.device_id)
-        await self.coordinator.async_refresh()
+        with self.coordinator.api.tracer.trace("switch_turn_on", self.entity_id):
+            await self.entity_description.turn_on_fn(
+                self.coordinator.api, self.device_id
+            )
+            await self.coordinator.async_refresh_after_command()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the switch off."""
-        await self.entity_description.turn_off_fn(self.coordinator.api, self.device_id)
-        await self.coordinator.async_refresh()
+        with self.coordinator.api.tracer.trace("switch_turn_off", self.entity_id):
+            await self.entity_description.turn_off_fn(
+                self.coordinator.api, self.device_id
+            )
+            await self.coordinator.async_refresh_after_command()
@@ -0,0 +1,88 @@
+"""Event loop lag watchdog, which sheds load when the loop falls behind."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from logging import getLogger
+from time import perf_counter
+
+_LOGGER = getLogger(__name__)
+
+# Scheduling lag above which load is shed, and below which it is restored
+_LAG_BUDGET = 0.1
+_LAG_RECOVERED = _LAG_BUDGET / 2
+
+# Polling slows down by up to this factor while shedding load
+_MAX_SHED_FACTOR = 8
+
+# Number of recent lag measurements considered
+_LAG_SAMPLES = 20
+
+# Stages of each update cycle that are timed
+STAGES = ("post_processing", "fan_out", "state_writes")
+
+
+class LoopWatchdog:
+    """Measures the load this integration puts on the event loop.
+
+    The time spent in each stage of the update cycle is accumulated between calls
+    to end_cycle, and the event loop scheduling lag is probed on every poll. When
+    the lag exceeds the budget, the shed factor doubles at the end of each cycle,
+    up to a maximum. Polls are stretched by this factor, and entity state writes
+    are collapsed while it is above 1. It halves again once the lag recovers.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Create a watchdog for the given event loop."""
+        self._loop = loop
+        self._lags: deque[float] = deque(maxlen=_LAG_SAMPLES)
+        self._current = dict.fromkeys(STAGES, 0.0)
+        self.last_cycle = dict.fromkeys(STAGES, 0.0)
+        self.shed_factor = 1
+
+    @property
+    def shedding(self) -> bool:
+        """Return True if load is currently being shed."""
+        return self.shed_factor > 1
+
+    @property
+    def lag(self) -> float:
+        """Get the highest recent event loop scheduling lag, in seconds."""
+        return max(self._lags, default=0.0)
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """Add the time spent in the enclosed block to a stage of the cycle."""
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self._current[stage] += perf_counter() - started
+
+    def probe_lag(self) -> None:
+        """Measure how long a callback waits before the event loop runs it."""
+        scheduled = self._loop.time()
+        self._loop.call_soon(lambda: self._lags.append(self._loop.time() - scheduled))
+
+    def end_cycle(self) -> None:
+        """Finish the current update cycle, and adjust the shed factor."""
+        self.last_cycle = self._current
+        self._current = dict.fromkeys(STAGES, 0.0)
+
+        lag = self.lag
+        if lag > _LAG_BUDGET and self.shed_factor < _MAX_SHED_FACTOR:
+            self.shed_factor *= 2
+            _LOGGER.warning(
+                "Event loop lag of %.0f ms, slowing Wavespa updates by a factor of %d",
+                lag * 1000,
+                self.shed_factor,
+            )
+        elif lag < _LAG_RECOVERED and self.shed_factor > 1:
+            self.shed_factor //= 2
+            _LOGGER.info(
+                "Event loop lag has recovered, Wavespa update slowdown factor is %d",
+                self.shed_factor,
+            )
@@ -1,26 +1,43 @@
 """Wavespa API."""
 
 import asyncio
+from collections import deque
+from collections.abc import Mapping
 from copy import deepcopy
 from dataclasses import dataclass
-import json
-from logging import getLogger
-from time import time
+from logging import DEBUG, getLogger
+from time import monotonic, time
 
-from typing import Any
+from typing import Any, TypeVar
 
-from aiohttp import ClientResponse, ClientSession
+from aiohttp import (
+    ClientConnectionError,
+    ClientResponse,
+    ClientResponseError,
+    ClientSession,
+)
+import orjson
 
+from .circuit_breaker import CircuitBreaker
+from .hedging import RequestHedger
+from .tracing import CommandTracer
 from .model import (
+    BUBBLE,
+    FILTER,
+    HEATER,
+    LOCKED,
+    TEMPERATURE_SETUP,
+    TIME_FILTER,
+    DataPoint,
     WavespaDevice,
+    WavespaDeviceHealth,
     WavespaDeviceStatus,
     WavespaDeviceType,
     WavespaUserToken,
-    BubblesLevel,
-    HydrojetFilter,
-    HydrojetHeat,
+    encode_attrs,
 )
 
+_T = TypeVar("_T")
 _LOGGER = getLogger(__name__)
 _HEADERS = {
     "Content-type": "application/json; charset=UTF-8",
@@ -30,12 +47,40 @@ _HEADERS = {
 }
 _TIMEOUT = 10
 
+# Retry backoff after failures, as (initial, maximum) seconds
+# The backoff doubles with each consecutive failure
+_OFFLINE_BACKOFF = (300, 3600)
+_TRANSIENT_BACKOFF = (30, 600)
+_DEFAULT_BACKOFF = (60, 1800)
+
+# Locally written attribute values are kept until the API confirms them, or until
+# the API reports state from this many seconds after the write, or the timeout
+_PENDING_WRITE_GRACE = 30
+_PENDING_WRITE_TIMEOUT = 300
+
+# Number of recent responses used to estimate the API clock offset
+_CLOCK_OFFSET_SAMPLES = 50
+
+# Interval between status probes of an offline device, as (initial, maximum) seconds
+_OFFLINE_PROBE_INTERVAL = (60, 3600)
+
 
 @dataclass
-class WavespaApiResults:
-    """A snapshot of device status reports returned from the API."""
+class _PendingWrite:
+    """An attribute value written locally that the API has yet to confirm."""
+
+    value: Any
+    written_at: float
+
+
+@dataclass
+class _OfflineProbe:
+    """Negative cache entry for a device that is known to be offline."""
+
+    interval: float = _OFFLINE_PROBE_INTERVAL[0]
 
-    devices: dict[str, WavespaDeviceStatus]
+    # Monotonic time before which the device status should not be requested
+    next_probe: float = 0
 
 
 class WavespaException(Exception):
@@ -50,6 +95,22 @@ class WavespaOfflineException(WavespaException):
         super().__init__("Server reports device is offline")
 
 
+class WavespaProbePendingException(WavespaOfflineException):
+    """Device is offline, and its status is not due to be requested again yet."""
+
+
+class WavespaCircuitOpenException(WavespaException):
+    """Requests are paused because the API appears to be unavailable."""
+
+    def __init__(self) -> None:
+        """Construct the exception."""
+        super().__init__("API unavailable, request not attempted")
+
+
+class WavespaMalformedResponseException(WavespaException):
+    """The API returned a response that could not be understood."""
+
+
 class WavespaAuthException(WavespaException):
     """An authentication error."""
 
@@ -75,18 +136,19 @@ class WavespaIncorrectPasswordException(WavespaAuthException):
         super().__init__("Server reports password is incorrect")
 
 
-async def _raise_for_status(response: ClientResponse) -> None:
+def _raise_for_status(response: ClientResponse, body: bytes) -> None:
     """Raise an exception based on the response."""
     if response.ok:
         return
 
-    # The API often provides useful error descriptions in JSON format
-    if response.content_type == "application/json":
-        try:
-            api_error = await response.json()
-        except Exception:  # pylint: disable=broad-except
-            response.raise_for_status()
+    # The API often provides useful error descriptions in JSON format, even when the
+    # content type says otherwise
+    try:
+        api_error = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        api_error = None
 
+    if isinstance(api_error, dict):
         error_code = api_error.get("error_code", 0)
         if error_code == 9004:
             raise WavespaTokenInvalidException()
@@ -101,15 +163,133 @@ async def _raise_for_status(response: ClientResponse) -> None:
     response.raise_for_status()
 
 
+def _decode(body: bytes) -> dict[str, Any]:
+    """Decode a response body, which should contain a JSON object."""
+    try:
+        data = orjson.loads(body)
+    except orjson.JSONDecodeError as ex:
+        raise WavespaMalformedResponseException(
+            f"Response is not valid JSON: {ex}"
+        ) from ex
+
+    if not isinstance(data, dict):
+        raise WavespaMalformedResponseException(
+            f"Expected a JSON object, got {type(data).__name__}"
+        )
+    return data
+
+
+def _field(data: Mapping[str, Any], key: str, expected_type: type[_T]) -> _T:
+    """Get a required field from an API response, checking its type."""
+    value = data.get(key)
+    if not isinstance(value, expected_type):
+        raise WavespaMalformedResponseException(
+            f"Expected {expected_type.__name__} for '{key}', "
+            f"got {type(value).__name__}"
+        )
+    return value
+
+
+def _parse_user_token(data: Mapping[str, Any]) -> WavespaUserToken:
+    """Convert a login response into a user token."""
+    return WavespaUserToken(
+        _field(data, "uid", str),
+        _field(data, "token", str),
+        _field(data, "expire_at", int),
+    )
+
+
+def _parse_bindings(data: Mapping[str, Any]) -> list[WavespaDevice]:
+    """Convert a bindings response into the list of devices.
+
+    Malformed devices are left out, so that they do not affect the rest of the
+    account.
+    """
+    devices = []
+    for raw in _field(data, "devices", list):
+        try:
+            if not isinstance(raw, dict):
+                raise WavespaMalformedResponseException("Expected an object for device")
+
+            # Descriptive fields have been seen as null or empty, so are not required
+            device = WavespaDevice(
+                _field(raw, "protoc", int),
+                _field(raw, "did", str),
+                _field(raw, "product_name", str),
+                str(raw.get("dev_alias") or ""),
+                str(raw.get("mcu_soft_version") or ""),
+                str(raw.get("mcu_hard_version") or ""),
+                str(raw.get("wifi_soft_version") or ""),
+                str(raw.get("wifi_hard_version") or ""),
+                bool(raw.get("is_online")),
+            )
+        except WavespaMalformedResponseException as ex:
+            _LOGGER.warning("Skipping malformed device in bindings: %s", ex)
+            continue
+        devices.append(device)
+    return devices
+
+
+def _parse_latest_data(data: Mapping[str, Any]) -> tuple[int, dict[str, Any]]:
+    """Convert a device data response into its timestamp and attributes."""
+    updated_at = _field(data, "updated_at", int)
+
+    # Devices without data have been seen to return an empty or missing 'attr'
+    if updated_at == 0:
+        return updated_at, {}
+
+    return updated_at, _field(data, "attr", dict)
+
+
+def _request_deadline(deadline: float | None) -> float:
+    """Get the deadline for a single request, capped by the standard timeout."""
+    request_deadline = asyncio.get_running_loop().time() + _TIMEOUT
+    if deadline is None:
+        return request_deadline
+    return min(deadline, request_deadline)
+
+
+def _failure_backoff(error: BaseException, failures: int) -> float:
+    """Get the number of seconds to wait before retrying a device after a failure."""
+    if isinstance(error, WavespaOfflineException):
+        # The device itself is offline, which is unlikely to change quickly
+        initial, maximum = _OFFLINE_BACKOFF
+    elif isinstance(
+        error, (TimeoutError, ClientConnectionError, WavespaCircuitOpenException)
+    ) or (
+        isinstance(error, ClientResponseError)
+        and (error.status == 429 or error.status >= 500)
+    ):
+        # Server or network problems that are usually short-lived
+        initial, maximum = _TRANSIENT_BACKOFF
+    else:
+        initial, maximum = _DEFAULT_BACKOFF
+
+    return float(min(maximum, initial * 2 ** min(failures - 1, 16)))
+
+
 class WavespaApi:
     """Wavespa API."""
 
-    def __init__(self, session: ClientSession, user_token: str, api_root: str) -> None:
+    def __init__(
+        self,
+        session: ClientSession,
+        user_token: str,
+        api_root: str,
+        hedge_requests: bool = False,
+    ) -> None:
         """Initialize the API with a user token."""
         self._session = session
         self._user_token = user_token
         self._api_root = api_root
 
+        # Fails requests fast while the API root is down
+        self.circuit_breaker = CircuitBreaker()
+
+        # Duplicates device status requests that are slower than usual, if enabled
+        # Only these are hedged, as other endpoints have different latencies
+        self.hedger = RequestHedger() if hedge_requests else None
+
         # Maps device IDs to device info
         self.devices: dict[str, WavespaDevice] = {}
 
@@ -117,10 +297,35 @@ class WavespaApi:
         # This is used to work around an annoyance where changes to settings via
         # a POST request are not immediately reflected in a subsequent GET request.
         #
-        # When updating state via HA, we update the cache and return this value
-        # until the API can provide us with a response containing a timestamp
-        # more recent than the local update.
+        # When updating state via HA, we update the cache and pin the written
+        # attributes, so they survive polls until the API confirms them.
+        # All other attributes are updated from each poll as normal.
         self._state_cache: dict[str, WavespaDeviceStatus] = {}
+        self._pending_writes: dict[str, dict[str, _PendingWrite]] = {}
+
+        # The attributes most recently reported by the API, without local changes
+        self._confirmed_attrs: dict[str, dict[str, Any]] = {}
+
+        # Commands in progress, keyed by device ID, attributes sent and attributes
+        # written locally, and the locks that order commands and polls for each device
+        self._pending_commands: dict[
+            tuple[str, tuple[tuple[str, int], ...], tuple[tuple[str, Any], ...]],
+            asyncio.Future[None],
+        ] = {}
+        self._device_locks: dict[str, asyncio.Lock] = {}
+
+        # Recent estimates of the offset between the API clock and the local clock
+        self._clock_offsets: deque[float] = deque(maxlen=_CLOCK_OFFSET_SAMPLES)
+
+        # Recent fetch successes and failures for each device
+        self.health: dict[str, WavespaDeviceHealth] = {}
+
+        # Devices known to be offline, which are only probed with exponential backoff
+        # rather than on every poll (e.g. spas that are drained for the winter)
+        self._offline_devices: dict[str, _OfflineProbe] = {}
+
+        # Latency of each stage of commands issued by the user
+        self.tracer = CommandTracer()
 
     @staticmethod
     async def get_user_token(
@@ -137,132 +342,200 @@ class WavespaApi:
             response = await session.post(
                 f"{api_root}/app/login", headers=_HEADERS, json=body
             )
-            await _raise_for_status(response)
-            api_data = await response.json()
+            response_body = await response.read()
+            _raise_for_status(response, response_body)
 
-        return WavespaUserToken(
-            api_data["uid"], api_data["token"], api_data["expire_at"]
-        )
+        return _parse_user_token(_decode(response_body))
 
-    async def refresh_bindings(self) -> None:
+    async def refresh_bindings(self, deadline: float | None = None) -> None:
         """Refresh and store the list of devices available in the account."""
-        self.devices = {
-            device.device_id: device for device in await self._get_devices()
+        devices = {
+            device.device_id: device for device in await self._get_devices(deadline)
         }
 
-    async def _get_devices(self) -> list[WavespaDevice]:
+        for did, device in devices.items():
+            previous = self.devices.get(did)
+
+            # The filter timer is only reported in device status, so carry it over
+            # until the next status update for each device
+            if previous and previous.time_filter is not None:
+                device.time_filter = previous.time_filter
+
+            if not device.is_online:
+                # Probe newly offline devices once, then back off
+                self._offline_devices.setdefault(did, _OfflineProbe())
+            elif previous and not previous.is_online:
+                self.mark_device_active(did)
+
+        # Forget everything about devices that are no longer in the account
+        for did in self.devices.keys() - devices.keys():
+            self._state_cache.pop(did, None)
+            self._pending_writes.pop(did, None)
+            self._confirmed_attrs.pop(did, None)
+            self._device_locks.pop(did, None)
+            self.health.pop(did, None)
+            self._offline_devices.pop(did, None)
+
+        self.devices = devices
+
+    def mark_device_active(self, did: str) -> None:
+        """Resume normal polling of a device that was previously offline.
+
+        This should be called whenever there is evidence of the device being online,
+        such as an event received from it.
+        """
+        if self._offline_devices.pop(did, None) is not None:
+            _LOGGER.debug("Device %s is back online", did)
+
+    async def _get_devices(self, deadline: float | None) -> list[WavespaDevice]:
         """Get the list of devices available in the account."""
-        api_data = await self._do_get(f"{self._api_root}/app/bindings")
-
-        sanitized_data = self._sanitize_bindings_response(api_data)
-        _LOGGER.debug("Device list refreshed: %s", json.dumps(sanitized_data))
-
-        return [
-            WavespaDevice(
-                raw["protoc"],
-                raw["did"],
-                raw["product_name"],
-                raw["dev_alias"],
-                raw["mcu_soft_version"],
-                raw["mcu_hard_version"],
-                raw["wifi_soft_version"],
-                raw["wifi_hard_version"],
-                raw["is_online"],
-            )
-            for raw in api_data["devices"]
-        ]
-
-    async def fetch_data(self) -> WavespaApiResults:
-        """Fetch the latest data for all devices."""
-        for did, device_info in self.devices.items():
-            latest_data = await self._do_get(
-                f"{self._api_root}/app/devdata/{did}/latest"
+        api_data = await self._do_get(f"{self._api_root}/app/bindings", deadline)
+
+        if _LOGGER.isEnabledFor(DEBUG):
+            sanitized_data = self._sanitize_bindings_response(api_data)
+            _LOGGER.debug(
+                "Device list refreshed: %s", orjson.dumps(sanitized_data).decode()
             )
 
-            # Get the age of the data according to the API
-            api_update_timestamp = latest_data["updated_at"]
-
-            # Zero indicates the device is offline
-            # This has been observed after a device was offline for a few months
-            if api_update_timestamp == 0:
-                # In testing, the 'attrs' dictionary has been observed to be empty
-                _LOGGER.debug("No data available for device %s", did)
-                continue
-
-            # Work out whether the received API update is more recent than the
-            # locally cached state
-            local_update_timestamp = 0
-            cached_state: WavespaDeviceStatus | None
-            if cached_state := self._state_cache.get(did):
-                local_update_timestamp = cached_state.timestamp
-
-            # If the API timestamp is more recent, update the cache
-            if api_update_timestamp < local_update_timestamp:
-                _LOGGER.debug(
-                    "Ignoring update for device %s as local data is newer", did
-                )
-                continue
-
-            _LOGGER.debug("New data received for device %s", did)
-            device_attrs = latest_data["attr"]
-            self._state_cache[did] = WavespaDeviceStatus(
-                latest_data["updated_at"],
-                device_attrs,
-                device_info
+        return _parse_bindings(api_data)
+
+    def get_cached_status(self, did: str) -> WavespaDeviceStatus | None:
+        """Get the cached state of a device, including any local changes."""
+        return self._state_cache.get(did)
+
+    async def fetch_device(
+        self, did: str, deadline: float | None = None
+    ) -> WavespaDeviceStatus | None:
+        """Fetch the latest data for a single device.
+
+        Deadlines are expressed in event loop time, and bound every request made.
+
+        Returns the cached state of the device, or None if the API has never
+        provided any data for it. The outcome is recorded in the device's health.
+        A device that is offline raises WavespaOfflineException, or the subclass
+        WavespaProbePendingException while it is waiting for its next probe.
+        """
+        if (device_info := self.devices.get(did)) is None:
+            raise WavespaException(f"Device '{did}' is not recognised")
+
+        # Not counted as a failure, as no request is made
+        probe = self._offline_devices.get(did)
+        if probe is not None and monotonic() < probe.next_probe:
+            _LOGGER.debug("Skipping offline device %s until next probe", did)
+            raise WavespaProbePendingException()
+
+        health = self.health.setdefault(did, WavespaDeviceHealth())
+        try:
+            async with self._device_lock(did):
+                with self.tracer.span("fetch_status"):
+                    status = await self._fetch_device_status(
+                        did, device_info, deadline
+                    )
+        except WavespaOfflineException as ex:
+            self._schedule_offline_probe(did)
+            health.record_failure(
+                ex, _failure_backoff(ex, health.consecutive_failures + 1)
+            )
+            raise
+        except Exception as ex:
+            health.record_failure(
+                ex, _failure_backoff(ex, health.consecutive_failures + 1)
             )
+            raise
+
+        health.record_success(time())
+        return status
+
+    async def _fetch_device_status(
+        self, did: str, device_info: WavespaDevice, deadline: float | None
+    ) -> WavespaDeviceStatus | None:
+        """Fetch the latest data for a device and merge it into the state cache."""
+        # Get the age of the data according to the API
+        api_update_timestamp, device_attrs = _parse_latest_data(
+            await self._do_get(
+                f"{self._api_root}/app/devdata/{did}/latest", deadline, hedge=True
+            )
+        )
 
-            # Update the cached state with the latest data
-            if (device_attrs["Time_filter"]) is not None:
-                self._state_cache[did].time_filter = device_attrs["Time_filter"]
+        # Zero indicates the device is offline
+        # This has been observed after a device was offline for a few months
+        if api_update_timestamp == 0:
+            # In testing, the 'attrs' dictionary has been observed to be empty
+            _LOGGER.debug("No data available for device %s", did)
+            raise WavespaOfflineException()
 
-            attr_dump = json.dumps(device_attrs)
+        if device_info.is_online:
+            self.mark_device_active(did)
+        else:
+            self._schedule_offline_probe(did)
+
+        self._clock_offsets.append(time() - api_update_timestamp)
+
+        # Responses can arrive out of order, so never go back in time
+        cached_state = self._state_cache.get(did)
+        if cached_state and api_update_timestamp < cached_state.timestamp:
+            _LOGGER.debug("Ignoring update for device %s as cached data is newer", did)
+            return cached_state
+
+        _LOGGER.debug("New data received for device %s", did)
+        self._confirmed_attrs[did] = dict(device_attrs)
+        self._apply_pending_writes(did, api_update_timestamp, device_attrs)
+        self._state_cache[did] = WavespaDeviceStatus(
+            api_update_timestamp,
+            device_attrs,
+            device_info
+        )
 
-            if device_info.device_type == WavespaDeviceType.UNKNOWN:
-                _LOGGER.warning(
-                    "Status for unknown device type '%s' returned: %s",
-                    device_info.product_name,
-                    attr_dump,
-                )
-            else:
-                _LOGGER.debug(
-                    "Status for device type '%s' returned: %s",
-                    device_info.product_name,
-                    attr_dump,
-                )
+        # Update the cached state with the latest data
+        if (time_filter := device_attrs.get(TIME_FILTER.key)) is not None:
+            self._state_cache[did].time_filter = time_filter
 
-        return WavespaApiResults(self._state_cache)
+        if device_info.device_type == WavespaDeviceType.UNKNOWN:
+            _LOGGER.warning(
+                "Status for unknown device type '%s' returned: %s",
+                device_info.product_name,
+                orjson.dumps(device_attrs).decode(),
+            )
+        elif _LOGGER.isEnabledFor(DEBUG):
+            _LOGGER.debug(
+                "Status for device type '%s' returned: %s",
+                device_info.product_name,
+                orjson.dumps(device_attrs).decode(),
+            )
+
+        return self._state_cache[did]
+
+    def _schedule_offline_probe(self, did: str) -> None:
+        """Record that a device is offline, and delay the next probe of its status."""
+        probe = self._offline_devices.setdefault(did, _OfflineProbe())
+        _LOGGER.debug("Device %s is offline, next probe in %ds", did, probe.interval)
+        probe.next_probe = monotonic() + probe.interval
+        probe.interval = min(_OFFLINE_PROBE_INTERVAL[1], probe.interval * 2)
 
     async def airjet_spa_set_power(self, device_id: str, power: bool) -> None:
         """Turn the spa on/off."""
-        if (cached_state := self._state_cache.get(device_id)) is None:
-            raise WavespaException(f"Device '{device_id}' is not recognised")
-
-        api_value = 1 if power else 0
         _LOGGER.debug("Setting power to %s", "ON" if power else "OFF")
-        await self._do_control_post(device_id, Heater=api_value)
-        cached_state.timestamp = int(time())
-        cached_state.attrs["Heater"] = api_value
-        if not power:
+        if power:
+            await self._send_command(device_id, encode_attrs({HEATER: True}))
+        else:
             # When powering off, all other functions also turn off
-            cached_state.attrs["Filter"] = 0
-            cached_state.attrs["Heater"] = 0
-            cached_state.attrs["Bubble"] = 0
+            await self._send_command(
+                device_id,
+                encode_attrs({HEATER: False}),
+                encode_attrs({HEATER: False, FILTER: False, BUBBLE: False}),
+            )
 
     async def airjet_spa_set_filter(self, device_id: str, filtering: bool) -> None:
         """Turn the filter pump on/off on a spa device."""
-        if (cached_state := self._state_cache.get(device_id)) is None:
-            raise WavespaException(f"Device '{device_id}' is not recognised")
-
-        api_value = 1 if filtering else 0
         _LOGGER.debug("Setting filter mode to %s", "ON" if filtering else "OFF")
-        await self._do_control_post(device_id, Filter=api_value)
-        cached_state.timestamp = int(time())
-        cached_state.attrs["Filter"] = api_value
         if filtering:
-            cached_state.attrs["Filter"] = 1
+            await self._send_command(device_id, encode_attrs({FILTER: True}))
         else:
-            cached_state.attrs["Bubble"] = 0
-            cached_state.attrs["Heater"] = 0
+            await self._send_command(
+                device_id,
+                encode_attrs({FILTER: False}),
+                encode_attrs({FILTER: False, BUBBLE: False, HEATER: False}),
+            )
 
     async def airjet_spa_set_heat(self, device_id: str, heat: bool) -> None:
         """
@@ -270,66 +543,185 @@ class WavespaApi:
 
         Turning the heater on will also turn on the filter pump.
         """
-        if (cached_state := self._state_cache.get(device_id)) is None:
-            raise WavespaException(f"Device '{device_id}' is not recognised")
-
-        api_value = 1 if heat else 0
         _LOGGER.debug("Setting heater mode to %s", "ON" if heat else "OFF")
-        await self._do_control_post(device_id, Heater=api_value)
-        cached_state.timestamp = int(time())
-        cached_state.attrs["Heater"] = api_value
         if heat:
-            cached_state.attrs["Filter"] = 1
+            await self._send_command(
+                device_id,
+                encode_attrs({HEATER: True}),
+                encode_attrs({HEATER: True, FILTER: True}),
+            )
+        else:
+            await self._send_command(device_id, encode_attrs({HEATER: False}))
 
     async def airjet_spa_set_target_temp(
         self, device_id: str, target_temp: int
     ) -> None:
         """Set the target temperature on a spa device."""
-        if (cached_state := self._state_cache.get(device_id)) is None:
-            raise WavespaException(f"Device '{device_id}' is not recognised")
-
         target_temp = int(target_temp)
         _LOGGER.debug("Setting target temperature to %d", target_temp)
-        await self._do_control_post(device_id, Temperature_setup=target_temp)
-        cached_state.timestamp = int(time())
-        cached_state.attrs["Temperature_setup"] = target_temp
+        await self._send_command(
+            device_id, encode_attrs({TEMPERATURE_SETUP: target_temp})
+        )
 
     async def airjet_spa_set_locked(self, device_id: str, locked: bool) -> None:
         """Lock or unlock the physical control panel on a spa device."""
-        if (cached_state := self._state_cache.get(device_id)) is None:
-            raise WavespaException(f"Device '{device_id}' is not recognised")
-
-        api_value = 1 if locked else 0
         _LOGGER.debug("Setting lock state to %s", "ON" if locked else "OFF")
-        await self._do_control_post(device_id, ocked=api_value)
-        cached_state.timestamp = int(time())
-        cached_state.attrs["locked"] = api_value
+        await self._send_command(device_id, encode_attrs({LOCKED: locked}))
 
     async def airjet_spa_set_bubbles(self, device_id: str, bubbles: bool) -> None:
         """Turn the bubbles on/off on an Airjet spa device."""
-        if (cached_state := self._state_cache.get(device_id)) is None:
-            raise WavespaException(f"Device '{device_id}' is not recognised")
-
         _LOGGER.debug("Setting bubbles mode to %s", "ON" if bubbles else "OFF")
-        await self._do_control_post(device_id, Bubble=1 if bubbles else 0)
-        cached_state.timestamp = int(time())
-        cached_state.attrs["Bubble"] = bubbles
         if bubbles:
-            cached_state.attrs["Heater"] = 1
+            await self._send_command(
+                device_id,
+                encode_attrs({BUBBLE: True}),
+                encode_attrs({BUBBLE: True, HEATER: True}),
+            )
+        else:
+            await self._send_command(device_id, encode_attrs({BUBBLE: False}))
 
-    async def _do_get(self, url: str) -> dict[str, Any]:
-        """Make an API call to the specified URL, returning the response as a JSON object."""
-        headers = dict(_HEADERS)
-        headers["X-Gizwits-User-token"] = self._user_token
-        async with asyncio.timeout(_TIMEOUT):
-            response = await self._session.get(url, headers=headers)
-            await _raise_for_status(response)
+    async def apply_state(
+        self, device_id: str, values: Mapping[DataPoint, Any]
+    ) -> None:
+        """Set several data points on a spa device with a single command.
+
+        Unlike the individual setters, side effects on other attributes are not
+        predicted, so these will only show up once the device has been refreshed.
+        """
+        attrs = encode_attrs(values)
+        _LOGGER.debug("Applying state %s", attrs)
+        await self._send_command(device_id, attrs)
+
+    async def _send_command(
+        self,
+        device_id: str,
+        attrs: dict[str, int],
+        local_attrs: dict[str, Any] | None = None,
+    ) -> None:
+        """Send a control command through the device's command pipeline.
+
+        The local_attrs (default: attrs) are written to the cached state once the
+        command has been accepted, which allows for side effects on other attributes.
+
+        Identical commands that are already pending share the same request, and
+        commands whose local_attrs all match the state last confirmed by the API are
+        not sent at all. Commands and polls for the same device are applied in
+        order, while other devices proceed in parallel.
+        """
+        if device_id not in self._state_cache:
+            raise WavespaException(f"Device '{device_id}' is not recognised")
+
+        # Commands only match if they also predict the same side effects
+        local_attrs = local_attrs or attrs
+        key = (
+            device_id,
+            tuple(sorted(attrs.items())),
+            tuple(sorted(local_attrs.items())),
+        )
+        if (command := self._pending_commands.get(key)) is None:
+            command = asyncio.ensure_future(
+                self._run_command(device_id, attrs, local_attrs)
+            )
+            self._pending_commands[key] = command
+            command.add_done_callback(lambda _: self._pending_commands.pop(key, None))
+        else:
+            _LOGGER.debug("Joining identical pending command for %s", device_id)
+
+        # Shielded, as other callers may be waiting on the same command
+        await asyncio.shield(command)
+
+    async def _run_command(
+        self, device_id: str, attrs: dict[str, int], local_attrs: dict[str, Any]
+    ) -> None:
+        """Send a command after earlier commands and polls of the device finish."""
+        async with self._device_lock(device_id):
+            # Polls replace the cached state, so only look it up once they're done
+            if (cached_state := self._state_cache.get(device_id)) is None:
+                raise WavespaException(f"Device '{device_id}' is not recognised")
+
+            confirmed = self._confirmed_attrs.get(device_id, {})
+            pending = self._pending_writes.get(device_id, {})
+            if all(
+                attr not in pending and confirmed.get(attr) == value
+                for attr, value in local_attrs.items()
+            ):
+                _LOGGER.debug("Device %s is already in the requested state", device_id)
+                return
+
+            with self.tracer.span("control_post"):
+                await self._do_control_post(device_id, **attrs)
+            self._write_local_attrs(device_id, cached_state, **local_attrs)
+
+    def _device_lock(self, device_id: str) -> asyncio.Lock:
+        """Get the lock that orders commands and polls for a device."""
+        return self._device_locks.setdefault(device_id, asyncio.Lock())
+
+    def _write_local_attrs(
+        self, device_id: str, cached_state: WavespaDeviceStatus, **attrs: Any
+    ) -> None:
+        """Update cached attributes following a command, pinning the new values.
+
+        Pinned values take precedence over values reported by the API until the API
+        confirms them, or they are superseded (see _apply_pending_writes).
+        """
+        written_at = time()
+        pending = self._pending_writes.setdefault(device_id, {})
+        for attr, value in attrs.items():
+            cached_state.attrs[attr] = value
+            pending[attr] = _PendingWrite(value, written_at)
+
+    def _apply_pending_writes(
+        self, did: str, api_update_timestamp: int, attrs: dict[str, Any]
+    ) -> None:
+        """Overlay locally written attribute values that the API has not caught up with.
+
+        A pinned value is released when the API reports the same value, when the API
+        reports device state from well after the write (e.g. the setting was changed
+        again on the spa itself), or when the pin times out.
+        """
+        if not (pending := self._pending_writes.get(did)):
+            return
+
+        now = time()
+        reported_at = api_update_timestamp + self.clock_skew
+        for attr, write in list(pending.items()):
+            if attrs.get(attr) == write.value:
+                del pending[attr]
+            elif (
+                reported_at - write.written_at > _PENDING_WRITE_GRACE
+                or now - write.written_at > _PENDING_WRITE_TIMEOUT
+            ):
+                _LOGGER.debug(
+                    "Local value %s=%s for device %s superseded by %s",
+                    attr,
+                    write.value,
+                    did,
+                    attrs.get(attr),
+                )
+                del pending[attr]
+            else:
+                attrs[attr] = write.value
+
+        if not pending:
+            del self._pending_writes[did]
+
+    @property
+    def clock_skew(self) -> float:
+        """Estimated offset in seconds from the API clock to the local clock.
+
+        Each status response gives an upper bound (local receive time minus the
+        reported update time, which also includes the age of the data). The smallest
+        recent value is the best estimate.
+        """
+        return min(self._clock_offsets, default=0.0)
 
-            # All API responses are encoded using JSON, however the headers often incorrectly
-            # state 'text/html' as the content type.
-            # We have to disable the check to avoid an exception.
-            response_json: dict[str, Any] = await response.json(content_type=None)
-            return response_json
+    async def _do_get(
+        self, url: str, deadline: float | None = None, hedge: bool = False
+    ) -> dict[str, Any]:
+        """Make an API call to the specified URL, returning the response as a JSON object."""
+        if not hedge or self.hedger is None:
+            return await self._do_request("GET", url, deadline)
+        return await self.hedger.run(lambda: self._do_request("GET", url, deadline))
 
     async def _do_control_post(
         self, device_id: str, **kwargs: int | str
@@ -341,17 +733,51 @@ class WavespaApi:
 
     async def _do_post(self, url: str, body: dict[str, Any]) -> dict[str, Any]:
         """Make an API call to the specified URL, returning the response as a JSON object."""
+        return await self._do_request("POST", url, None, body)
+
+    async def _do_request(
+        self,
+        method: str,
+        url: str,
+        deadline: float | None,
+        body: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Make an API call through the circuit breaker."""
+        if not self.circuit_breaker.allow_request():
+            raise WavespaCircuitOpenException()
+
         headers = dict(_HEADERS)
         headers["X-Gizwits-User-token"] = self._user_token
-        async with asyncio.timeout(_TIMEOUT):
-            response = await self._session.post(url, headers=headers, json=body)
-            await _raise_for_status(response)
-
-            # All API responses are encoded using JSON, however the headers often incorrectly
-            # state 'text/html' as the content type.
-            # We have to disable the check to avoid an exception.
-            response_json: dict[str, Any] = await response.json(content_type=None)
-            return response_json
+        try:
+            async with asyncio.timeout_at(_request_deadline(deadline)):
+                response = await self._session.request(
+                    method, url, headers=headers, json=body
+                )
+                response_body = await response.read()
+                _raise_for_status(response, response_body)
+
+            # All API responses are encoded using JSON, however the headers often
+            # incorrectly state 'text/html' as the content type, so this is ignored
+            response_json = _decode(response_body)
+        except WavespaException:
+            # The API is up, even if it didn't like this particular request
+            self.circuit_breaker.record_success()
+            raise
+        except ClientResponseError as ex:
+            if ex.status >= 500:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+            raise
+        except asyncio.CancelledError:
+            self.circuit_breaker.release()
+            raise
+        except Exception:
+            self.circuit_breaker.record_failure()
+            raise
+
+        self.circuit_breaker.record_success()
+        return response_json
 
     @staticmethod
     def _sanitize_bindings_response(bindings: dict[str, Any]) -> dict[str, Any]:
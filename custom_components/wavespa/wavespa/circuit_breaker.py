@@ -0,0 +1,94 @@
+"""Circuit breaker guarding requests to the Wavespa API root."""
+
+from __future__ import annotations
+
+from enum import Enum
+from logging import getLogger
+from time import monotonic
+from typing import Any
+
+_LOGGER = getLogger(__name__)
+
+
+class CircuitState(Enum):
+    """States of the circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Fails requests fast while the API appears to be down.
+
+    The circuit opens after a number of consecutive transport failures. While open,
+    requests are rejected without touching the network. Once the cooldown period has
+    passed, a single probe request is let through (half-open). The circuit closes
+    again if the probe succeeds, or re-opens if it fails.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 30) -> None:
+        """Create a closed circuit breaker."""
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_count = 0
+        self.rejected_count = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be made now."""
+        if self.state == CircuitState.OPEN:
+            if monotonic() - self._opened_at < self.cooldown:
+                self.rejected_count += 1
+                return False
+            _LOGGER.debug("Circuit half-open, probing the API")
+            self.state = CircuitState.HALF_OPEN
+
+        if self.state == CircuitState.HALF_OPEN:
+            if self._probe_in_flight:
+                self.rejected_count += 1
+                return False
+            self._probe_in_flight = True
+
+        return True
+
+    def record_success(self) -> None:
+        """Record a request that reached a working API."""
+        if self.state != CircuitState.CLOSED:
+            _LOGGER.info("Wavespa API has recovered")
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a request that failed due to a timeout, connection or server error."""
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == CircuitState.HALF_OPEN or (
+            self.state == CircuitState.CLOSED
+            and self.consecutive_failures >= self.failure_threshold
+        ):
+            if self.state == CircuitState.CLOSED:
+                _LOGGER.warning(
+                    "Wavespa API unavailable after %d failures, pausing requests",
+                    self.consecutive_failures,
+                )
+            self.state = CircuitState.OPEN
+            self.opened_count += 1
+            self._opened_at = monotonic()
+
+    def release(self) -> None:
+        """Record a request that ended without an outcome (e.g. cancelled)."""
+        self._probe_in_flight = False
+
+    def as_dict(self) -> dict[str, Any]:
+        """Describe the current state for diagnostics."""
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "opened_count": self.opened_count,
+            "rejected_count": self.rejected_count,
+        }
@@ -0,0 +1,121 @@
+"""Estimation of the heating rate of a spa from its recent temperature readings."""
+
+from __future__ import annotations
+
+from array import array
+
+# Number of samples kept per spa, which covers an hour when polling every 30 seconds
+_SIZE = 120
+
+# A heating rate is only estimated from enough readings over a long enough period,
+# as the spa reports whole degrees
+_MIN_SAMPLES = 5
+_MIN_SPAN = 600
+
+
+class HeatingRateTracker:
+    """Estimates the heating rate of a spa, and the time until it reaches a target.
+
+    Samples of (timestamp, temperature, heater) are kept in a fixed-size ring buffer
+    backed by preallocated arrays. The sums needed for a least squares fit of
+    temperature against time are updated as samples are added and evicted, so each
+    update takes constant time however large the buffer is.
+
+    Each time the heater is turned on or off, a new run starts with an empty buffer.
+    Only samples taken while the heater is on count towards the fit.
+    """
+
+    def __init__(self, size: int = _SIZE) -> None:
+        """Create a tracker holding up to the given number of samples."""
+        self._size = size
+        self._timestamps = array("d", bytes(8 * size))
+        self._temperatures = array("d", bytes(8 * size))
+        self._heating = array("b", bytes(size))
+        self._start = 0
+        self._count = 0
+        self._reset_sums(0.0)
+
+    def _reset_sums(self, origin: float) -> None:
+        """Clear the regression sums, measuring time from the given origin."""
+        # Times are relative to the start of the run, to keep the sums small
+        self._origin = origin
+        self._n = 0
+        self._sum_t = 0.0
+        self._sum_y = 0.0
+        self._sum_tt = 0.0
+        self._sum_ty = 0.0
+
+    def _accumulate(self, timestamp: float, temperature: float, sign: int) -> None:
+        """Add a sample to the regression sums, or remove it when sign is -1."""
+        t = timestamp - self._origin
+        self._n += sign
+        self._sum_t += sign * t
+        self._sum_y += sign * temperature
+        self._sum_tt += sign * t * t
+        self._sum_ty += sign * t * temperature
+
+    @property
+    def last_timestamp(self) -> float | None:
+        """Get the timestamp of the latest sample, if any."""
+        if not self._count:
+            return None
+        return self._timestamps[(self._start + self._count - 1) % self._size]
+
+    def add(self, timestamp: float, temperature: float, heating: bool) -> None:
+        """Add a sample, ignoring any that are not newer than the latest one.
+
+        The API reports the same status until the spa sends an update, so repeated
+        polls would otherwise add the same sample many times.
+        """
+        if (last := self.last_timestamp) is not None and timestamp <= last:
+            return
+
+        last_heating = bool(self._count) and bool(
+            self._heating[(self._start + self._count - 1) % self._size]
+        )
+        if not self._count or heating != last_heating:
+            self._start = 0
+            self._count = 0
+            self._reset_sums(timestamp)
+
+        if self._count == self._size:
+            # Evict the oldest sample
+            if self._heating[self._start]:
+                self._accumulate(
+                    self._timestamps[self._start], self._temperatures[self._start], -1
+                )
+            self._start = (self._start + 1) % self._size
+            self._count -= 1
+
+        index = (self._start + self._count) % self._size
+        self._timestamps[index] = timestamp
+        self._temperatures[index] = temperature
+        self._heating[index] = heating
+        self._count += 1
+        if heating:
+            self._accumulate(timestamp, temperature, 1)
+
+    @property
+    def rate(self) -> float | None:
+        """Get the heating rate in degrees per hour, or None if not heating."""
+        if self._n < _MIN_SAMPLES:
+            return None
+
+        # A run only holds samples of one heater state, so these are all heating
+        first = self._timestamps[self._start]
+        if (self.last_timestamp or 0) - first < _MIN_SPAN:
+            return None
+
+        variance = self._n * self._sum_tt - self._sum_t * self._sum_t
+        if variance <= 0:
+            return None
+        slope = (self._n * self._sum_ty - self._sum_t * self._sum_y) / variance
+        return slope * 3600
+
+    def time_to_target(self, temperature: float, target: float) -> float | None:
+        """Get the estimated number of seconds until the target is reached."""
+        if temperature >= target:
+            return 0.0
+        if (rate := self.rate) is None or rate <= 0:
+            return None
+        return (target - temperature) / rate * 3600
@@ -0,0 +1,141 @@
+"""Hedging of idempotent requests against slow responses from the Wavespa API."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+from logging import getLogger
+from typing import Any, TypeVar
+
+_LOGGER = getLogger(__name__)
+_T = TypeVar("_T")
+
+# Number of recent latencies used to decide when to hedge, and the minimum needed
+_SAMPLES = 100
+_MIN_SAMPLES = 20
+
+# Requests slower than this percentile of recent latencies are hedged, with some
+# allowance so that requests of typical latency are not hedged because of jitter
+_HEDGE_PERCENTILE = 95
+_HEDGE_ALLOWANCE = 0.05
+
+
+def _consume_result(task: asyncio.Future[Any]) -> None:
+    """Retrieve the outcome of a discarded request, so its errors are not logged."""
+    if not task.cancelled():
+        task.exception()
+
+
+class RequestHedger:
+    """Sends a duplicate of a request that is taking longer than usual.
+
+    The latency of recent requests to a single endpoint is tracked. Once a request
+    has been outstanding for longer than the 95th percentile, an identical request
+    is sent, the first successful response is used and the other request is
+    cancelled. This trims the tail latency of an API that occasionally stalls, at
+    the cost of a few extra requests. A request beaten by its hedge is counted as
+    taking as long as it was outstanding, which is a lower bound of its latency.
+
+    The extra load is capped by a budget: each request earns a fraction of a hedge,
+    and each hedge spends a whole one. Only idempotent requests may be hedged.
+    """
+
+    def __init__(self, budget_ratio: float = 0.1, max_budget: float = 5) -> None:
+        """Create a hedger that sends at most budget_ratio extra requests."""
+        self.budget_ratio = budget_ratio
+        self.max_budget = max_budget
+        self._budget = 0.0
+        self._latencies: deque[float] = deque(maxlen=_SAMPLES)
+        self.request_count = 0
+        self.hedged_count = 0
+        self.hedge_wins = 0
+        self.over_budget_count = 0
+
+    @property
+    def hedge_delay(self) -> float | None:
+        """Get the time after which a request is hedged, or None if not known yet."""
+        if len(self._latencies) < _MIN_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        rank = -(-len(ordered) * _HEDGE_PERCENTILE // 100) - 1
+        return ordered[rank] + _HEDGE_ALLOWANCE
+
+    @property
+    def win_rate(self) -> float | None:
+        """Get the fraction of hedges that responded before the original request."""
+        if not self.hedged_count:
+            return None
+        return self.hedge_wins / self.hedged_count
+
+    async def run(self, request: Callable[[], Awaitable[_T]]) -> _T:
+        """Make a request, hedging it with a duplicate if it is slow to respond."""
+        loop = asyncio.get_running_loop()
+        self.request_count += 1
+        self._budget = min(self.max_budget, self._budget + self.budget_ratio)
+        delay = self.hedge_delay
+
+        started = loop.time()
+        primary = asyncio.ensure_future(request())
+        try:
+            if delay is not None:
+                await asyncio.wait({primary}, timeout=delay)
+            if primary.done() or delay is None:
+                return await self._await_primary(primary, started)
+            if self._budget < 1:
+                self.over_budget_count += 1
+                return await self._await_primary(primary, started)
+
+            self._budget -= 1
+            self.hedged_count += 1
+            _LOGGER.debug("Request outstanding for %.2fs, sending hedge", delay)
+            hedge_started = loop.time()
+            hedge = asyncio.ensure_future(request())
+            pending = {primary, hedge}
+            try:
+                while True:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    # Use a successful response, or report an error if both fail
+                    succeeded = [task for task in done if task.exception() is None]
+                    if succeeded or not pending:
+                        winner = succeeded[0] if succeeded else done.pop()
+                        break
+            finally:
+                for task in pending:
+                    task.cancel()
+                    task.add_done_callback(_consume_result)
+
+            if succeeded and winner is hedge:
+                self.hedge_wins += 1
+                self._latencies.append(loop.time() - hedge_started)
+                # The original request would have taken at least this long, and
+                # leaving it out would bias the percentile towards fast responses
+                self._latencies.append(loop.time() - started)
+            elif succeeded:
+                self._latencies.append(loop.time() - started)
+            return winner.result()
+        finally:
+            if not primary.done():
+                primary.cancel()
+                primary.add_done_callback(_consume_result)
+
+    async def _await_primary(self, primary: asyncio.Future[_T], started: float) -> _T:
+        """Wait for a request that is not hedged, recording its latency."""
+        result = await primary
+        self._latencies.append(asyncio.get_running_loop().time() - started)
+        return result
+
+    def as_dict(self) -> dict[str, Any]:
+        """Describe the hedging outcomes for diagnostics."""
+        delay = self.hedge_delay
+        win_rate = self.win_rate
+        return {
+            "hedge_delay_ms": None if delay is None else round(delay * 1000, 1),
+            "request_count": self.request_count,
+            "hedged_count": self.hedged_count,
+            "hedge_wins": self.hedge_wins,
+            "win_rate": None if win_rate is None else round(win_rate, 3),
+            "over_budget_count": self.over_budget_count,
+        }
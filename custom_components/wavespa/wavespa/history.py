@@ -0,0 +1,201 @@
+"""Compact in-memory temperature history of a spa, at several resolutions."""
+
+from __future__ import annotations
+
+from array import array
+from math import inf, isnan, nan
+from typing import Any
+
+# Raw samples cover an hour when polling every 30 seconds
+_RAW_SIZE = 120
+
+# Rollups as (period, number of periods) in seconds, covering a day and a month
+_MINUTE = (60, 24 * 60)
+_HOUR = (3600, 30 * 24)
+
+# Columns of a history query, each a list of values with one per point
+HISTORY_COLUMNS = ("time", "temperature", "min", "max", "target", "heater")
+
+
+def _value(value: float) -> float | None:
+    """Get a stored value, with missing values (NaN) as None."""
+    return None if isnan(value) else round(value, 2)
+
+
+def _next_period(time: float, period: int) -> float:
+    """Get the start of the period after the one containing the given time."""
+    return (time // period + 1) * period
+
+
+class _RawSamples:
+    """A ring buffer of the latest samples."""
+
+    def __init__(self, size: int) -> None:
+        """Create a buffer holding up to the given number of samples."""
+        self._size = size
+        self._times = array("d", bytes(8 * size))
+        self._temperatures = array("f", bytes(4 * size))
+        self._targets = array("f", bytes(4 * size))
+        self._heater = array("b", bytes(size))
+        self._start = 0
+        self.count = 0
+        self.evicted = False
+
+    @property
+    def first_time(self) -> float:
+        """Get the time of the oldest sample, or infinity if there are none."""
+        return self._times[self._start] if self.count else inf
+
+    @property
+    def last_time(self) -> float:
+        """Get the time of the latest sample, or minus infinity if there are none."""
+        if not self.count:
+            return -inf
+        return self._times[(self._start + self.count - 1) % self._size]
+
+    def add(self, time: float, temperature: float, target: float, heater: bool) -> None:
+        """Add a sample, replacing the oldest if the buffer is full."""
+        if self.count == self._size:
+            self._start = (self._start + 1) % self._size
+            self.count -= 1
+            self.evicted = True
+        index = (self._start + self.count) % self._size
+        self._times[index] = time
+        self._temperatures[index] = temperature
+        self._targets[index] = target
+        self._heater[index] = heater
+        self.count += 1
+
+    def query(self, start: float, end: float, columns: dict[str, list[Any]]) -> None:
+        """Append the samples taken between two times to the columns."""
+        for offset in range(self.count):
+            index = (self._start + offset) % self._size
+            if not start <= self._times[index] <= end:
+                continue
+            temperature = _value(self._temperatures[index])
+            columns["time"].append(self._times[index])
+            columns["temperature"].append(temperature)
+            columns["min"].append(temperature)
+            columns["max"].append(temperature)
+            columns["target"].append(_value(self._targets[index]))
+            columns["heater"].append(self._heater[index])
+
+
+class _Rollup:
+    """Aggregates of samples over fixed periods, for a number of recent periods.
+
+    Each slot of the arrays holds one period, and is reused once the period it holds
+    is too old. Periods without samples are skipped when queried.
+    """
+
+    def __init__(self, period: int, size: int) -> None:
+        """Create rollups over periods of the given length in seconds."""
+        self.period = period
+        self._size = size
+        # The period held by each slot, as the number of periods since the epoch
+        self._periods = array("q", [-1]) * size
+        self._counts = array("H", bytes(2 * size))
+        self._sums = array("f", bytes(4 * size))
+        self._mins = array("f", bytes(4 * size))
+        self._maxs = array("f", bytes(4 * size))
+        self._targets = array("f", bytes(4 * size))
+        self._heater_counts = array("H", bytes(2 * size))
+        self._latest = -1
+
+    @property
+    def retained_from(self) -> float:
+        """Get the start of the oldest period that can still be held."""
+        return float((self._latest - self._size + 1) * self.period)
+
+    def add(self, time: float, temperature: float, target: float, heater: bool) -> None:
+        """Add a sample to the rollup of its period."""
+        period = int(time // self.period)
+        slot = period % self._size
+        if self._periods[slot] != period:
+            self._periods[slot] = period
+            self._counts[slot] = 0
+            self._sums[slot] = 0
+            self._mins[slot] = temperature
+            self._maxs[slot] = temperature
+            self._heater_counts[slot] = 0
+        self._latest = max(self._latest, period)
+
+        if self._counts[slot] < 0xFFFF:
+            self._counts[slot] += 1
+            self._sums[slot] += temperature
+            self._heater_counts[slot] += heater
+        self._mins[slot] = min(self._mins[slot], temperature)
+        self._maxs[slot] = max(self._maxs[slot], temperature)
+        self._targets[slot] = target
+
+    def query(self, start: float, end: float, columns: dict[str, list[Any]]) -> None:
+        """Append the rollups of periods starting between two times to the columns."""
+        first = max(int(start // self.period), self._latest - self._size + 1)
+        last = min(int(end // self.period), self._latest)
+        for period in range(first, last + 1):
+            slot = period % self._size
+            if self._periods[slot] != period:
+                continue
+            count = self._counts[slot]
+            columns["time"].append(period * self.period)
+            columns["temperature"].append(round(self._sums[slot] / count, 2))
+            columns["min"].append(_value(self._mins[slot]))
+            columns["max"].append(_value(self._maxs[slot]))
+            columns["target"].append(_value(self._targets[slot]))
+            columns["heater"].append(round(self._heater_counts[slot] / count, 2))
+
+
+class DeviceHistory:
+    """Temperature history of a spa, kept in preallocated arrays.
+
+    Raw samples are kept for the last hour, with rollups per minute for the last day
+    and per hour for the last month. The memory used is fixed, so there is no need
+    to query the recorder for a chart of recent temperatures.
+
+    Queries return the finest resolution available for each part of the range.
+    Rolled up points have the mean temperature, the minimum and maximum, the latest
+    target, and the fraction of samples with the heater on.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty history."""
+        self._raw = _RawSamples(_RAW_SIZE)
+        self._minutes = _Rollup(*_MINUTE)
+        self._hours = _Rollup(*_HOUR)
+        self._first_time = inf
+
+    def add(
+        self,
+        time: float,
+        temperature: float,
+        target: float | None,
+        heater: bool,
+    ) -> None:
+        """Add a sample, ignoring any that are not newer than the latest one."""
+        if time <= self._raw.last_time:
+            return
+        self._first_time = min(self._first_time, time)
+        target_value = nan if target is None else target
+        self._raw.add(time, temperature, target_value, heater)
+        self._minutes.add(time, temperature, target_value, heater)
+        self._hours.add(time, temperature, target_value, heater)
+
+    def query(self, start: float, end: float) -> dict[str, list[Any]]:
+        """Get the history between two times, as a list of values per column."""
+        columns: dict[str, list[Any]] = {column: [] for column in HISTORY_COLUMNS}
+
+        # Each resolution covers the time since its oldest sample, or everything if
+        # no sample has been dropped yet. Before that, the coarser resolution is used
+        # up to the end of the period in which the finer one starts.
+        first = self._first_time
+        minutes_from = raw_from = -inf
+        if (minutes_cover := max(first, self._minutes.retained_from)) > first:
+            self._hours.query(start, min(end, minutes_cover), columns)
+            minutes_from = _next_period(minutes_cover, self._hours.period)
+        if (raw_cover := self._raw.first_time if self._raw.evicted else first) > first:
+            self._minutes.query(
+                max(start, minutes_from), min(end, raw_cover), columns
+            )
+            raw_from = _next_period(raw_cover, self._minutes.period)
+        self._raw.query(max(start, minutes_from, raw_from), end, columns)
+        return columns
@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
+from collections.abc import Collection, Mapping
 from dataclasses import dataclass
-from enum import Enum, IntEnum, auto
+from enum import Enum, Flag, IntEnum, auto
 from logging import getLogger
 from typing import Any
 
@@ -28,6 +29,22 @@ class WavespaDeviceType(Enum):
         return WavespaDeviceType.UNKNOWN
 
 
+class WavespaCapability(Flag):
+    """Features supported by a device, which determine the entities it provides."""
+
+    NONE = 0
+    DEVICE_INFO = auto()
+    CONNECTIVITY = auto()
+    ERRORS = auto()
+    THERMOSTAT = auto()
+    HEATER = auto()
+    FILTER = auto()
+    BUBBLES = auto()
+
+    # Not derived from device status yet, as locking is not supported
+    LOCK = auto()
+
+
 class TemperatureUnit(Enum):
     """Temperature units supported by the spa."""
 
@@ -57,66 +74,213 @@ class BubblesLevel(Enum):
     MAX = auto()
 
 
-class BubblesValues:
-    """Values that represent a given level of bubbles.
+class DataPoint:
+    """Declares how a status attribute is represented in the API.
 
-    The write_value is the integer used to set the level via the API.
+    Enumerated data points map each value to the integer that is written to the API.
+    A tuple of integers can be given instead, when more than one value may be read
+    back for the same state. The first integer in the tuple is the one written.
+    This came about because different users of Airjet_V01 devices reported that
+    their app/device would sometimes represent MEDIUM bubbles as 50, but sometimes
+    as 51.
 
-    The read_values list contains a set of integers that may be read from the API to signal the
-    desired state. This came about because different users of Airjet_V01 devices reported that
-    their app/device would sometimes represent MEDIUM bubbles as 50, but sometimes as 51.
-    """
+    Other data points are integers, optionally limited to a range.
 
-    write_value: int
-    read_values: list[int]
-
-    def __init__(self, write_value: int, read_values: list[int] | None = None) -> None:
-        """Define the values used for a specific bubbles level."""
-        self.write_value = write_value
-        if read_values:
-            self.read_values = read_values
-        else:
-            self.read_values = [write_value]
-
-
-class BubblesMapping:
-    """Maps off, medium and max bubbles levels to integer API values."""
+    The tables are validated, and the lookups built, when the data point is declared.
+    """
 
     def __init__(
-        self, off_val: BubblesValues, medium_val: BubblesValues, max_val: BubblesValues
+        self,
+        key: str,
+        values: Mapping[Any, int | tuple[int, ...]] | None = None,
+        *,
+        min_value: int | None = None,
+        max_value: int | None = None,
+        fallback: Any = None,
     ) -> None:
-        """Construct a bubbles mapping using the given integer values."""
-        self.off_val = off_val
-        self.medium_val = medium_val
-        self.max_val = max_val
-
-    def to_api_value(self, level: BubblesLevel) -> int:
-        """Get the API value to be used when setting the given bubbles level."""
+        """Declare a data point with the given API attribute name."""
+        self.key = key
+        self.min_value = min_value
+        self.max_value = max_value
+        self.fallback = fallback
+        self._encode_table: dict[Any, int] | None = None
+        self._decode_table: dict[int, Any] | None = None
+
+        if values is not None:
+            self._encode_table = {}
+            self._decode_table = {}
+            for value, api_values in values.items():
+                if isinstance(api_values, int):
+                    api_values = (api_values,)
+                self._encode_table[value] = api_values[0]
+                for api_value in api_values:
+                    if api_value in self._decode_table:
+                        raise ValueError(f"{key}: {api_value} is mapped more than once")
+                    self._check_range(api_value)
+                    self._decode_table[api_value] = value
+
+    def __repr__(self) -> str:
+        """Return the API attribute name."""
+        return f"DataPoint({self.key!r})"
+
+    def encode(self, value: Any) -> int:
+        """Get the API value representing the given value."""
+        if self._encode_table is not None:
+            try:
+                return self._encode_table[value]
+            except KeyError:
+                raise ValueError(f"{self.key}: unsupported value {value!r}") from None
+
+        api_value = int(value)
+        self._check_range(api_value)
+        return api_value
+
+    def decode(self, api_value: Any) -> Any:
+        """Get the value represented by an API value."""
+        if self._decode_table is not None:
+            try:
+                return self._decode_table[api_value]
+            except (KeyError, TypeError):
+                _LOGGER.warning(
+                    "Unexpected API value %s for %s - assuming %s",
+                    api_value,
+                    self.key,
+                    self.fallback,
+                )
+                return self.fallback
+
+        return int(api_value)
+
+    def _check_range(self, api_value: int) -> None:
+        """Raise an error if an API value is outside of the allowed range."""
+        if (self.min_value is not None and api_value < self.min_value) or (
+            self.max_value is not None and api_value > self.max_value
+        ):
+            raise ValueError(
+                f"{self.key} must be between {self.min_value} and {self.max_value}"
+            )
+
+
+class OnOffDataPoint(DataPoint):
+    """A data point for a function of a spa that is either on or off.
+
+    Any non-zero API value is taken to mean on, as devices have been seen to report
+    values other than 1. Only 0 and 1 are ever sent.
+    """
 
-        if level == BubblesLevel.MAX:
-            return self.max_val.write_value
-        elif level == BubblesLevel.MEDIUM:
-            return self.medium_val.write_value
-        else:
-            return self.off_val.write_value
+    def __init__(self, key: str) -> None:
+        """Declare an on/off data point with the given API attribute name."""
+        super().__init__(key, {False: 0, True: 1})
 
-    def from_api_value(self, value: int) -> BubblesLevel:
-        """Get the enum value based on the 'wave' field in the API response."""
+    def decode(self, api_value: Any) -> bool:
+        """Get whether an API value means the function is on."""
+        return bool(api_value)
 
-        if value in self.max_val.read_values:
-            return BubblesLevel.MAX
-        if value in self.medium_val.read_values:
-            return BubblesLevel.MEDIUM
-        if value in self.off_val.read_values:
-            return BubblesLevel.OFF
 
-        _LOGGER.warning("Unexpected API value %d - assuming OFF", value)
-        return BubblesLevel.OFF
+def get_temperature_range(device_type: WavespaDeviceType) -> tuple[int, int]:
+    """Get the target temperatures a device accepts, in the unit it reports.
 
+    US spas report temperatures in Fahrenheit, and all others in Celsius.
+    """
+    if device_type == WavespaDeviceType.WAVESPA_US:
+        return TEMPERATURE_RANGE_F
+    return TEMPERATURE_RANGE_C
+
+
+def _index_data_points(*points: DataPoint) -> dict[str, DataPoint]:
+    """Index data points by API attribute name, making sure each is declared once."""
+    index: dict[str, DataPoint] = {}
+    for point in points:
+        if point.key in index:
+            raise ValueError(f"Data point {point.key} is declared more than once")
+        index[point.key] = point
+    return index
+
+
+def encode_attrs(values: Mapping[DataPoint, Any]) -> dict[str, int]:
+    """Encode a set of data point values as API attributes."""
+    return {point.key: point.encode(value) for point, value in values.items()}
+
+
+_TIME_FILTER_MAX = 10200
+
+# Target temperatures that can be set, in Celsius and in Fahrenheit
+TEMPERATURE_RANGE_C = (20, 40)
+TEMPERATURE_RANGE_F = (68, 104)
+
+# Data points of Wave_SPA devices
+HEATER = OnOffDataPoint("Heater")
+FILTER = OnOffDataPoint("Filter")
+BUBBLE = OnOffDataPoint("Bubble")
+LOCKED = OnOffDataPoint("locked")
+TEMPERATURE_SETUP = DataPoint(
+    "Temperature_setup",
+    min_value=TEMPERATURE_RANGE_C[0],
+    max_value=TEMPERATURE_RANGE_F[1],
+)
+CURRENT_TEMPERATURE = DataPoint("Current_temperature")
+TIME_FILTER = DataPoint("Time_filter", min_value=0, max_value=_TIME_FILTER_MAX)
+
+SPA_DATA_POINTS = _index_data_points(
+    HEATER,
+    FILTER,
+    BUBBLE,
+    LOCKED,
+    TEMPERATURE_SETUP,
+    CURRENT_TEMPERATURE,
+    TIME_FILTER,
+)
+
+# Data points of Airjet_V01 and Hydrojet devices
+HYDROJET_HEAT = DataPoint(
+    "heat", {HydrojetHeat.OFF: 0, HydrojetHeat.ON: 3}, fallback=HydrojetHeat.OFF
+)
+HYDROJET_FILTER = DataPoint(
+    "filter", {HydrojetFilter.OFF: 0, HydrojetFilter.ON: 2}, fallback=HydrojetFilter.OFF
+)
+AIRJET_V01_BUBBLES = DataPoint(
+    "Bubble",
+    {BubblesLevel.OFF: 0, BubblesLevel.MEDIUM: (50, 51), BubblesLevel.MAX: 100},
+    fallback=BubblesLevel.OFF,
+)
+HYDROJET_BUBBLES = DataPoint(
+    "Bubble",
+    {BubblesLevel.OFF: 0, BubblesLevel.MEDIUM: 40, BubblesLevel.MAX: 100},
+    fallback=BubblesLevel.OFF,
+)
+
+
+_SPA_DEVICE_TYPES = {WavespaDeviceType.WAVESPA_EU, WavespaDeviceType.WAVESPA_US}
+_SPA_BASE_CAPABILITIES = (
+    WavespaCapability.DEVICE_INFO
+    | WavespaCapability.CONNECTIVITY
+    | WavespaCapability.ERRORS
+)
+
+# Attributes a spa must report in its status to support each capability
+_SPA_CAPABILITY_ATTRIBUTES = {
+    WavespaCapability.THERMOSTAT: (HEATER, TEMPERATURE_SETUP, CURRENT_TEMPERATURE),
+    WavespaCapability.HEATER: (HEATER,),
+    WavespaCapability.FILTER: (FILTER,),
+    WavespaCapability.BUBBLES: (BUBBLE,),
+}
+
+
+def get_capabilities(
+    device_type: WavespaDeviceType, attrs: Collection[str] | None
+) -> WavespaCapability:
+    """Work out the capabilities of a device from its type and status attributes.
+
+    When no status has been received yet, every capability of the type is assumed.
+    """
+    if device_type not in _SPA_DEVICE_TYPES:
+        return WavespaCapability.DEVICE_INFO
 
-BV = BubblesValues
-AIRJET_V01_BUBBLES_MAP = BubblesMapping(BV(0), BV(50, [50, 51]), BV(100))
-HYDROJET_BUBBLES_MAP = BubblesMapping(BV(0), BV(40), BV(100))
+    capabilities = _SPA_BASE_CAPABILITIES
+    for capability, points in _SPA_CAPABILITY_ATTRIBUTES.items():
+        if attrs is None or all(point.key in attrs for point in points):
+            capabilities |= capability
+    return capabilities
 
 
 @dataclass
@@ -127,6 +291,12 @@ class WavespaDeviceStatus:
     attrs: dict[str, Any]
     _device: WavespaDevice
 
+    def get(self, point: DataPoint) -> Any:
+        """Get the decoded value of a data point, or None if it was not reported."""
+        if (api_value := self.attrs.get(point.key)) is None:
+            return None
+        return point.decode(api_value)
+
     @property
     def time_filter(self) -> int | None:
         """Calculate and return the time filter percentage based on API attributes."""
@@ -176,8 +346,8 @@ class WavespaDevice:
     @time_filter.setter
     def time_filter(self, value: int | None) -> None:
         """Set the time filter value for the device."""
-        if value is not None and (value < 0 or value > 10200):
-            raise ValueError("time_filter must be between 0 and 10200")
+        if value is not None:
+            TIME_FILTER.encode(value)
         _LOGGER.debug("Setting time filter to %d for device %s", value, self.device_id)
         self._time_filter = value
 
@@ -191,10 +361,37 @@ class WavespaDevice:
     @staticmethod
     def format_time_filter(time_filter: int) -> int:
         """Convert a time filter value to a percentage."""
-        percent = 100 - ((time_filter / 10200) * 100)
+        percent = 100 - ((time_filter / _TIME_FILTER_MAX) * 100)
         return max(0, min(100, int(percent)))
 
 
+@dataclass
+class WavespaDeviceHealth:
+    """Recent success and failure history when fetching the status of a device."""
+
+    consecutive_failures: int = 0
+    last_error: str | None = None
+    last_success: float | None = None
+
+    # Suggested number of seconds to wait before retrying after a failure
+    backoff: float = 0
+
+    def record_success(self, timestamp: float) -> None:
+        """Record a successful status fetch."""
+        self.consecutive_failures = 0
+        self.last_success = timestamp
+        self.backoff = 0
+
+    def record_failure(self, error: BaseException, backoff: float) -> None:
+        """Record a failed status fetch."""
+        self.consecutive_failures += 1
+        # Only the kind of error is kept, as messages can include device IDs
+        self.last_error = type(error).__name__
+        if (status := getattr(error, "status", None)) is not None:
+            self.last_error += f" (HTTP {status})"
+        self.backoff = backoff
+
+
 @dataclass
 class WavespaUserToken:
     """User authentication token, obtained (and ideally stored) following a successful login."""
@@ -0,0 +1,133 @@
+"""Latency tracing of commands, from the user action to the state being visible."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from itertools import count
+from logging import getLogger
+from time import monotonic
+
+_LOGGER = getLogger(__name__)
+
+# Number of recent durations kept for each span
+_SAMPLES = 200
+
+# Name of the span covering the time from a command until its state was written
+VISIBLE_SPAN = "command_to_visible"
+
+
+@dataclass
+class CommandTrace:
+    """A command being traced."""
+
+    correlation_id: str
+    name: str
+    # The entity whose state shows the outcome, or None for any entity
+    target: str | None = None
+    started: float = field(default_factory=monotonic)
+    visible: bool = False
+
+
+_current_trace: ContextVar[CommandTrace | None] = ContextVar(
+    "wavespa_command_trace", default=None
+)
+
+
+def current_correlation_id() -> str | None:
+    """Get the correlation ID of the command being handled, if any."""
+    trace = _current_trace.get()
+    return trace.correlation_id if trace else None
+
+
+class CommandTracer:
+    """Records how long each stage of a command takes.
+
+    A trace is started when a command is issued, and its correlation ID is carried
+    in a context variable. Spans entered while handling the command, including in
+    tasks created on its behalf, are attributed to it. Spans outside of a trace
+    are not recorded.
+    """
+
+    def __init__(self) -> None:
+        """Create a tracer without any recorded spans."""
+        self._ids = count(1)
+        self._durations: dict[str, deque[float]] = {}
+
+    @contextmanager
+    def trace(self, name: str, target: str | None = None) -> Iterator[CommandTrace]:
+        """Trace a command, covering the enclosed block with a span of the same name.
+
+        The command becomes visible when the state of the target is written, or
+        that of any entity if there is no target.
+        """
+        trace = CommandTrace(f"{next(self._ids):x}", name, target)
+        token = _current_trace.set(trace)
+        try:
+            with self.span(name):
+                yield trace
+        finally:
+            _current_trace.reset(token)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time a stage of the command being traced."""
+        if (trace := _current_trace.get()) is None:
+            yield
+            return
+
+        started = monotonic()
+        try:
+            yield
+        finally:
+            self._record(trace, name, monotonic() - started)
+
+    def mark_visible(self, source: str | None = None) -> None:
+        """Record that the state of an entity was written while tracing a command.
+
+        Only the first write of the commanded entity is recorded, as other entities
+        of the same device may be written before it.
+        """
+        trace = _current_trace.get()
+        if trace is None or trace.visible:
+            return
+        if trace.target is not None and source != trace.target:
+            return
+        trace.visible = True
+        self._record(trace, VISIBLE_SPAN, monotonic() - trace.started)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Get percentiles of the recent durations of each span, in milliseconds."""
+        return {
+            name: {
+                "count": len(durations),
+                "p50": _percentile(durations, 50),
+                "p95": _percentile(durations, 95),
+                "p99": _percentile(durations, 99),
+                "max": round(max(durations) * 1000, 1),
+            }
+            for name, durations in self._durations.items()
+        }
+
+    def _record(self, trace: CommandTrace, name: str, duration: float) -> None:
+        """Store the duration of a span."""
+        _LOGGER.debug(
+            "[%s] %s: %s took %.1f ms",
+            trace.correlation_id,
+            trace.name,
+            name,
+            duration * 1000,
+        )
+        if (durations := self._durations.get(name)) is None:
+            durations = self._durations[name] = deque(maxlen=_SAMPLES)
+        durations.append(duration)
+
+
+def _percentile(durations: deque[float], percent: int) -> float:
+    """Get a percentile of the durations in milliseconds, using the nearest rank."""
+    ordered = sorted(durations)
+    rank = max(0, -(-len(ordered) * percent // 100) - 1)
+    return round(ordered[rank] * 1000, 1)
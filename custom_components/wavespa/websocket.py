@@ -0,0 +1,61 @@
+"""Websocket API of the wavespa integration."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.components import websocket_api
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+import homeassistant.util.dt as dt_util
+import voluptuous as vol
+
+from .const import DOMAIN, WS_TYPE_HISTORY
+from .coordinator import async_get_device_coordinator
+
+# History returned when no start time is given
+_DEFAULT_HISTORY_PERIOD = timedelta(days=1)
+
+
+@callback
+def async_setup_websocket(hass: HomeAssistant) -> None:
+    """Register the websocket commands."""
+    websocket_api.async_register_command(hass, websocket_history)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_HISTORY,
+        vol.Required(ATTR_DEVICE_ID): cv.string,
+        vol.Optional("start_time"): cv.datetime,
+        vol.Optional("end_time"): cv.datetime,
+    }
+)
+@callback
+def websocket_history(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Get the temperature history of a spa from memory.
+
+    The history has a column per value, each a list with one value per point, at the
+    finest resolution available for each part of the requested period.
+    """
+    if (coordinator := async_get_device_coordinator(hass, msg[ATTR_DEVICE_ID])) is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, f"Not a {DOMAIN} device"
+        )
+        return
+
+    # Times without a time zone are in the local time zone of Home Assistant
+    end_time = dt_util.as_utc(msg.get("end_time") or dt_util.utcnow())
+    start_time = dt_util.as_utc(
+        msg.get("start_time") or end_time - _DEFAULT_HISTORY_PERIOD
+    )
+    connection.send_result(
+        msg["id"],
+        coordinator.history.query(start_time.timestamp(), end_time.timestamp()),
+    )
@@ -0,0 +1,306 @@
+"""Record and replay timelines of Gizwits API traffic on a frozen clock.
+
+A cassette holds timestamped API responses, and commands to issue along the way.
+When replayed, each request is answered with the latest response recorded for the
+same method and path at or before the current (frozen) time, so a cassette only
+needs an entry whenever a response changes. The clock jumps from one poll to the
+next, so days of polling can be replayed in seconds.
+
+Cassettes can be synthesised in code, or recorded from a real account with device
+IDs, tokens and other identifying details redacted:
+
+    WAVESPA_PASSWORD=... python -m tests.cassette user@example.org out.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from bisect import bisect_right
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import timedelta
+import os
+from pathlib import Path
+import time
+from typing import Any
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+import orjson
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.wavespa.const import (
+    APPLY_STATE_DATA_POINTS,
+    CONF_API_ROOT_EU,
+    DOMAIN,
+    SERVICE_APPLY_STATE,
+)
+from custom_components.wavespa.wavespa.api import WavespaApi
+from custom_components.wavespa.wavespa.model import SPA_DATA_POINTS
+
+from tests.simulator import API_ROOT, MockResponse
+
+CASSETTE_DIR = Path(__file__).parent / "cassettes"
+_VERSION = 1
+
+# Wall time at which the timeline of a cassette starts
+WALL_START = 1_700_000_000
+
+# Fields removed from recorded responses, as they identify the account or device
+_REDACTED_FIELDS = {"mac", "passcode", "product_key", "remark", "token", "uid"}
+
+
+@dataclass
+class Interaction:
+    """An API response, served from a number of seconds into the timeline."""
+
+    at: float
+    method: str
+    path: str
+    body: Any
+    status: int = 200
+
+
+@dataclass
+class Command:
+    """A command to send to a device at a number of seconds into the timeline."""
+
+    at: float
+    device_id: str
+    attrs: dict[str, int]
+
+
+@dataclass
+class Cassette:
+    """A timeline of API responses and commands."""
+
+    description: str = ""
+    interactions: list[Interaction] = field(default_factory=list)
+    commands: list[Command] = field(default_factory=list)
+
+    def add(
+        self, at: float, method: str, path: str, body: Any, status: int = 200
+    ) -> None:
+        """Serve a response from the given time onwards."""
+        self.interactions.append(Interaction(at, method, path, body, status))
+
+    def add_command(self, at: float, device_id: str, attrs: dict[str, int]) -> None:
+        """Send a command at the given time."""
+        self.commands.append(Command(at, device_id, attrs))
+
+    @classmethod
+    def load(cls, path: Path) -> Cassette:
+        """Load a cassette from a JSON file."""
+        data = orjson.loads(path.read_bytes())
+        if data.get("version") != _VERSION:
+            raise ValueError(f"Unsupported cassette version {data.get('version')}")
+        return cls(
+            data.get("description", ""),
+            [Interaction(**interaction) for interaction in data["interactions"]],
+            [Command(**command) for command in data.get("commands", [])],
+        )
+
+    def save(self, path: Path) -> None:
+        """Save the cassette to a JSON file."""
+        data = {"version": _VERSION, **asdict(self)}
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2) + b"\n")
+
+
+class CassetteSession:
+    """A client session that replays the responses in a cassette."""
+
+    def __init__(self, cassette: Cassette, wall_start: float = WALL_START) -> None:
+        """Create a session replaying the cassette from the given wall time."""
+        self._wall_start = wall_start
+        self._interactions: dict[tuple[str, str], list[Interaction]] = {}
+        for interaction in sorted(cassette.interactions, key=lambda i: i.at):
+            key = (interaction.method, interaction.path)
+            self._interactions.setdefault(key, []).append(interaction)
+        self._times = {
+            key: [interaction.at for interaction in interactions]
+            for key, interactions in self._interactions.items()
+        }
+        self.requests: list[tuple[float, str, str]] = []
+        self.commands: list[tuple[float, dict[str, Any]]] = []
+
+    @property
+    def elapsed(self) -> float:
+        """Get the number of seconds into the timeline."""
+        return time.time() - self._wall_start
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        json: dict[str, Any] | None = None,
+    ) -> MockResponse:
+        """Serve the latest response recorded for the request."""
+        path = url.removeprefix(API_ROOT)
+        elapsed = self.elapsed
+        self.requests.append((elapsed, method, path))
+        if method == "POST" and json and "attrs" in json:
+            self.commands.append((elapsed, json["attrs"]))
+
+        key = (method, path)
+        index = bisect_right(self._times.get(key, []), elapsed)
+        if index == 0:
+            if method == "POST":
+                return MockResponse({})
+            return MockResponse({"error_code": 9999}, 404)
+
+        latest = self._interactions[key][index - 1]
+        return MockResponse(latest.body, latest.status)
+
+    async def post(
+        self,
+        url: str,
+        headers: dict[str, str],
+        json: dict[str, Any] | None = None,
+    ) -> MockResponse:
+        """Serve a POST request."""
+        return await self.request("POST", url, headers, json)
+
+
+async def replay(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    cassette: Cassette,
+    duration: float,
+    interval: float = 30,
+    on_poll: Callable[[float], None] | None = None,
+) -> None:
+    """Run the integration through a cassette's timeline, sending its commands.
+
+    The integration must already be set up with a CassetteSession, at the start of
+    the timeline. The frozen clock is moved on an interval at a time, and whatever
+    polling the coordinators have scheduled by then is run. Commands that are due
+    are sent through the apply_state service, concurrently with those polls, so
+    that they race with them.
+    """
+    fields = {point.key: name for name, point in APPLY_STATE_DATA_POINTS.items()}
+    device_registry = dr.async_get(hass)
+    commands = sorted(cassette.commands, key=lambda c: c.at)
+    elapsed = 0.0
+
+    while elapsed < duration:
+        freezer.tick(timedelta(seconds=interval))
+        elapsed += interval
+        due = [command for command in commands if command.at <= elapsed]
+        commands = commands[len(due) :]
+
+        for command in due:
+            device = device_registry.async_get_device(
+                identifiers={(DOMAIN, command.device_id)}
+            )
+            assert device is not None
+            service_data = {
+                fields[key]: SPA_DATA_POINTS[key].decode(value)
+                for key, value in command.attrs.items()
+            }
+            hass.async_create_task(
+                hass.services.async_call(
+                    DOMAIN,
+                    SERVICE_APPLY_STATE,
+                    {"device_id": device.id, **service_data},
+                    blocking=True,
+                )
+            )
+
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        if on_poll:
+            on_poll(elapsed)
+
+
+def redact(data: Any, aliases: dict[str, str]) -> Any:
+    """Remove identifying details from a response, replacing device IDs by aliases."""
+    if isinstance(data, dict):
+        redacted = {}
+        for key, value in data.items():
+            if key in _REDACTED_FIELDS:
+                continue
+            if key == "did":
+                value = aliases.setdefault(value, f"spa{len(aliases) + 1}")
+            elif key == "dev_alias":
+                value = "Spa"
+            redacted[key] = redact(value, aliases)
+        return redacted
+    if isinstance(data, list):
+        return [redact(item, aliases) for item in data]
+    return data
+
+
+class RecordingSession:
+    """A client session that records the responses of a real session."""
+
+    def __init__(self, session: Any, api_root: str) -> None:
+        """Record responses to requests made through the given session."""
+        self._session = session
+        self._api_root = api_root
+        self._started = time.monotonic()
+        self._aliases: dict[str, str] = {}
+        self.cassette = Cassette("Recorded from a real account")
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        json: dict[str, Any] | None = None,
+    ) -> MockResponse:
+        """Make a request, and record its response."""
+        response = await self._session.request(method, url, headers=headers, json=json)
+        body = orjson.loads(await response.read())
+        at = round(time.monotonic() - self._started, 3)
+
+        # Redacting the body first makes sure the IDs in the path have aliases
+        redacted = redact(body, self._aliases)
+        path = url.removeprefix(self._api_root)
+        for device_id, alias in self._aliases.items():
+            path = path.replace(device_id, alias)
+        self.cassette.add(at, method, path, redacted, response.status)
+        return MockResponse(body, response.status)
+
+
+async def _record(
+    username: str, password: str, api_root: str, minutes: float, output: Path
+) -> None:
+    """Poll a real account for a while, recording every response."""
+    from aiohttp import ClientSession  # pylint: disable=import-outside-toplevel
+
+    async with ClientSession() as session:
+        token = await WavespaApi.get_user_token(session, username, password, api_root)
+        recorder = RecordingSession(session, api_root)
+        api = WavespaApi(recorder, token.user_token, api_root)  # type: ignore[arg-type]
+        end = time.monotonic() + minutes * 60
+        while time.monotonic() < end:
+            await api.refresh_bindings()
+            for did in api.devices:
+                try:
+                    await api.fetch_device(did)
+                except Exception:  # pylint: disable=broad-except
+                    # Failures are part of the timeline, so keep recording
+                    pass
+            await asyncio.sleep(30)
+    recorder.cassette.save(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record a cassette of API traffic")
+    parser.add_argument("username")
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--api-root", default=CONF_API_ROOT_EU)
+    parser.add_argument("--minutes", type=float, default=60)
+    args = parser.parse_args()
+    asyncio.run(
+        _record(
+            args.username,
+            os.environ["WAVESPA_PASSWORD"],
+            args.api_root,
+            args.minutes,
+            args.output,
+        )
+    )
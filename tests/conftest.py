@@ -1,8 +1,23 @@
 """Global fixtures for wavespa integration."""
 
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
 from unittest.mock import patch
 
+from homeassistant.core import HomeAssistant
 import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.wavespa.const import (
+    CONF_API_ROOT,
+    CONF_PASSWORD,
+    CONF_USER_TOKEN,
+    CONF_USER_TOKEN_EXPIRY,
+    CONF_USERNAME,
+    DOMAIN,
+)
+
+from tests.simulator import API_ROOT, MockSession
 
 pytest_plugins = "pytest_homeassistant_custom_component"
 
@@ -52,7 +67,7 @@ def error_auth():
 def bypass_get_data_fixture():
     """Skip calls to get data from API."""
     with (
-        patch("custom_components.wavespa.wavespa.api.WavespaApi.fetch_data"),
+        patch("custom_components.wavespa.wavespa.api.WavespaApi.fetch_device"),
         patch("custom_components.wavespa.wavespa.api.WavespaApi.refresh_bindings"),
     ):
         yield
@@ -63,7 +78,45 @@ def bypass_get_data_fixture():
 def error_get_data_fixture():
     """Simulate error when retrieving data from API."""
     with patch(
-        "custom_components.wavespa.wavespa.api.WavespaApi.fetch_data",
+        "custom_components.wavespa.wavespa.api.WavespaApi.refresh_bindings",
         side_effect=Exception,
     ):
         yield
+
+
+# Sets up config entries that talk to a simulated API.
+@pytest.fixture(name="setup_integration")
+def setup_integration_fixture(
+    hass: HomeAssistant,
+) -> Callable[..., Awaitable[MockConfigEntry]]:
+    """Return a function that sets up an entry using a simulated API session."""
+
+    async def setup_integration(
+        session: MockSession,
+        username: str = "test@example.org",
+        token_lifetime: timedelta = timedelta(days=31),
+    ) -> MockConfigEntry:
+        """Set up an entry, and wait until its entities have state."""
+        config_entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=username,
+            data={
+                CONF_USERNAME: username,
+                CONF_PASSWORD: "P@asw0rd",
+                CONF_API_ROOT: API_ROOT,
+                CONF_USER_TOKEN: "t0k3n",
+                CONF_USER_TOKEN_EXPIRY: int(
+                    (datetime.now() + token_lifetime).timestamp()
+                ),
+            },
+            version=2,
+        )
+        config_entry.add_to_hass(hass)
+        with patch(
+            "custom_components.wavespa.async_get_clientsession", return_value=session
+        ):
+            assert await hass.config_entries.async_setup(config_entry.entry_id)
+            await hass.async_block_till_done()
+        return config_entry
+
+    return setup_integration
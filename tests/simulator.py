@@ -0,0 +1,136 @@
+"""A local stand-in for the Gizwits API used by Wavespa devices."""
+
+import asyncio
+from time import time
+from typing import Any
+
+from aiohttp import ClientResponseError, RequestInfo
+from multidict import CIMultiDict, CIMultiDictProxy
+import orjson
+from yarl import URL
+
+from custom_components.wavespa.wavespa.api import WavespaApi
+
+API_ROOT = "https://api.example.org"
+
+
+class MockResponse:
+    """A canned API response."""
+
+    def __init__(self, data: Any, status: int = 200) -> None:
+        """Create a response containing the given JSON data."""
+        self._data = data
+        self.ok = status < 400
+        self.status = status
+        self.content_type = "application/json"
+
+    async def read(self) -> bytes:
+        """Return the encoded response body."""
+        return orjson.dumps(self._data)
+
+    def raise_for_status(self) -> None:
+        """Raise an error if the response is not successful."""
+        if not self.ok:
+            raise ClientResponseError(
+                RequestInfo(URL(API_ROOT), "GET", CIMultiDictProxy(CIMultiDict())),
+                (),
+                status=self.status,
+                message=orjson.dumps(self._data).decode(),
+            )
+
+
+class MockSession:
+    """A client session that serves bindings and status for a set of spas."""
+
+    def __init__(self, device_ids: list[str], latency: float = 0) -> None:
+        """Create a session serving the given devices, with a delay per request."""
+        self.device_ids = device_ids
+        self.latency = latency
+        self.errors: dict[str, Exception] = {}
+        # Extra delay for the next status request of each device
+        self.stalls: dict[str, float] = {}
+        # Devices that the bindings report as offline
+        self.offline: set[str] = set()
+        # Product names of devices that are not EU spas
+        self.product_names: dict[str, str] = {}
+        self.timestamp = 1000
+        self.updated_at: dict[str, int] = {}
+        self.attrs: dict[str, Any] = {
+            "Heater": 1,
+            "Filter": 1,
+            "Bubble": 0,
+            "locked": 0,
+            "Temperature_setup": 38,
+            "Current_temperature": 35,
+            "Time_filter": 100,
+        }
+        self.requests: list[str] = []
+        self.commands: list[dict[str, Any]] = []
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        json: dict[str, Any] | None = None,
+    ) -> MockResponse:
+        """Serve a request."""
+        self.requests.append(url)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if url == f"{API_ROOT}/app/login":
+            return MockResponse(
+                {"uid": "user", "token": "t0k3n", "expire_at": int(time()) + 604800}
+            )
+        if method == "POST":
+            if json and "attrs" in json:
+                self.commands.append(json["attrs"])
+            return MockResponse({})
+        if url == f"{API_ROOT}/app/bindings":
+            return MockResponse(
+                {
+                    "devices": [
+                        {
+                            "protoc": 1,
+                            "did": did,
+                            "product_name": self.product_names.get(
+                                did, "Wave_SPA_EU"
+                            ),
+                            "dev_alias": f"Spa {did}",
+                            "mcu_soft_version": "1",
+                            "mcu_hard_version": "1",
+                            "wifi_soft_version": "1",
+                            "wifi_hard_version": "1",
+                            "is_online": did not in self.offline,
+                        }
+                        for did in self.device_ids
+                    ]
+                }
+            )
+
+        did = url.split("/")[-2]
+        if stall := self.stalls.pop(did, 0):
+            await asyncio.sleep(stall)
+        if error := self.errors.get(did):
+            raise error
+        return MockResponse(
+            {
+                "updated_at": self.updated_at.get(did, self.timestamp),
+                "attr": self.attrs,
+            }
+        )
+
+    async def post(
+        self,
+        url: str,
+        headers: dict[str, str],
+        json: dict[str, Any] | None = None,
+    ) -> MockResponse:
+        """Serve a POST request."""
+        return await self.request("POST", url, headers, json)
+
+
+async def poll_devices(api: WavespaApi) -> None:
+    """Fetch the status of each device in turn, as their coordinators do."""
+    for did in list(api.devices):
+        await api.fetch_device(did)
@@ -0,0 +1,285 @@
+"""Test the wavespa API client."""
+
+import asyncio
+from unittest.mock import patch
+
+from aiohttp import ClientConnectionError, ClientResponseError
+import pytest
+
+from custom_components.wavespa.wavespa.api import (
+    WavespaApi,
+    WavespaCircuitOpenException,
+    WavespaMalformedResponseException,
+    WavespaOfflineException,
+)
+from custom_components.wavespa.wavespa.circuit_breaker import CircuitState
+from custom_components.wavespa.wavespa.model import BUBBLE, FILTER, TEMPERATURE_SETUP
+
+from tests.simulator import API_ROOT, MockResponse, MockSession
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    """Provide a session serving two spas."""
+    return MockSession(["spa1", "spa2"])
+
+
+async def test_device_failures_recorded_in_health(session):
+    """Test that failures are recorded against the device that failed."""
+    api = WavespaApi(session, "t0k3n", API_ROOT)
+    await api.refresh_bindings()
+    session.errors["spa2"] = ClientConnectionError("Connection reset")
+
+    for _ in range(2):
+        await api.fetch_device("spa1")
+        with pytest.raises(ClientConnectionError):
+            await api.fetch_device("spa2")
+
+    assert api.health["spa1"].consecutive_failures == 0
+    assert api.health["spa1"].last_success is not None
+    assert api.health["spa2"].consecutive_failures == 2
+    assert api.health["spa2"].last_error == "ClientConnectionError"
+    assert api.health["spa2"].backoff > 0
+
+    # The error message would identify the device, so only its kind is recorded
+    response = MockResponse({"error_message": "Device 'spa2' not found"}, 404)
+    with pytest.raises(ClientResponseError) as error:
+        response.raise_for_status()
+    session.errors["spa2"] = error.value
+    with pytest.raises(ClientResponseError):
+        await api.fetch_device("spa2")
+    assert api.health["spa2"].last_error == "ClientResponseError (HTTP 404)"
+
+
+async def test_offline_device_probe_backoff(session):
+    """Test that devices without data are only probed occasionally."""
+    api = WavespaApi(session, "t0k3n", API_ROOT)
+    await api.refresh_bindings()
+    session.updated_at["spa2"] = 0
+
+    # Until the next probe, the device is reported offline without a request
+    for _ in range(2):
+        with pytest.raises(WavespaOfflineException):
+            await api.fetch_device("spa2")
+    assert session.requests.count(f"{API_ROOT}/app/devdata/spa2/latest") == 1
+    assert api.health["spa2"].consecutive_failures == 1
+
+    # Resumes normal polling once there is evidence of the device being online
+    api.mark_device_active("spa2")
+    session.updated_at["spa2"] = 1000
+    for _ in range(2):
+        await api.fetch_device("spa2")
+    assert session.requests.count(f"{API_ROOT}/app/devdata/spa2/latest") == 3
+
+
+async def test_circuit_breaker_fails_fast(session):
+    """Test that requests stop reaching the API after repeated failures."""
+    api = WavespaApi(session, "t0k3n", API_ROOT)
+    await api.refresh_bindings()
+    session.errors["spa1"] = ClientConnectionError("Connection refused")
+    session.errors["spa2"] = ClientConnectionError("Connection refused")
+
+    for did in ("spa1", "spa2", "spa1"):
+        with pytest.raises(ClientConnectionError):
+            await api.fetch_device(did)
+    assert api.circuit_breaker.state == CircuitState.OPEN
+
+    request_count = len(session.requests)
+    with pytest.raises(WavespaCircuitOpenException):
+        await api.fetch_device("spa1")
+    assert len(session.requests) == request_count
+
+
+async def test_malformed_device_data(session):
+    """Test that unexpected payloads raise a clear error."""
+    api = WavespaApi(session, "t0k3n", API_ROOT)
+    await api.refresh_bindings()
+    session.attrs = None
+
+    with pytest.raises(WavespaMalformedResponseException, match="'attr'"):
+        await api.fetch_device("spa1")
+
+
+async def test_malformed_device_in_bindings(session):
+    """Test that a malformed device is skipped without affecting the others."""
+    api = WavespaApi(session, "t0k3n", API_ROOT)
+    session.product_names["spa2"] = None
+
+    await api.refresh_bindings()
+
+    assert list(api.devices) == ["spa1"]
+    await api.fetch_device("spa1")
+
+
+async def test_local_writes_pinned_until_confirmed(session):
+    """Test that written attributes survive polls while others keep updating."""
+    api = WavespaApi(session, "t0k3n", API_ROOT)
+    await api.refresh_bindings()
+    await api.fetch_device("spa1")
+
+    # The API has not caught up with the heater being turned off yet
+    await api.airjet_spa_set_heat("spa1", False)
+    session.attrs["Current_temperature"] = 36
+    status = await api.fetch_device("spa1")
+    assert status.attrs["Heater"] == 0
+    assert status.attrs["Current_temperature"] == 36
+
+    # Once confirmed, later changes reported by the API are applied again
+    session.attrs["Heater"] = 0
+    await api.fetch_device("spa1")
+    session.attrs["Heater"] = 1
+    status = await api.fetch_device("spa1")
+    assert status.attrs["Heater"] == 1
+
+
+async def test_local_writes_pinned_with_skewed_device_clock(session):
+    """Test that device timestamps are compared with writes on the local clock."""
+    now = 1_700_000_000.0
+    with patch("custom_components.wavespa.wavespa.api.time", lambda: now):
+        api = WavespaApi(session, "t0k3n", API_ROOT)
+        await api.refresh_bindings()
+
+        # The device clock is an hour behind the local clock
+        session.timestamp = int(now) - 3600
+        await api.fetch_device("spa1")
+        await api.airjet_spa_set_heat("spa1", False)
+
+        # Status from within the grace period after the write keeps the pin
+        now += 20
+        session.timestamp += 20
+        status = await api.fetch_device("spa1")
+        assert status.attrs["Heater"] == 0
+
+        # Status from well after the write means the heater was turned back on
+        now += 40
+        session.timestamp += 40
+        status = await api.fetch_device("spa1")
+        assert status.attrs["Heater"] == 1
+
+
+async def test_local_writes_pin_expires(session):
+    """Test that a value the API never confirms is only pinned for a while."""
+    now = 1_700_000_000.0
+    with patch("custom_components.wavespa.wavespa.api.time", lambda: now):
+        api = WavespaApi(session, "t0k3n", API_ROOT)
+        await api.refresh_bindings()
+        session.timestamp = int(now)
+        await api.fetch_device("spa1")
+        await api.airjet_spa_set_heat("spa1", False)
+
+        # The API keeps reporting the status from before the write
+        now += 299
+        status = await api.fetch_device("spa1")
+        assert status.attrs["Heater"] == 0
+
+        now += 2
+        status = await api.fetch_device("spa1")
+        assert status.attrs["Heater"] == 1
+
+
+async def test_command_pipeline(session):
+    """Test that redundant commands are not sent to the API."""
+    api = WavespaApi(session, "t0k3n", API_ROOT)
+    await api.refresh_bindings()
+    await api.fetch_device("spa1")
+    control_url = f"{API_ROOT}/app/control/spa1"
+
+    # The heater is already on according to the API
+    await api.airjet_spa_set_heat("spa1", True)
+    assert control_url not in session.requests
+
+    # Identical commands in flight at the same time share one request
+    await asyncio.gather(
+        api.airjet_spa_set_heat("spa1", False),
+        api.airjet_spa_set_heat("spa1", False),
+    )
+    assert session.requests.count(control_url) == 1
+
+
+async def test_commands_with_different_side_effects_not_joined(session):
+    """Test that commands only share a request if they write the same state."""
+    api = WavespaApi(session, "t0k3n", API_ROOT)
+    await api.refresh_bindings()
+    await api.fetch_device("spa1")
+
+    # Both send the heater off, but powering off also turns off the filter
+    await asyncio.gather(
+        api.airjet_spa_set_heat("spa1", False),
+        api.airjet_spa_set_power("spa1", False),
+    )
+    assert session.commands == [{"Heater": 0}, {"Heater": 0}]
+    assert api.get_cached_status("spa1").attrs["Filter"] == 0
+
+
+async def test_command_sent_when_side_effects_differ(session):
+    """Test that a command is sent if any attribute it writes is not confirmed."""
+    api = WavespaApi(session, "t0k3n", API_ROOT)
+    await api.refresh_bindings()
+    session.attrs["Filter"] = 0
+    await api.fetch_device("spa1")
+
+    # The heater is already on, but turning it on also turns on the filter
+    await api.airjet_spa_set_heat("spa1", True)
+    assert session.commands == [{"Heater": 1}]
+    assert api.get_cached_status("spa1").attrs["Filter"] == 1
+
+
+async def test_apply_state_sends_one_command(session):
+    """Test that several attributes are applied with a single request."""
+    api = WavespaApi(session, "t0k3n", API_ROOT)
+    await api.refresh_bindings()
+    await api.fetch_device("spa1")
+
+    await api.apply_state(
+        "spa1", {FILTER: False, BUBBLE: True, TEMPERATURE_SETUP: 40}
+    )
+
+    assert session.requests.count(f"{API_ROOT}/app/control/spa1") == 1
+    status = api.get_cached_status("spa1")
+    assert status.attrs["Filter"] == 0
+    assert status.attrs["Bubble"] == 1
+    assert status.attrs["Temperature_setup"] == 40
+
+
+async def test_set_locked_uses_lock_attribute(session):
+    """Test that the lock state is written to the attribute it is read from."""
+    api = WavespaApi(session, "t0k3n", API_ROOT)
+    await api.refresh_bindings()
+    await api.fetch_device("spa1")
+
+    await api.airjet_spa_set_locked("spa1", True)
+
+    assert session.commands == [{"locked": 1}]
+
+
+async def test_hedged_requests(session):
+    """Test that stalled status requests are hedged, within a budget."""
+    loop = asyncio.get_running_loop()
+    api = WavespaApi(session, "t0k3n", API_ROOT, hedge_requests=True)
+    assert api.hedger is not None
+
+    await api.refresh_bindings()
+    for _ in range(30):
+        await api.fetch_device("spa1")
+    assert api.hedger.hedged_count == 0
+    # Only status requests are hedged, so other endpoints do not skew their latency
+    assert api.hedger.request_count == 30
+
+    # The duplicate request responds long before the stalled one
+    session.stalls["spa1"] = 0.5
+    started = loop.time()
+    await api.fetch_device("spa1")
+    assert loop.time() - started < 0.25
+    assert api.hedger.hedge_wins == 1
+    assert session.requests.count(f"{API_ROOT}/app/devdata/spa1/latest") == 32
+    # The stalled request counts as taking at least as long as it was outstanding
+    assert max(api.hedger._latencies) >= loop.time() - started - 0.05
+
+    # Persistent stalls exhaust the budget rather than doubling the load
+    for _ in range(8):
+        session.stalls["spa1"] = 0.5
+        await api.fetch_device("spa1")
+
+    assert api.hedger.over_budget_count > 0
+    assert api.hedger.hedged_count <= api.hedger.request_count * 0.1
+    assert api.hedger.win_rate == 1
@@ -0,0 +1,85 @@
+"""Test the wavespa binary sensors."""
+
+from datetime import timedelta
+
+from homeassistant.const import EVENT_STATE_CHANGED, EVENT_STATE_REPORTED, STATE_ON
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+import homeassistant.util.dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.wavespa.const import DOMAIN
+
+from tests.simulator import MockSession
+
+
+async def _async_next_poll(hass: HomeAssistant, session: MockSession) -> None:
+    """Report a new status, and wait for the next poll."""
+    session.timestamp += 30
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=30))
+    await hass.async_block_till_done()
+
+
+async def test_device_errors(hass: HomeAssistant, setup_integration):
+    """Test that active errors are reported compactly, and written on change."""
+    session = MockSession(["spa1"])
+    session.attrs.update(
+        {
+            "system_err3": 1,
+            "system_err1": 1,
+            "system_err2": 0,
+            "system_err16": 0,
+            "earth": 0,
+        }
+    )
+    config_entry = await setup_integration(session)
+    entity_id = er.async_get(hass).async_get_entity_id(
+        "binary_sensor", DOMAIN, "spa1_spa_has_error"
+    )
+    assert entity_id is not None
+
+    state = hass.states.get(entity_id)
+    assert state.state == STATE_ON
+    assert state.attributes["active_errors"] == ["system_err1", "system_err3"]
+    assert state.attributes["error_mask"] == f"{(1 << 3) | (1 << 5):x}"
+    assert state.attributes["errors"] == {
+        "system_err1": True,
+        "system_err2": False,
+        "system_err3": True,
+        "system_err16": False,
+        "earth": False,
+    }
+    # The full error properties are left out of the recorded history
+    assert "errors" in state.state_info["unrecorded_attributes"]
+
+    writes: list[str] = []
+
+    @callback
+    def record_write(event: Event) -> None:
+        if event.data["entity_id"] == entity_id:
+            writes.append(event.event_type)
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, record_write)
+    hass.bus.async_listen(EVENT_STATE_REPORTED, record_write)
+
+    # New inactive error properties do not change the active errors
+    session.attrs["system_err4"] = 0
+    await _async_next_poll(hass, session)
+    assert writes == []
+
+    session.attrs["earth"] = 1
+    await _async_next_poll(hass, session)
+    assert writes == [EVENT_STATE_CHANGED]
+    state = hass.states.get(entity_id)
+    assert state.attributes["active_errors"] == ["earth", "system_err1", "system_err3"]
+    assert state.attributes["error_mask"] == f"{1 | (1 << 3) | (1 << 5):x}"
+
+    # Each family of error codes has its own bits in the mask
+    session.attrs.update({"earth": 0, "system_err1": 0, "system_err3": 0})
+    session.attrs.update({"system_err16": 1, "E00": 1})
+    await _async_next_poll(hass, session)
+    state = hass.states.get(entity_id)
+    assert state.attributes["active_errors"] == ["E00", "system_err16"]
+    assert state.attributes["error_mask"] == f"{(1 << 18) | (1 << 102):x}"
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
@@ -4,11 +4,16 @@ from unittest.mock import patch
 
 from homeassistant import config_entries, data_entry_flow
 import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
+from custom_components.wavespa.wavespa.api import WavespaUserDoesNotExistException
 from custom_components.wavespa.wavespa.model import WavespaUserToken
 from custom_components.wavespa.const import (
+    CONF_API_LATENCY,
     CONF_API_ROOT,
     CONF_API_ROOT_EU,
+    CONF_API_ROOT_US,
+    CONF_HEDGE_REQUESTS,
     CONF_PASSWORD,
     CONF_USER_TOKEN,
     CONF_USER_TOKEN_EXPIRY,
@@ -20,7 +25,6 @@ from custom_components.wavespa.const import (
 MOCK_USER_INPUT = {
     CONF_USERNAME: "test@example.org",
     CONF_PASSWORD: "P@asw0rd",
-    CONF_API_ROOT: CONF_API_ROOT_EU,
 }
 
 
@@ -49,24 +53,34 @@ async def test_successful_config_flow(hass, bypass_get_data):
     assert result["type"] == data_entry_flow.RESULT_TYPE_FORM
     assert result["step_id"] == "user"
 
-    # Mock an authentication call that provides a token to keep hold of
+    # Mock an authentication call that provides a token to keep hold of,
+    # but only from the EU API root
     token = WavespaUserToken("foo", "t0k3n", 123)
+
+    async def get_user_token(session, username, password, api_root):
+        if api_root != CONF_API_ROOT_EU:
+            raise WavespaUserDoesNotExistException()
+        return token
+
     with patch(
         "custom_components.wavespa.wavespa.api.WavespaApi.get_user_token",
-        return_value=token,
+        side_effect=get_user_token,
     ):
         result = await hass.config_entries.flow.async_configure(
             result["flow_id"], user_input=MOCK_USER_INPUT
         )
 
     expected_output = dict(MOCK_USER_INPUT)
+    expected_output[CONF_API_ROOT] = CONF_API_ROOT_EU
     expected_output[CONF_USER_TOKEN] = token.user_token
     expected_output[CONF_USER_TOKEN_EXPIRY] = token.expiry
 
     # Check that the config flow is complete and a new entry is created with
-    # the input data
+    # the input data and the detected API root
     assert result["type"] == data_entry_flow.RESULT_TYPE_CREATE_ENTRY
     assert result["title"] == MOCK_USER_INPUT[CONF_USERNAME]
+    latency = result["data"].pop(CONF_API_LATENCY)
+    assert isinstance(latency, int)
     assert result["data"] == expected_output
     assert result["result"]
 
@@ -87,3 +101,85 @@ async def test_failed_config_flow(hass, error_on_auth):
 
     assert result["type"] == data_entry_flow.RESULT_TYPE_FORM
     assert result["errors"] == {"base": "unknown_connection_error"}
+
+
+# Simulate an account that does not exist in any region
+async def test_config_flow_unknown_user(hass):
+    """Test a config flow where no API root recognises the user."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+
+    with patch(
+        "custom_components.wavespa.wavespa.api.WavespaApi.get_user_token",
+        side_effect=WavespaUserDoesNotExistException,
+    ):
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], user_input=MOCK_USER_INPUT
+        )
+
+    assert result["type"] == data_entry_flow.RESULT_TYPE_FORM
+    assert result["errors"] == {"base": "user_does_not_exist"}
+
+
+async def test_options_flow(hass):
+    """Test that request hedging can be enabled in the options."""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_USER_INPUT)
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] == data_entry_flow.RESULT_TYPE_FORM
+    assert result["step_id"] == "init"
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input={CONF_HEDGE_REQUESTS: True}
+    )
+
+    assert result["type"] == data_entry_flow.RESULT_TYPE_CREATE_ENTRY
+    assert entry.options == {CONF_HEDGE_REQUESTS: True}
+
+
+async def test_reconfigure_flow(hass):
+    """Test that the API root of an entry is detected again when reconfigured."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={**MOCK_USER_INPUT, CONF_API_ROOT: CONF_API_ROOT_US},
+        version=2,
+    )
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={
+            "source": config_entries.SOURCE_RECONFIGURE,
+            "entry_id": entry.entry_id,
+        },
+    )
+    assert result["type"] == data_entry_flow.RESULT_TYPE_FORM
+    assert result["step_id"] == "reconfigure"
+
+    token = WavespaUserToken("foo", "t0k3n", 123)
+
+    async def get_user_token(session, username, password, api_root):
+        if api_root != CONF_API_ROOT_EU:
+            raise WavespaUserDoesNotExistException()
+        return token
+
+    with (
+        patch(
+            "custom_components.wavespa.wavespa.api.WavespaApi.get_user_token",
+            side_effect=get_user_token,
+        ),
+        patch.object(hass.config_entries, "async_reload") as reload,
+    ):
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], user_input={}
+        )
+        await hass.async_block_till_done()
+
+    assert result["type"] == data_entry_flow.RESULT_TYPE_ABORT
+    assert result["reason"] == "reconfigure_successful"
+    assert entry.data[CONF_API_ROOT] == CONF_API_ROOT_EU
+    assert entry.data[CONF_USER_TOKEN] == token.user_token
+    # Reloading is left to the update listener of the entry
+    reload.assert_not_called()
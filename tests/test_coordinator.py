@@ -0,0 +1,201 @@
+"""Test the wavespa update coordinators."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import patch
+
+from aiohttp import ClientConnectionError
+from homeassistant.const import STATE_UNAVAILABLE, Platform
+from homeassistant.core import HomeAssistant, State
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+import homeassistant.util.dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.wavespa.const import DOMAIN
+from custom_components.wavespa.coordinator import _REMOVAL_REFRESHES
+
+from tests.simulator import API_ROOT, MockSession
+
+
+def _thermostat(hass: HomeAssistant, device_id: str) -> State:
+    """Get the state of the thermostat of a spa."""
+    entity_id = er.async_get(hass).async_get_entity_id(
+        "climate", DOMAIN, f"{device_id}_thermostat"
+    )
+    assert entity_id is not None
+    state = hass.states.get(entity_id)
+    assert state is not None
+    return state
+
+
+async def _async_next_poll(hass: HomeAssistant, session: MockSession) -> None:
+    """Report a new status for every spa, and wait for the next poll."""
+    session.timestamp += 30
+    session.attrs["Current_temperature"] += 1
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=30))
+    await hass.async_block_till_done()
+
+
+async def test_devices_poll_independently(hass: HomeAssistant, setup_integration):
+    """Test that a slow spa does not hold back updates of the other spas."""
+    session = MockSession(["spa1", "spa2"])
+    config_entry = await setup_integration(session)
+
+    session.stalls["spa2"] = 0.5
+    session.timestamp += 30
+    session.attrs["Current_temperature"] = 36
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=30))
+
+    # The other spa is updated while the slow one is still waiting for a response
+    await asyncio.sleep(0.1)
+    assert _thermostat(hass, "spa1").attributes["current_temperature"] == 36
+    assert _thermostat(hass, "spa2").attributes["current_temperature"] == 35
+
+    await hass.async_block_till_done()
+    assert _thermostat(hass, "spa2").attributes["current_temperature"] == 36
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_device_failure_is_isolated(hass: HomeAssistant, setup_integration):
+    """Test that a failing spa leaves the other spas of the account available."""
+    session = MockSession(["spa1", "spa2", "spa3"])
+    config_entry = await setup_integration(session)
+
+    session.errors["spa2"] = ClientConnectionError()
+    await _async_next_poll(hass, session)
+
+    assert _thermostat(hass, "spa2").state == STATE_UNAVAILABLE
+    for device_id in ("spa1", "spa3"):
+        state = _thermostat(hass, device_id)
+        assert state.state != STATE_UNAVAILABLE
+        assert state.attributes["current_temperature"] == 36
+
+    # The failing spa recovers on its own, without affecting the others
+    del session.errors["spa2"]
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=10))
+    await hass.async_block_till_done()
+    assert _thermostat(hass, "spa2").state != STATE_UNAVAILABLE
+    assert _thermostat(hass, "spa2").attributes["current_temperature"] == 36
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_offline_device_not_failing_between_probes(
+    hass: HomeAssistant, setup_integration, caplog: pytest.LogCaptureFixture
+):
+    """Test that skipped polls of an offline spa do not count as failures."""
+    session = MockSession(["spa1"])
+    session.offline.add("spa1")
+    config_entry = await setup_integration(session)
+    coordinator = hass.data[DOMAIN][config_entry.entry_id].device_coordinators["spa1"]
+
+    # The probe at setup succeeds, and the polls after it are skipped
+    for _ in range(3):
+        await _async_next_poll(hass, session)
+        assert coordinator.last_update_success
+        assert _thermostat(hass, "spa1").state == STATE_UNAVAILABLE
+    assert session.requests.count(f"{API_ROOT}/app/devdata/spa1/latest") == 1
+    assert "Error fetching" not in caplog.text
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_device_added(hass: HomeAssistant, setup_integration):
+    """Test that a spa added to the account is set up without a reload."""
+    session = MockSession(["spa1"])
+    # Without the watchdog sensors, no entity listens to the account coordinator
+    with patch("custom_components.wavespa.sensor._WATCHDOG_SENSORS", []):
+        config_entry = await setup_integration(session)
+
+    session.device_ids.append("spa2")
+    await _async_next_poll(hass, session)
+
+    assert _thermostat(hass, "spa2").state != STATE_UNAVAILABLE
+    assert dr.async_get(hass).async_get_device(identifiers={(DOMAIN, "spa2")})
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_device_added_to_empty_account(hass: HomeAssistant, setup_integration):
+    """Test that spas come and go in an account that starts without any."""
+    session = MockSession([])
+    config_entry = await setup_integration(session)
+    assert not hass.states.async_entity_ids()
+
+    session.device_ids.append("spa1")
+    await _async_next_poll(hass, session)
+
+    assert _thermostat(hass, "spa1").state != STATE_UNAVAILABLE
+    device_registry = dr.async_get(hass)
+    assert device_registry.async_get_device(identifiers={(DOMAIN, "spa1")})
+
+    session.device_ids.remove("spa1")
+    for _ in range(_REMOVAL_REFRESHES):
+        await _async_next_poll(hass, session)
+    assert not device_registry.async_get_device(identifiers={(DOMAIN, "spa1")})
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_device_removed(hass: HomeAssistant, setup_integration):
+    """Test that a spa is only removed once it is missing from several polls."""
+    session = MockSession(["spa1", "spa2"])
+    with patch("custom_components.wavespa.sensor._WATCHDOG_SENSORS", []):
+        config_entry = await setup_integration(session)
+    device_registry = dr.async_get(hass)
+
+    session.device_ids.remove("spa2")
+    for _ in range(_REMOVAL_REFRESHES - 1):
+        await _async_next_poll(hass, session)
+        assert _thermostat(hass, "spa2").state == STATE_UNAVAILABLE
+        assert device_registry.async_get_device(identifiers={(DOMAIN, "spa2")})
+
+    await _async_next_poll(hass, session)
+    assert not device_registry.async_get_device(identifiers={(DOMAIN, "spa2")})
+    assert _thermostat(hass, "spa1").state != STATE_UNAVAILABLE
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_device_missing_from_one_poll(hass: HomeAssistant, setup_integration):
+    """Test that a spa missing from a single poll is kept, and recovers."""
+    session = MockSession(["spa1", "spa2"])
+    config_entry = await setup_integration(session)
+
+    session.device_ids.remove("spa2")
+    await _async_next_poll(hass, session)
+    assert _thermostat(hass, "spa2").state == STATE_UNAVAILABLE
+
+    session.device_ids.append("spa2")
+    for _ in range(2):
+        await _async_next_poll(hass, session)
+    assert _thermostat(hass, "spa2").state != STATE_UNAVAILABLE
+    assert dr.async_get(hass).async_get_device(identifiers={(DOMAIN, "spa2")})
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_entities_follow_capabilities(hass: HomeAssistant, setup_integration):
+    """Test that platforms and entities are only set up for reported capabilities."""
+    session = MockSession(["spa1"])
+    del session.attrs["Bubble"]
+    del session.attrs["Current_temperature"]
+    config_entry = await setup_integration(session)
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    assert coordinator.platforms == {
+        Platform.BINARY_SENSOR,
+        Platform.SENSOR,
+        Platform.SWITCH,
+    }
+    assert not hass.states.async_entity_ids(Platform.CLIMATE)
+    entity_registry = er.async_get(hass)
+    assert entity_registry.async_get_entity_id(Platform.SWITCH, DOMAIN, "spa1_Heater")
+    assert entity_registry.async_get_entity_id(Platform.SWITCH, DOMAIN, "spa1_Filter")
+    assert not entity_registry.async_get_entity_id(
+        Platform.SWITCH, DOMAIN, "spa1_Bubble"
+    )
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
@@ -0,0 +1,64 @@
+"""Test the state writes of wavespa entities."""
+
+from datetime import timedelta
+
+from aiohttp import ClientConnectionError
+from homeassistant.const import (
+    EVENT_STATE_CHANGED,
+    EVENT_STATE_REPORTED,
+    STATE_UNAVAILABLE,
+)
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+import homeassistant.util.dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.wavespa.const import DOMAIN
+
+from tests.simulator import MockSession
+
+
+async def _async_poll(hass: HomeAssistant) -> None:
+    """Wait for the next poll."""
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=30))
+    await hass.async_block_till_done()
+
+
+async def test_state_only_written_when_changed(hass: HomeAssistant, setup_integration):
+    """Test that a poll which leaves the derived state unchanged skips the write."""
+    session = MockSession(["spa1"])
+    config_entry = await setup_integration(session)
+    entity_id = er.async_get(hass).async_get_entity_id(
+        "climate", DOMAIN, "spa1_thermostat"
+    )
+    assert entity_id is not None
+
+    writes: list[str] = []
+
+    @callback
+    def record_write(event: Event) -> None:
+        if event.data["entity_id"] == entity_id:
+            writes.append(event.event_type)
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, record_write)
+    hass.bus.async_listen(EVENT_STATE_REPORTED, record_write)
+
+    # A newer status with the same values derives the same state
+    session.timestamp += 30
+    await _async_poll(hass)
+    assert writes == []
+
+    session.timestamp += 30
+    session.attrs["Current_temperature"] = 36
+    await _async_poll(hass)
+    assert writes == [EVENT_STATE_CHANGED]
+    assert hass.states.get(entity_id).attributes["current_temperature"] == 36
+
+    # A change of availability alone is written, although the status is the same
+    writes.clear()
+    session.errors["spa1"] = ClientConnectionError()
+    await _async_poll(hass)
+    assert writes == [EVENT_STATE_CHANGED]
+    assert hass.states.get(entity_id).state == STATE_UNAVAILABLE
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
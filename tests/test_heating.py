@@ -0,0 +1,59 @@
+"""Test the heating rate estimation."""
+
+from statistics import linear_regression
+
+import pytest
+
+from custom_components.wavespa.wavespa.heating import HeatingRateTracker
+
+_START = 1_700_000_000
+
+
+def test_heating_rate_and_time_to_target():
+    """Test that a steady heating rate is estimated once there is enough data."""
+    tracker = HeatingRateTracker()
+
+    # 1.5 degrees per hour, reported in whole degrees
+    for minute in range(0, 120):
+        temperature = 20 + int(minute * 1.5 / 60)
+        tracker.add(_START + minute * 60, temperature, True)
+        if minute < 10:
+            assert tracker.rate is None
+
+    # Whole degree readings limit the accuracy
+    assert tracker.rate == pytest.approx(1.5, rel=0.15)
+    time_to_target = tracker.time_to_target(23, 26)
+    assert time_to_target == pytest.approx(2 * 3600, rel=0.15)
+    assert tracker.time_to_target(26, 26) == 0
+
+
+def test_matches_regression_over_buffer():
+    """Test that the incremental fit matches a fit of the samples in the buffer."""
+    tracker = HeatingRateTracker(size=30)
+    samples = [
+        (_START + i * 45.0, 20 + (i * 7 % 11) / 10 + i / 40) for i in range(200)
+    ]
+
+    for timestamp, temperature in samples:
+        tracker.add(timestamp, temperature, True)
+
+    times, temperatures = zip(*samples[-30:])
+    expected = linear_regression(times, temperatures).slope * 3600
+    assert tracker.rate == pytest.approx(expected, rel=1e-6)
+
+
+def test_repeated_and_interrupted_samples():
+    """Test that repeated statuses are ignored, and a new run starts with the heater."""
+    tracker = HeatingRateTracker()
+    for minute in range(30):
+        # The same status is polled twice before the spa reports again
+        tracker.add(_START + minute * 60, 20 + minute / 10, True)
+        tracker.add(_START + minute * 60, 20 + minute / 10, True)
+    assert tracker.rate == pytest.approx(6, rel=1e-6)
+
+    # Cooling while the heater is off does not count, nor does it afterwards
+    tracker.add(_START + 1860, 22.5, False)
+    assert tracker.rate is None
+    assert tracker.time_to_target(22.5, 30) is None
+    tracker.add(_START + 1920, 22, True)
+    assert tracker.rate is None
@@ -0,0 +1,66 @@
+"""Test the in-memory temperature history."""
+
+from custom_components.wavespa.wavespa.history import HISTORY_COLUMNS, DeviceHistory
+
+_START = 1_700_000_000 - 1_700_000_000 % 3600
+_WEEK = 7 * 24 * 3600
+
+
+def _fill(history: DeviceHistory, duration: int, interval: int = 30) -> None:
+    """Add a sample every interval, with the temperature rising by 1 each hour."""
+    for offset in range(0, duration, interval):
+        history.add(_START + offset, 20 + offset / 3600, 38, offset % 120 == 0)
+
+
+def test_recent_history_is_raw():
+    """Test that samples are served as they are until any are dropped."""
+    history = DeviceHistory()
+    _fill(history, 600)
+    # The same status polled again
+    history.add(_START + 570, 30, 38, True)
+
+    result = history.query(_START, _START + 600)
+
+    assert set(result) == set(HISTORY_COLUMNS)
+    assert result["time"] == [_START + offset for offset in range(0, 600, 30)]
+    assert result["temperature"][0] == 20
+    assert result["min"] == result["max"] == result["temperature"]
+    assert result["target"] == [38] * 20
+    assert result["heater"][:4] == [1, 0, 0, 0]
+
+
+def test_week_of_history():
+    """Test that a week is served at decreasing resolution with age, without gaps."""
+    history = DeviceHistory()
+    _fill(history, _WEEK)
+    end = _START + _WEEK
+
+    result = history.query(_START, end)
+
+    times = result["time"]
+    assert times == sorted(set(times))
+    assert times[0] == _START
+    assert max(b - a for a, b in zip(times, times[1:])) <= 3600
+    # Hours for most of the week, then minutes for the last day and the last hour raw
+    assert 6 * 24 <= sum(b - a == 3600 for a, b in zip(times, times[1:])) <= 7 * 24
+    assert 22 * 60 <= sum(b - a == 60 for a, b in zip(times, times[1:])) <= 24 * 60
+    assert sum(b - a == 30 for a, b in zip(times, times[1:])) >= 100
+    assert len(times) < 2000
+
+    # Rolled up points aggregate the samples in their period
+    assert result["temperature"][0] == round(20 + 1785 / 3600, 2)
+    assert result["min"][0] == 20
+    assert result["max"][0] == round(20 + 3570 / 3600, 2)
+    assert result["heater"][0] == 0.25
+
+    # Only part of the history can be requested
+    recent = history.query(end - 1800, end)
+    assert recent["time"] == [t for t in times if t >= end - 1800]
+
+
+def test_missing_target():
+    """Test that a missing target temperature is served as None."""
+    history = DeviceHistory()
+    history.add(_START, 30, None, False)
+
+    assert history.query(_START, _START)["target"] == [None]
@@ -0,0 +1,117 @@
+"""Memory budgets for the API models and the update path.
+
+The budgets are per device, measured across a fleet of simulated spas so that
+fixed overheads are shared out. Lower them when the footprint is reduced, so that
+optimisations stick.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import timedelta
+import gc
+import tracemalloc
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.wavespa.wavespa.api import WavespaApi
+
+from tests.simulator import API_ROOT, MockSession, poll_devices
+
+_DEVICES = 100
+
+# Bytes retained for each known device, with its latest status
+_RETAINED_PER_DEVICE = 4096
+
+# Bytes allocated at peak for each device during a poll
+_POLL_PEAK_PER_DEVICE = 2048
+_ENTITY_POLL_PEAK_PER_DEVICE = 32768
+
+
+@contextmanager
+def _trace_memory() -> Iterator[dict[str, int]]:
+    """Measure bytes retained by, and allocated at peak during, the enclosed block."""
+    usage = {}
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        yield usage
+        gc.collect()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    usage["retained"] = after - before
+    usage["peak"] = peak - before
+
+
+def _spa_session() -> MockSession:
+    """Create a simulated API serving a fleet of spas."""
+    return MockSession([f"spa{i}" for i in range(_DEVICES)])
+
+
+def _next_poll(session: MockSession, temperature: int) -> None:
+    """Report a new status for every spa on the next poll."""
+    session.timestamp += 30
+    session.attrs["Current_temperature"] = temperature
+    session.requests.clear()
+
+
+async def test_retained_per_device():
+    """Test the memory retained for each device and its status."""
+    session = _spa_session()
+    api = WavespaApi(session, "t0k3n", API_ROOT)
+
+    with _trace_memory() as usage:
+        await api.refresh_bindings()
+        await poll_devices(api)
+        session.requests.clear()
+
+    per_device = usage["retained"] / _DEVICES
+    assert per_device < _RETAINED_PER_DEVICE
+
+
+async def test_allocated_per_poll():
+    """Test the memory allocated while polling the status of every device."""
+    session = _spa_session()
+    api = WavespaApi(session, "t0k3n", API_ROOT)
+    await api.refresh_bindings()
+    for temperature in range(30, 33):
+        _next_poll(session, temperature)
+        await poll_devices(api)
+
+    _next_poll(session, 34)
+    with _trace_memory() as usage:
+        await poll_devices(api)
+
+    per_device = usage["peak"] / _DEVICES
+    assert per_device < _POLL_PEAK_PER_DEVICE
+
+
+# Tracing memory slows everything down, which must not trigger load shedding
+@patch("custom_components.wavespa.watchdog._LAG_BUDGET", 60)
+async def test_entity_update_allocated_per_poll(
+    hass: HomeAssistant, setup_integration
+):
+    """Test the memory allocated by a poll, through to the entity state writes."""
+    session = _spa_session()
+    config_entry = await setup_integration(session)
+
+    now = dt_util.utcnow()
+    for step in range(1, 4):
+        _next_poll(session, 30 + step)
+        async_fire_time_changed(hass, now + timedelta(seconds=30 * step))
+        await hass.async_block_till_done()
+
+    _next_poll(session, 34)
+    with _trace_memory() as usage:
+        async_fire_time_changed(hass, now + timedelta(seconds=120))
+        await hass.async_block_till_done()
+
+    assert sum("/devdata/" in url for url in session.requests) == _DEVICES
+    per_device = usage["peak"] / _DEVICES
+    assert per_device < _ENTITY_POLL_PEAK_PER_DEVICE
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
@@ -0,0 +1,71 @@
+"""Test the wavespa API models."""
+
+import pytest
+
+from custom_components.wavespa.wavespa.model import (
+    AIRJET_V01_BUBBLES,
+    HEATER,
+    TEMPERATURE_SETUP,
+    BubblesLevel,
+    DataPoint,
+    WavespaCapability,
+    WavespaDeviceType,
+    encode_attrs,
+    get_capabilities,
+)
+
+
+def test_data_point_encode_decode():
+    """Test that data points translate values in both directions."""
+    assert encode_attrs({HEATER: True, TEMPERATURE_SETUP: 38}) == {
+        "Heater": 1,
+        "Temperature_setup": 38,
+    }
+    assert HEATER.decode(0) is False
+    assert HEATER.decode(1) is True
+    assert AIRJET_V01_BUBBLES.encode(BubblesLevel.MEDIUM) == 50
+    assert AIRJET_V01_BUBBLES.decode(51) == BubblesLevel.MEDIUM
+
+    # Unexpected API values fall back to a default, or mean on for on/off points
+    assert AIRJET_V01_BUBBLES.decode(99) == BubblesLevel.OFF
+    assert HEATER.decode(2) is True
+
+
+def test_data_point_validation():
+    """Test that invalid values and tables are rejected."""
+    with pytest.raises(ValueError):
+        TEMPERATURE_SETUP.encode(105)
+    with pytest.raises(ValueError):
+        HEATER.encode("on")
+    with pytest.raises(ValueError):
+        DataPoint("wave", {BubblesLevel.OFF: 0, BubblesLevel.MAX: (100, 0)})
+
+
+def test_get_capabilities():
+    """Test that capabilities follow the device type and reported attributes."""
+    spa = WavespaDeviceType.WAVESPA_EU
+    base = (
+        WavespaCapability.DEVICE_INFO
+        | WavespaCapability.CONNECTIVITY
+        | WavespaCapability.ERRORS
+    )
+    everything = (
+        base
+        | WavespaCapability.THERMOSTAT
+        | WavespaCapability.HEATER
+        | WavespaCapability.FILTER
+        | WavespaCapability.BUBBLES
+    )
+
+    # Before any status is received, every capability of the type is assumed
+    assert get_capabilities(spa, None) == everything
+    assert get_capabilities(spa, {}) == base
+    assert get_capabilities(spa, {"Heater": 1, "Filter": 0}) == (
+        base | WavespaCapability.HEATER | WavespaCapability.FILTER
+    )
+    assert get_capabilities(
+        spa, {"Heater": 1, "Temperature_setup": 38, "Current_temperature": 30}
+    ) == (base | WavespaCapability.THERMOSTAT | WavespaCapability.HEATER)
+    assert get_capabilities(WavespaDeviceType.UNKNOWN, None) == (
+        WavespaCapability.DEVICE_INFO
+    )
@@ -0,0 +1,96 @@
+"""Replay a day of API traffic through the integration on a frozen clock."""
+
+from datetime import UTC, datetime
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+
+from custom_components.wavespa.const import DOMAIN
+from custom_components.wavespa.coordinator import WavespaUpdateCoordinator
+
+from tests.cassette import (
+    CASSETTE_DIR,
+    WALL_START,
+    Cassette,
+    CassetteSession,
+    redact,
+    replay,
+)
+
+_DAY = 24 * 60 * 60
+
+
+async def test_replay_spa_day(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, setup_integration
+):
+    """Test a day of polling two spas through outages, delays and a command."""
+    cassette = Cassette.load(CASSETTE_DIR / "spa_day.json")
+    freezer.move_to(datetime.fromtimestamp(WALL_START, UTC))
+    session = CassetteSession(cassette)
+    config_entry = await setup_integration(session)
+    coordinator: WavespaUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+    spa1 = coordinator.device_coordinators["spa1"]
+    spa2 = coordinator.device_coordinators["spa2"]
+    polls: list[tuple[float, int, dict[str, int], int]] = []
+
+    def on_poll(elapsed: float) -> None:
+        assert spa1.data is not None and spa2.data is not None
+        polls.append(
+            (elapsed, spa1.data.timestamp, dict(spa1.data.attrs), spa2.data.timestamp)
+        )
+
+    await replay(hass, freezer, cassette, _DAY, on_poll=on_poll)
+    assert session.elapsed >= _DAY
+
+    # Status never goes back in time, including for the delayed response at 7200s
+    timestamps = [timestamp for _, timestamp, _, _ in polls]
+    assert timestamps == sorted(timestamps)
+    for elapsed, _, attrs, _ in polls:
+        if 7200 <= elapsed < 7260:
+            assert attrs["Current_temperature"] == 32
+
+    # The heater stays off once commanded, although the API is slow to confirm it
+    # (the poll the command raced with may report either state)
+    assert session.commands == [(10800, {"Heater": 0})]
+    for elapsed, _, attrs, _ in polls:
+        if elapsed > 10800:
+            assert attrs["Heater"] == 0
+
+    # The offline spa is only probed occasionally, and polled again once back
+    offline = [
+        at
+        for at, _, path in session.requests
+        if path == "/app/devdata/spa2/latest" and 28800 <= at < 43200
+    ]
+    assert 0 < len(offline) < 20
+    assert polls[-1][3] == WALL_START + 43200
+    assert coordinator.api.health["spa2"].consecutive_failures == 0
+    assert spa2.last_update_success
+
+    # The server error burst is isolated to one device, which recovers afterwards
+    assert coordinator.api.health["spa1"].consecutive_failures == 0
+    assert polls[-1][2]["Current_temperature"] == 27
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+def test_redact():
+    """Test that identifying details are removed from recorded responses."""
+    aliases: dict[str, str] = {}
+    bindings = {
+        "devices": [
+            {"did": "AbC123", "dev_alias": "Garden spa", "mac": "aa:bb", "remark": ""},
+            {"did": "XyZ789", "dev_alias": "Roof spa", "passcode": "1234"},
+        ]
+    }
+
+    assert redact(bindings, aliases) == {
+        "devices": [
+            {"did": "spa1", "dev_alias": "Spa"},
+            {"did": "spa2", "dev_alias": "Spa"},
+        ]
+    }
+    assert redact({"uid": "u", "token": "t", "expire_at": 1}, aliases) == {
+        "expire_at": 1
+    }
+    assert aliases == {"AbC123": "spa1", "XyZ789": "spa2"}
@@ -0,0 +1,40 @@
+"""Test the wavespa services."""
+
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+
+from custom_components.wavespa.const import DOMAIN, SERVICE_APPLY_STATE
+
+from tests.simulator import MockSession
+
+
+async def test_apply_state_temperature_range(hass: HomeAssistant, setup_integration):
+    """Test that a target temperature is checked against the unit of each spa."""
+    session = MockSession(["spa_eu", "spa_us"])
+    session.product_names["spa_us"] = "Wave_SPA_US"
+    config_entry = await setup_integration(session)
+    device_registry = dr.async_get(hass)
+    device_ids = {
+        did: device_registry.async_get_device(identifiers={(DOMAIN, did)}).id
+        for did in ("spa_eu", "spa_us")
+    }
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_APPLY_STATE,
+        {ATTR_DEVICE_ID: list(device_ids.values()), "temperature_setup": 80},
+        blocking=True,
+        return_response=True,
+    )
+
+    results = response["devices"]
+    assert results[device_ids["spa_us"]] == {"success": True}
+    assert results[device_ids["spa_eu"]] == {
+        "success": False,
+        "error": "temperature_setup must be between 20 and 40 for this spa",
+    }
+    # Only the spa that accepts the temperature is sent a command
+    assert session.commands == [{"Temperature_setup": 80}]
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
@@ -0,0 +1,154 @@
+"""Soak test running a large fleet of spas for hours of simulated time.
+
+This is opt-in, as it takes a while. Set WAVESPA_SOAK_HOURS to the number of
+simulated hours to run for, and optionally WAVESPA_SOAK_ACCOUNTS and
+WAVESPA_SOAK_DEVICES to the number of config entries and spas per entry.
+"""
+
+from dataclasses import dataclass, field
+from datetime import timedelta
+import logging
+import os
+from statistics import mean
+from time import perf_counter
+import tracemalloc
+
+from homeassistant.const import EVENT_STATE_CHANGED, EVENT_STATE_REPORTED
+from homeassistant.core import HomeAssistant, callback
+import homeassistant.util.dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.wavespa.const import DOMAIN
+
+from tests.simulator import MockSession
+
+_LOGGER = logging.getLogger(__name__)
+
+_HOURS = float(os.environ.get("WAVESPA_SOAK_HOURS", 0))
+_ACCOUNTS = int(os.environ.get("WAVESPA_SOAK_ACCOUNTS", 24))
+_DEVICES = int(os.environ.get("WAVESPA_SOAK_DEVICES", 10))
+
+# Simulated time per step, matching the polling interval, and per sample
+_STEP = timedelta(seconds=30)
+_STEPS_PER_SAMPLE = 10
+
+# Interval of the probe used to measure event loop lag
+_LAG_PROBE_INTERVAL = 0.01
+
+# Late samples may exceed early ones by this factor plus an absolute allowance,
+# before the metric is considered to be growing without bound
+_GROWTH_FACTOR = 1.5
+_ALLOWANCES = {
+    "step_time": 0.01,
+    "loop_lag": 0.01,
+    "memory": 1024 * 1024,
+    "requests": 1,
+    "recorder_writes": 1,
+    "state_writes": 1,
+}
+
+
+@dataclass
+class _Metrics:
+    """Samples of each metric, taken every few steps."""
+
+    samples: dict[str, list[float]] = field(
+        default_factory=lambda: {name: [] for name in _ALLOWANCES}
+    )
+
+    def add(self, **values: float) -> None:
+        """Add a sample of every metric."""
+        for name, value in values.items():
+            self.samples[name].append(value)
+
+    def assert_bounded(self) -> None:
+        """Check that no metric grew between the early and late samples."""
+        for name, samples in self.samples.items():
+            # The first quarter is left out, to allow for warming up
+            quarter = max(1, len(samples) // 4)
+            early = mean(samples[quarter : 2 * quarter])
+            late = mean(samples[-quarter:])
+            _LOGGER.info("%s: early %.4g, late %.4g", name, early, late)
+            assert late <= early * _GROWTH_FACTOR + _ALLOWANCES[name], name
+
+
+@pytest.mark.skipif(not _HOURS, reason="Set WAVESPA_SOAK_HOURS to run soak tests")
+async def test_fleet_soak(hass: HomeAssistant, setup_integration):
+    """Test that a large fleet keeps running within steady resource usage."""
+    tracemalloc.start()
+    sessions = []
+
+    for account in range(_ACCOUNTS):
+        session = MockSession([f"account{account}_spa{i}" for i in range(_DEVICES)])
+        sessions.append(session)
+        await setup_integration(session, username=f"account{account}@example.org")
+
+    assert len(hass.states.async_entity_ids("climate")) == _ACCOUNTS * _DEVICES
+
+    counts = {"recorder_writes": 0, "state_writes": 0}
+
+    @callback
+    def count_state_changed(_) -> None:
+        # Only changes are written to the database by the recorder
+        counts["recorder_writes"] += 1
+        counts["state_writes"] += 1
+
+    @callback
+    def count_state_reported(_) -> None:
+        counts["state_writes"] += 1
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, count_state_changed)
+    hass.bus.async_listen(EVENT_STATE_REPORTED, count_state_reported)
+
+    # Measures how late a regularly scheduled callback runs
+    lags: list[float] = []
+    expected_at = hass.loop.time() + _LAG_PROBE_INTERVAL
+
+    @callback
+    def probe_lag() -> None:
+        nonlocal expected_at, probe
+        lags.append(max(0.0, hass.loop.time() - expected_at))
+        expected_at = hass.loop.time() + _LAG_PROBE_INTERVAL
+        probe = hass.loop.call_later(_LAG_PROBE_INTERVAL, probe_lag)
+
+    probe = hass.loop.call_later(_LAG_PROBE_INTERVAL, probe_lag)
+
+    metrics = _Metrics()
+    now = dt_util.utcnow()
+    steps = int(timedelta(hours=_HOURS) / _STEP)
+    step_times: list[float] = []
+
+    for step in range(1, steps + 1):
+        # The spas report a slowly cycling temperature
+        for session in sessions:
+            session.timestamp += int(_STEP.total_seconds())
+            session.attrs["Current_temperature"] = 30 + step % 8
+
+        started = perf_counter()
+        async_fire_time_changed(hass, now + _STEP * step)
+        await hass.async_block_till_done()
+        step_times.append(perf_counter() - started)
+
+        if step % _STEPS_PER_SAMPLE == 0:
+            metrics.add(
+                step_time=mean(step_times),
+                loop_lag=max(lags, default=0.0),
+                memory=tracemalloc.get_traced_memory()[0],
+                requests=sum(len(session.requests) for session in sessions)
+                / _STEPS_PER_SAMPLE,
+                recorder_writes=counts["recorder_writes"] / _STEPS_PER_SAMPLE,
+                state_writes=counts["state_writes"] / _STEPS_PER_SAMPLE,
+            )
+            step_times.clear()
+            lags.clear()
+            counts.update(recorder_writes=0, state_writes=0)
+            for session in sessions:
+                session.requests.clear()
+
+    probe.cancel()
+    tracemalloc.stop()
+
+    metrics.assert_bounded()
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        assert await hass.config_entries.async_unload(entry.entry_id)
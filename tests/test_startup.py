@@ -0,0 +1,99 @@
+"""Benchmark the contribution of wavespa to Home Assistant startup.
+
+This is opt-in, as wall clock budgets depend on the machine running the tests.
+Set WAVESPA_BENCHMARKS to run the benchmarks.
+"""
+
+from datetime import timedelta
+import logging
+import os
+from pathlib import Path
+import subprocess
+import sys
+from time import perf_counter
+
+from homeassistant.core import HomeAssistant
+import pytest
+
+from tests.simulator import API_ROOT, MockSession
+
+_LOGGER = logging.getLogger(__name__)
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("WAVESPA_BENCHMARKS"),
+    reason="Set WAVESPA_BENCHMARKS to run benchmarks",
+)
+
+_MODULES = (
+    "custom_components.wavespa",
+    "custom_components.wavespa.binary_sensor",
+    "custom_components.wavespa.climate",
+    "custom_components.wavespa.config_flow",
+    "custom_components.wavespa.diagnostics",
+    "custom_components.wavespa.sensor",
+    "custom_components.wavespa.switch",
+)
+
+# Time spent importing the integration's own modules, excluding dependencies
+_IMPORT_BUDGET_MS = 250
+
+# Simulated API round trip, and the allowed setup time per device on top of it
+_API_LATENCY = 0.005
+_SETUP_BUDGET = 0.5
+_SETUP_BUDGET_PER_DEVICE = 0.02
+
+
+def test_import_time():
+    """Test that importing the integration and its platforms is cheap."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(_MODULES)}"],
+        capture_output=True,
+        check=True,
+        cwd=Path(__file__).parent.parent,
+        text=True,
+    )
+
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    self_times = {}
+    for line in result.stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        fields = [field.strip() for field in fields]
+        if len(fields) == 3 and fields[2].startswith("custom_components.wavespa"):
+            self_times[fields[2]] = int(fields[0]) / 1000
+
+    assert set(_MODULES) <= self_times.keys()
+    total = sum(self_times.values())
+    _LOGGER.info("Import time of wavespa modules: %.1f ms", total)
+    for module, self_time in sorted(self_times.items(), key=lambda item: -item[1]):
+        _LOGGER.info("  %s: %.1f ms", module, self_time)
+    assert total < _IMPORT_BUDGET_MS
+
+
+@pytest.mark.parametrize("device_count", [1, 10, 100])
+@pytest.mark.parametrize("token", ["warm", "cold"])
+async def test_setup_time(
+    hass: HomeAssistant, setup_integration, device_count: int, token: str
+):
+    """Test the time taken to set up an entry, until all of its entities have state."""
+    session = MockSession(
+        [f"spa{i}" for i in range(device_count)], latency=_API_LATENCY
+    )
+
+    # A cold start has to log in again, as the token is about to expire
+    started = perf_counter()
+    config_entry = await setup_integration(
+        session, token_lifetime=timedelta(days=31 if token == "warm" else 1)
+    )
+    first_state_time = perf_counter() - started
+
+    assert len(hass.states.async_entity_ids("climate")) == device_count
+    assert (f"{API_ROOT}/app/login" in session.requests) == (token == "cold")
+    _LOGGER.info(
+        "%d device(s), %s token: first state in %.0f ms",
+        device_count,
+        token,
+        first_state_time * 1000,
+    )
+    assert first_state_time < _SETUP_BUDGET + _SETUP_BUDGET_PER_DEVICE * device_count
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
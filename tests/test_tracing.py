@@ -0,0 +1,83 @@
+"""Benchmark command latency against the local API simulator."""
+
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    SERVICE_TURN_OFF,
+    SERVICE_TURN_ON,
+    Platform,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.wavespa.const import DOMAIN
+from custom_components.wavespa.wavespa.api import WavespaApi
+from custom_components.wavespa.wavespa.tracing import (
+    VISIBLE_SPAN,
+    CommandTracer,
+    current_correlation_id,
+)
+
+from tests.simulator import API_ROOT, MockSession
+
+# Simulated API round trip, and the budget for a command to become visible
+_API_LATENCY = 0.02
+_VISIBLE_BUDGET_MS = 100
+
+
+async def test_command_latency_budget(hass: HomeAssistant, setup_integration):
+    """Test that commands become visible within budget, and every stage is traced."""
+    session = MockSession(["spa1"], latency=_API_LATENCY)
+    config_entry = await setup_integration(session)
+    api = hass.data[DOMAIN][config_entry.entry_id].api
+    entity_id = er.async_get(hass).async_get_entity_id(
+        Platform.SWITCH, DOMAIN, "spa1_Heater"
+    )
+    assert entity_id is not None
+
+    # The heater starts on, so every command changes the state of the switch
+    for i in range(20):
+        await hass.services.async_call(
+            Platform.SWITCH,
+            SERVICE_TURN_ON if i % 2 else SERVICE_TURN_OFF,
+            {ATTR_ENTITY_ID: entity_id},
+            blocking=True,
+        )
+    await hass.async_block_till_done()
+
+    assert current_correlation_id() is None
+    summary = api.tracer.summary()
+    # Spans in tasks created for the command are attributed to it
+    assert summary["control_post"]["count"] == 20
+    assert summary["optimistic_update"]["count"] == 20
+    assert summary["switch_turn_off"]["count"] == 10
+    assert summary["switch_turn_on"]["count"] == 10
+    assert summary[VISIBLE_SPAN]["count"] == 20
+    assert summary[VISIBLE_SPAN]["p95"] >= _API_LATENCY * 1000
+    assert summary[VISIBLE_SPAN]["p95"] < _VISIBLE_BUDGET_MS
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_visible_once_target_written():
+    """Test that a command is only visible once the commanded entity is written."""
+    tracer = CommandTracer()
+
+    with tracer.trace("switch_turn_on", "switch.spa_heater"):
+        # Other entities of the device may be written first
+        tracer.mark_visible("climate.spa_thermostat")
+        assert VISIBLE_SPAN not in tracer.summary()
+        tracer.mark_visible("switch.spa_heater")
+        # Only the first state write after a command counts
+        tracer.mark_visible("switch.spa_heater")
+
+    assert tracer.summary()[VISIBLE_SPAN]["count"] == 1
+
+
+async def test_untraced_requests_not_recorded():
+    """Test that polling outside of a command is not recorded."""
+    session = MockSession(["spa1"])
+    api = WavespaApi(session, "t0k3n", API_ROOT)
+    await api.refresh_bindings()
+    await api.fetch_device("spa1")
+
+    assert api.tracer.summary() == {}
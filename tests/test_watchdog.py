@@ -0,0 +1,66 @@
+"""Test the event loop lag watchdog."""
+
+import asyncio
+import time
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.wavespa.const import DOMAIN
+from custom_components.wavespa.watchdog import LoopWatchdog
+
+from tests.simulator import MockSession
+
+
+async def test_sheds_load_while_loop_lags():
+    """Test that load is shed while the loop lags, and restored once it recovers."""
+    watchdog = LoopWatchdog(asyncio.get_running_loop())
+
+    watchdog.probe_lag()
+    # Block the event loop past the lag budget
+    time.sleep(0.15)
+    await asyncio.sleep(0)
+    watchdog.end_cycle()
+    assert watchdog.shedding
+    assert watchdog.shed_factor == 2
+
+    for _ in range(20):
+        watchdog.probe_lag()
+        await asyncio.sleep(0)
+    watchdog.end_cycle()
+    assert not watchdog.shedding
+
+
+async def test_measures_cycle_stages():
+    """Test that time spent in each stage is reported for the last cycle."""
+    watchdog = LoopWatchdog(asyncio.get_running_loop())
+
+    with watchdog.measure("fan_out"):
+        time.sleep(0.01)
+    assert watchdog.last_cycle["fan_out"] == 0
+
+    watchdog.end_cycle()
+    assert watchdog.last_cycle["fan_out"] >= 0.01
+    assert watchdog.last_cycle["state_writes"] == 0
+
+
+async def test_sensors_per_account(hass: HomeAssistant, setup_integration):
+    """Test that the watchdog sensors of each account have distinct names."""
+    first = await setup_integration(MockSession(["spa1"]), username="a@example.org")
+    second = await setup_integration(MockSession(["spa2"]), username="b@example.org")
+
+    entity_registry = er.async_get(hass)
+    names = set()
+    for config_entry in (first, second):
+        entity_id = entity_registry.async_get_entity_id(
+            "sensor", DOMAIN, f"{config_entry.entry_id}_event_loop_lag"
+        )
+        assert entity_id is not None
+        names.add(hass.states.get(entity_id).name)
+    assert names == {
+        "a@example.org Wavespa Event Loop Lag",
+        "b@example.org Wavespa Event Loop Lag",
+    }
+
+    for config_entry in (first, second):
+        assert await hass.config_entries.async_unload(config_entry.entry_id)
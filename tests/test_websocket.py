@@ -0,0 +1,41 @@
+"""Test the wavespa websocket API."""
+
+from datetime import datetime
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+
+from custom_components.wavespa.const import DOMAIN, WS_TYPE_HISTORY
+
+from tests.simulator import MockSession
+
+
+async def test_history(hass: HomeAssistant, hass_ws_client, setup_integration):
+    """Test that the history of a spa is served from memory."""
+    session = MockSession(["spa1"])
+    config_entry = await setup_integration(session)
+
+    device = dr.async_get(hass).async_get_device(identifiers={(DOMAIN, "spa1")})
+    assert device is not None
+    client = await hass_ws_client(hass)
+
+    await client.send_json_auto_id(
+        {
+            "type": WS_TYPE_HISTORY,
+            "device_id": device.id,
+            "start_time": datetime.fromtimestamp(0).isoformat(),
+        }
+    )
+    response = await client.receive_json()
+    assert response["success"]
+    assert response["result"]["time"] == [session.timestamp]
+    assert response["result"]["temperature"] == [35]
+    assert response["result"]["target"] == [38]
+    assert response["result"]["heater"] == [1]
+
+    await client.send_json_auto_id({"type": WS_TYPE_HISTORY, "device_id": "nope"})
+    response = await client.receive_json()
+    assert not response["success"]
+    assert response["error"]["code"] == "not_found"
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)